@@ -0,0 +1,111 @@
+"""
+Measuring output side of adaptive Huffman encoder separately from updates of the tree
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+from bitarray import bitarray
+from bitarray.util import int2ba
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.bitWriter import BitWriter  # noqa: E402
+from src.HuffmanTree import HuffmanTree  # noqa: E402
+from src.utility import read_symbols  # noqa: E402
+
+FLUSH_BITS = 2**10
+
+
+def get_args() -> argparse.Namespace:
+    """
+    Instantiate argument parser and parse execution arguments
+
+    :return: Namespace containing parsed execution arguments
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure output side of adaptive Huffman encoder",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        type=Path,
+        default=None,
+        help="File to encode. If omitted, random text of SIZE bytes is encoded",
+    )
+    parser.add_argument(
+        "-s", "--size", type=int, default=2**20, help="Size of random text in bytes"
+    )
+    return parser.parse_args()
+
+
+def random_text(size: int) -> bytes:
+    random.seed(0)
+    words = [bytes(random.choices(b"etaoinshrdlu", k=random.randint(1, 8))) for _ in range(500)]
+    text = bytearray()
+    while len(text) < size:
+        text += random.choice(words) + b" "
+    return bytes(text[:size])
+
+
+def update_tree(symbols) -> list[tuple[int, int]]:
+    """
+    Returns:
+        list[tuple[int, int]]: Codes of the symbols and lengths of the codes
+    """
+    tree = HuffmanTree()
+    encode_code = tree.encode_code
+    codes = [encode_code(symbol) for symbol in symbols]
+    codes.append(tree.eof_code())
+    return codes
+
+
+def write_bitarrays(codes: list[tuple[int, int]], file):
+    """
+    Writes codes like the encoder did before BitWriter: a bitarray is created for every code and
+    appended to a buffer, which is flushed in slices of FLUSH_BITS bits
+    """
+    encoded = bitarray()
+    for code, length in codes:
+        encoded += int2ba(code, length) if length else bitarray()
+        if len(encoded) >= FLUSH_BITS:
+            file.write(encoded[:FLUSH_BITS].tobytes())
+            encoded = encoded[FLUSH_BITS:]
+    file.write(encoded.tobytes())
+
+
+def write_bit_writer(codes: list[tuple[int, int]], file):
+    writer = BitWriter(file)
+    write = writer.write
+    for code, length in codes:
+        write(code, length)
+    writer.finish()
+
+
+def measure(function, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    args = get_args()
+    if args.file is None:
+        symbols = list(random_text(args.size))
+    else:
+        symbols = [symbol for chunk in read_symbols(args.file) for symbol in chunk]
+    tree_seconds, codes = measure(update_tree, symbols)
+    print(f"{len(symbols)} symbols, {sum(length for _, length in codes)} bits")
+    print(f"tree updates: {tree_seconds:.3f} s")
+    with open(os.devnull, "wb") as file:
+        bitarray_seconds, _ = measure(write_bitarrays, codes, file)
+        writer_seconds, _ = measure(write_bit_writer, codes, file)
+    print(f"output with bitarray per code: {bitarray_seconds:.3f} s")
+    print(f"output with BitWriter: {writer_seconds:.3f} s")
+    print(f"output speedup: {bitarray_seconds / writer_seconds:.1f}x")
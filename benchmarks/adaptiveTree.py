@@ -0,0 +1,80 @@
+"""
+Comparing adaptive Huffman coding with HuffmanTree and with ArrayHuffmanTree compiled by Numba
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.adaptiveOutput import random_text  # noqa: E402
+from src import adaptiveHuffman  # noqa: E402
+from src.arrayHuffmanTree import JIT_AVAILABLE, ArrayHuffmanTree  # noqa: E402
+
+
+def get_args() -> argparse.Namespace:
+    """
+    Instantiate argument parser and parse execution arguments
+
+    :return: Namespace containing parsed execution arguments
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare backends of adaptive Huffman coding",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        type=Path,
+        default=None,
+        help="File to encode. If omitted, random text of SIZE bytes is encoded",
+    )
+    parser.add_argument(
+        "-s", "--size", type=int, default=2**20, help="Size of random text in bytes"
+    )
+    return parser.parse_args()
+
+
+def measure(use_array_tree: bool, source: Path, directory: Path) -> tuple[float, float, bytes]:
+    """
+    Returns:
+        tuple[float, float, bytes]: Times of encoding and decoding in seconds and encoded file
+    """
+    encoded = directory.joinpath(f"encoded{use_array_tree}.huf")
+    with patch("src.adaptiveHuffman.USE_ARRAY_TREE", use_array_tree):
+        start = time.perf_counter()
+        adaptiveHuffman.encode(source, encoded)
+        encode_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        adaptiveHuffman.decode(encoded, directory.joinpath("decoded"))
+        decode_seconds = time.perf_counter() - start
+    return encode_seconds, decode_seconds, encoded.read_bytes()
+
+
+if __name__ == "__main__":
+    args = get_args()
+    if not JIT_AVAILABLE:
+        sys.exit("Numba is not installed, ArrayHuffmanTree would run as pure Python")
+    with TemporaryDirectory() as directory:
+        source = args.file
+        if source is None:
+            source = Path(directory).joinpath("source.txt")
+            source.write_bytes(random_text(args.size))
+        # Compile loops before measuring
+        ArrayHuffmanTree().encode_code(0)
+        size = source.stat().st_size
+        results = {}
+        for name, use_array_tree in [("HuffmanTree", False), ("ArrayHuffmanTree", True)]:
+            encode_seconds, decode_seconds, results[name] = measure(
+                use_array_tree, source, Path(directory)
+            )
+            print(
+                f"{name}: encoding {size / encode_seconds / 2**20:.2f} MiB/s, "
+                f"decoding {size / decode_seconds / 2**20:.2f} MiB/s"
+            )
+        print("identical streams:", len(set(results.values())) == 1)
@@ -0,0 +1,88 @@
+"""
+Comparing compression rate and speed of basic Huffman, adaptive Huffman and tANS coding
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.adaptiveOutput import random_text  # noqa: E402
+from src import adaptiveHuffman, basicHuffman, tans  # noqa: E402
+from src.tansTable import TansTable  # noqa: E402, F401 - imports NumPy before measuring
+
+
+def get_args() -> argparse.Namespace:
+    """
+    Instantiate argument parser and parse execution arguments
+
+    :return: Namespace containing parsed execution arguments
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare basic Huffman, adaptive Huffman and tANS coding",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        type=Path,
+        default=None,
+        help="File to encode. If omitted, random text of SIZE bytes is encoded",
+    )
+    parser.add_argument(
+        "-s", "--size", type=int, default=2**20, help="Size of random text in bytes"
+    )
+    return parser.parse_args()
+
+
+def measure(
+    encode: Callable[[Path, Path], None],
+    decode: Callable[[Path, Path], None],
+    source: Path,
+    directory: Path,
+) -> tuple[float, float, int]:
+    """
+    Returns:
+        tuple[float, float, int]: Times of encoding and decoding in seconds and size of encoded
+        file in bytes
+    """
+    encoded = directory.joinpath("encoded.huf")
+    decoded = directory.joinpath("decoded")
+    start = time.perf_counter()
+    encode(source, encoded)
+    encode_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    decode(encoded, decoded)
+    decode_seconds = time.perf_counter() - start
+    if decoded.with_suffix(source.suffix).read_bytes() != source.read_bytes():
+        sys.exit("Decoded file differs from the original")
+    return encode_seconds, decode_seconds, encoded.stat().st_size
+
+
+if __name__ == "__main__":
+    args = get_args()
+    codecs = {
+        "basic Huffman": (basicHuffman.encode, basicHuffman.decode),
+        "adaptive Huffman": (adaptiveHuffman.encode, adaptiveHuffman.decode),
+        "tANS": (tans.encode, tans.decode),
+    }
+    with TemporaryDirectory() as directory:
+        source = args.file
+        if source is None:
+            source = Path(directory).joinpath("source.txt")
+            source.write_bytes(random_text(args.size))
+        size = source.stat().st_size
+        for name, (encode, decode) in codecs.items():
+            encode_seconds, decode_seconds, encoded_size = measure(
+                encode, decode, source, Path(directory)
+            )
+            print(
+                f"{name}: compression rate {encoded_size / size:.4f}, "
+                f"encoding {size / encode_seconds / 2**20:.2f} MiB/s, "
+                f"decoding {size / decode_seconds / 2**20:.2f} MiB/s"
+            )
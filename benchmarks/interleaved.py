@@ -0,0 +1,82 @@
+"""
+Comparing decoding speed of basic Huffman with and without interleaved streams
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.adaptiveOutput import random_text  # noqa: E402
+from src import basicHuffman  # noqa: E402
+from src.interleaved import InterleavedDecoder  # noqa: E402, F401 - imports NumPy before measuring
+
+
+def get_args() -> argparse.Namespace:
+    """
+    Instantiate argument parser and parse execution arguments
+
+    :return: Namespace containing parsed execution arguments
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare decoding of basic Huffman with and without interleaved streams",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        type=Path,
+        default=None,
+        help="File to encode. If omitted, random text of SIZE bytes is encoded",
+    )
+    parser.add_argument(
+        "-s", "--size", type=int, default=2**23, help="Size of random text in bytes"
+    )
+    parser.add_argument("-b", "--symbol-size", type=int, default=1, help="Size of symbols in bytes")
+    parser.add_argument(
+        "-n",
+        "--streams",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="Numbers of interleaved streams to measure",
+    )
+    return parser.parse_args()
+
+
+def measure_decoding(source: Path, directory: Path, symbol_size: int, streams: int | None) -> float:
+    """
+    Returns:
+        float: Time of decoding in seconds
+    """
+    encoded = directory.joinpath("encoded.huf")
+    decoded = directory.joinpath("decoded")
+    basicHuffman.encode(source, encoded, symbol_size, allow_stored=False, streams=streams)
+    start = time.perf_counter()
+    basicHuffman.decode(encoded, decoded)
+    seconds = time.perf_counter() - start
+    if decoded.with_suffix(source.suffix).read_bytes() != source.read_bytes():
+        sys.exit("Decoded file differs from the original")
+    return seconds
+
+
+if __name__ == "__main__":
+    args = get_args()
+    with TemporaryDirectory() as directory:
+        source = args.file
+        if source is None:
+            source = Path(directory).joinpath("source.txt")
+            source.write_bytes(random_text(args.size))
+        size = source.stat().st_size
+        serial_seconds = measure_decoding(source, Path(directory), args.symbol_size, None)
+        print(f"serial: decoding {size / serial_seconds / 2**20:.2f} MiB/s")
+        for streams in args.streams:
+            seconds = measure_decoding(source, Path(directory), args.symbol_size, streams)
+            print(
+                f"{streams} streams: decoding {size / seconds / 2**20:.2f} MiB/s, "
+                f"{serial_seconds / seconds:.2f}x faster than serial"
+            )
@@ -0,0 +1,78 @@
+"""
+Measuring import time of command line tools with `python -X importtime`
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CLIS = ["huf", "unhuf", "hufc"]
+
+
+def get_args() -> argparse.Namespace:
+    """
+    Instantiate argument parser and parse execution arguments
+
+    :return: Namespace containing parsed execution arguments
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure import time of command line tools",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=10, help="Number of measurements of every tool"
+    )
+    parser.add_argument(
+        "-t", "--top", type=int, default=5, help="Number of the slowest imported modules shown"
+    )
+    parser.add_argument(
+        "--max_ms",
+        type=float,
+        default=None,
+        help="Exit with error if median import time of any tool exceeds this value",
+    )
+    return parser.parse_args()
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Imports module in a new interpreter
+
+    Args:
+        module (str): Name of the module
+
+    Returns:
+        dict[str, int]: Cumulative import times of all imported modules in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+if __name__ == "__main__":
+    args = get_args()
+    exceeded = False
+    for cli in CLIS:
+        measurements = [import_times(cli) for _ in range(args.repeat)]
+        median = statistics.median(times[cli] for times in measurements) / 1000
+        slowest = sorted(measurements[-1].items(), key=lambda item: item[1], reverse=True)
+        print(f"{cli}: {median:.1f} ms, NumPy imported: {'numpy' in measurements[-1]}")
+        for name, time in slowest[1 : args.top + 1]:
+            print(f"    {name}: {time / 1000:.1f} ms")
+        exceeded |= args.max_ms is not None and median > args.max_ms
+    if exceeded:
+        raise SystemExit(f"Import time exceeded {args.max_ms} ms")
@@ -5,16 +5,23 @@ import argparse
 from itertools import zip_longest
 from pathlib import Path
 
-from src.adaptiveHuffman import encode as adaptive_encode
+from src.adaptiveHuffman import append as adaptive_append, encode as adaptive_encode
+from src.archive import create_archive
 from src.basicHuffman import encode as basic_encode
+from src.pipeline import DEFAULT_BLOCK_SIZE, Pipeline
+from src.symbolSize import select_symbol_size
+from src.tans import encode as tans_encode
 
-TYPE_CHOICES = ["basic", "adaptive"]
+TYPE_CHOICES = ["basic", "adaptive", "tans"]
+AUTO_SYMBOL_SIZE = "auto"
 
 
-def get_args() -> argparse.Namespace:
+def get_args(argv: list[str] | None = None) -> argparse.Namespace:
     """
     Instantiate argument parser and parse execution arguments
 
+    :param argv: Arguments to parse, arguments of the process if omitted
+    :type argv: list[str] | None
     :return: Namespace containing parsed execution arguments
     :rtype: argparse.Namespace
     """
@@ -43,12 +50,24 @@ def get_args() -> argparse.Namespace:
             omitted encoded files will be saved next to originals.",
     )
 
+    parser.add_argument(
+        "-a",
+        "--archive",
+        metavar="ARCHIVE",
+        type=Path,
+        default=None,
+        help="Path of archive all files will be encoded into, using shared code table. \
+            Destinations are ignored. Used only with basic type of the algorithm, without \
+            other features",
+    )
+
     parser.add_argument(
         "-t",
         "--type",
         choices=TYPE_CHOICES,
         default=TYPE_CHOICES[0],
-        help="Choose which type of the algorithm will be used",
+        help="Choose which type of the algorithm will be used. tans codes 1 byte symbols with \
+            table-based asymmetric numeral systems instead of Huffman codes",
     )
 
     def positive_int(text: str):
@@ -57,12 +76,107 @@ def get_args() -> argparse.Namespace:
             raise argparse.ArgumentTypeError(f"{val} is not a valid value for positive integer")
         return val
 
+    def symbol_size(text: str):
+        if text == AUTO_SYMBOL_SIZE:
+            return text
+        return positive_int(text)
+
     parser.add_argument(
         "-s",
         "--symbol_size",
+        type=symbol_size,
+        default=1,
+        help=f"Size of symbols that will be encoded in bytes. Needs to be a positive number or \
+            '{AUTO_SYMBOL_SIZE}' to choose the size based on a sample of every file",
+    )
+
+    parser.add_argument(
+        "--transform",
+        action="store_true",
+        default=False,
+        help="Encode residuals of pixel prediction instead of pixels of binary PGM images. Used \
+            only with basic type of the algorithm",
+    )
+
+    parser.add_argument(
+        "--context_model",
+        action="store_true",
+        default=False,
+        help="Encode every symbol with code table chosen by the previous symbol. Used only with \
+            basic type of the algorithm and symbol size 1",
+    )
+
+    parser.add_argument(
+        "--run_length",
+        action="store_true",
+        default=False,
+        help="Replace repeated symbols with run-length tokens before encoding",
+    )
+
+    parser.add_argument(
+        "--index_interval",
+        metavar="N",
+        type=positive_int,
+        default=None,
+        help="Save index of every N-th symbol, which allows to decode parts of the file. The \
+            file is never saved in stored format instead. Used only with basic type of the \
+            algorithm, without other features",
+    )
+
+    parser.add_argument(
+        "--streams",
+        metavar="N",
+        type=positive_int,
+        default=None,
+        help="Encode symbols in N interleaved streams of known lengths, which are decoded faster. \
+            Used only with basic type of the algorithm, without context model and index",
+    )
+
+    parser.add_argument(
+        "--memory_budget",
+        metavar="MIB",
+        type=positive_int,
+        default=None,
+        help="Count symbols within about MIB mebibytes of memory, spilling partial counts to \
+            temporary files. Codes of all distinct symbols are still kept in memory. Used only \
+            with basic type of the algorithm, without context model",
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        default=False,
+        help="Save state of the encoder at the end of encoded files, so that data can be appended \
+            to them with --append. Used only with adaptive type of the algorithm",
+    )
+
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        default=False,
+        help="Append files to their destinations encoded with --checkpoint, instead of \
+            overwriting them. Used only with adaptive type of the algorithm",
+    )
+
+    parser.add_argument(
+        "-w",
+        "--workers",
         type=positive_int,
         default=1,
-        help="Size of symbols that will be encoded in bytes. Needs to be a positive number",
+        help="Number of processes counting and encoding ranges of every file. Used only with \
+            basic type of the algorithm, encoded files don't depend on it",
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        metavar="BLOCK_SIZE",
+        type=positive_int,
+        nargs="?",
+        const=DEFAULT_BLOCK_SIZE,
+        default=None,
+        help="Read and write files in blocks of BLOCK_SIZE bytes in background threads, so that \
+            disk access overlaps with encoding, and report if it was I/O-bound or CPU-bound. \
+            BLOCK_SIZE defaults to %(const)s",
     )
 
     parser.add_argument(
@@ -73,11 +187,37 @@ def get_args() -> argparse.Namespace:
         default=False,
         help="Show more details about execution",
     )
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-if __name__ == "__main__":
-    args = get_args()
+def archive_files(args: argparse.Namespace):
+    files = []
+    for file in args.files:
+        if not file.is_file():
+            if args.is_verbose:
+                print(f"Path {file} is not a file or doesn't exist. It has been skipped.")
+            continue
+        files.append(file)
+    symbol_size = args.symbol_size
+    if symbol_size == AUTO_SYMBOL_SIZE:
+        symbol_size = 1
+    try:
+        create_archive(files, args.archive, symbol_size)
+    except ValueError as error:
+        print(f"{error}. Archive {args.archive} has not been created.")
+
+
+def main(argv: list[str] | None = None):
+    """
+    Run the tool with given arguments
+
+    :param argv: Arguments of the tool, arguments of the process if omitted
+    :type argv: list[str] | None
+    """
+    args = get_args(argv)
+    if args.archive is not None:
+        archive_files(args)
+        return
     file: Path
     destination: Path | None
     for file, destination in zip_longest(args.files, args.destinations):
@@ -105,9 +245,58 @@ if __name__ == "__main__":
                 )
             destination = file
         destination = destination.with_suffix(".huf")  # replace extension for new file
+        pipeline = Pipeline(args.pipeline) if args.pipeline is not None else None
         if args.type == TYPE_CHOICES[0]:  # basic Huffman
-            basic_encode(file, destination, args.symbol_size)
+            symbol_size = args.symbol_size
+            if symbol_size == AUTO_SYMBOL_SIZE:
+                symbol_size = select_symbol_size(file)
+                if args.is_verbose:
+                    print(f"Symbol size {symbol_size} was chosen for file {file}.")
+            if args.context_model and (
+                symbol_size != 1 or args.run_length or args.streams is not None
+            ):
+                print(
+                    (
+                        "Context model requires symbol size 1 and can't be used with run-length "
+                        f"tokens or interleaved streams. File {file} has been skipped."
+                    )
+                )
+                continue
+            memory_budget = args.memory_budget * 2**20 if args.memory_budget is not None else None
+            basic_encode(
+                file,
+                destination,
+                symbol_size,
+                transform=args.transform,
+                context_model=args.context_model,
+                run_length=args.run_length,
+                index_interval=args.index_interval,
+                streams=args.streams,
+                workers=args.workers,
+                pipeline=pipeline,
+                memory_budget=memory_budget,
+            )
         elif args.type == TYPE_CHOICES[1]:
-            adaptive_encode(file, destination)
+            if args.append:
+                try:
+                    adaptive_append(file, destination, pipeline)
+                except (OSError, ValueError) as error:
+                    print(f"{error}. File {file} has been skipped.")
+            else:
+                adaptive_encode(
+                    file,
+                    destination,
+                    run_length=args.run_length,
+                    pipeline=pipeline,
+                    checkpoint=args.checkpoint,
+                )
+        elif args.type == TYPE_CHOICES[2]:
+            tans_encode(file, destination)
         else:
             print("Unkown algorithm type option")
+        if pipeline is not None:
+            print(f"{file}: {pipeline.report()}")
+
+
+if __name__ == "__main__":
+    main()
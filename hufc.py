@@ -0,0 +1,66 @@
+"""
+Thin client running huf.py and unhuf.py in the daemon started with hufd.py. Tools are run
+in the current process if the daemon is not running.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from src.daemonClient import DEFAULT_SOCKET, send_request
+
+TOOLS = ["huf", "unhuf"]
+COMMANDS = TOOLS + ["metrics", "stop"]
+
+
+def get_args() -> argparse.Namespace:
+    """
+    Instantiate argument parser and parse execution arguments
+
+    :return: Namespace containing parsed execution arguments
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Send jobs to the daemon started with hufd.py",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "-s", "--socket", type=Path, default=DEFAULT_SOCKET, help="Path of the socket"
+    )
+    parser.add_argument(
+        "command",
+        choices=COMMANDS,
+        help="Tool to run, 'metrics' to show metrics of the daemon or 'stop' to stop it",
+    )
+    parser.add_argument(
+        "argv",
+        nargs=argparse.REMAINDER,
+        help="Arguments of the tool, the same as arguments of huf.py or unhuf.py",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = get_args()
+    if args.command in TOOLS:
+        request = {"command": "run", "tool": args.command, "argv": args.argv, "cwd": os.getcwd()}
+    elif args.command == "metrics":
+        request = {"command": "metrics"}
+    else:
+        request = {"command": "shutdown"}
+
+    try:
+        response = send_request(request, args.socket)
+    except OSError:
+        if args.command not in TOOLS:
+            raise SystemExit(f"Daemon is not running at {args.socket}")
+        importlib.import_module(args.command).main(args.argv)
+        raise SystemExit()
+
+    if args.command == "metrics":
+        print(json.dumps(response, indent=4))
+    else:
+        sys.stdout.write(response.get("output", ""))
+        raise SystemExit(response["status"])
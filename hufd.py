@@ -0,0 +1,54 @@
+"""
+Daemon running huf.py and unhuf.py jobs sent by hufc.py
+"""
+import argparse
+from pathlib import Path
+
+import huf
+import unhuf
+from src.daemon import Daemon
+from src.daemonClient import DEFAULT_SOCKET
+
+
+def get_args() -> argparse.Namespace:
+    """
+    Instantiate argument parser and parse execution arguments
+
+    :return: Namespace containing parsed execution arguments
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Run encoding and decoding jobs sent over a Unix domain socket",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "-s", "--socket", type=Path, default=DEFAULT_SOCKET, help="Path of the socket"
+    )
+
+    def positive_int(text: str):
+        val = int(text)
+        if val <= 0:
+            raise argparse.ArgumentTypeError(f"{val} is not a valid value for positive integer")
+        return val
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=positive_int,
+        default=None,
+        help="Number of worker processes. Defaults to number of processors",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = get_args()
+    try:
+        daemon = Daemon({"huf": huf.main, "unhuf": unhuf.main}, args.socket, args.workers)
+    except OSError as error:
+        raise SystemExit(str(error))
+    with daemon:
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,18 +1,22 @@
-from collections import defaultdict
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
+from tempfile import TemporaryDirectory
 import os
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import imageio.v2 as imageio
 
-from src.utility import read_n_bytes
+from src.utility import read_symbols
 from src.HuffmanTree import HuffmanTree
 from src.basicHuffman import encode as basic_encode, decode as basic_decode, \
                              count_symbols, counts_to_nodes, build_tree
 from src.adaptiveHuffman import encode as adaptive_encode, \
                                 decode as adaptive_decode
+from src.tans import encode as tans_encode, decode as tans_decode, \
+                     read_info as tans_read_info
+from src.transform import med_forward
 
 
 def plot_histogram(file_name, file_path, save_path=None):
@@ -39,12 +43,19 @@ def calculate_entropy(symbols: dict) -> float:
 
 
 def local_count_symbols(filepath: Path, block_size: int = 1) -> dict:
-    symbols = defaultdict(int)
-    for block in read_n_bytes(filepath=filepath, n=block_size):
-        symbols[block] += 1
+    symbols = Counter()
+    for block in read_symbols(filepath=filepath, symbol_size=block_size):
+        symbols.update(block)
     return symbols
 
 
+def calculate_entropy_med(filepath: Path) -> float:
+    with TemporaryDirectory() as directory:
+        residuals = Path(directory).joinpath(filepath.name)
+        med_forward(filepath, residuals)
+        return calculate_entropy(local_count_symbols(residuals))
+
+
 def measure_time_encode_basic(file_target: Path, file_destination: Path
                               ) -> float:
     time = 0
@@ -94,13 +105,37 @@ def measure_time_decode_adaptive(file_target: Path, file_destination: Path
     return time / 5
 
 
+def measure_time_encode_tans(file_target: Path, file_destination: Path
+                             ) -> float:
+    time = 0
+    for _ in range(5):
+        time_start = datetime.now()
+        tans_encode(src=Path(file_target),
+                    dst=Path(file_destination))
+        time_end = datetime.now()
+        time += (time_end - time_start).total_seconds()
+    return time / 5
+
+
+def measure_time_decode_tans(file_target: Path, file_destination: Path
+                             ) -> float:
+    time = 0
+    for _ in range(5):
+        time_start = datetime.now()
+        tans_decode(src=Path(file_target),
+                    dst=Path(file_destination))
+        time_end = datetime.now()
+        time += (time_end - time_start).total_seconds()
+    return time / 5
+
+
 def calculate_bitrate_basic(filepath: Path, symbol_size: int = 1
                             ) -> float:
     symbols_counts = count_symbols(filepath, symbol_size)
     leaves = counts_to_nodes(symbols_counts)
     encoding_tree = build_tree(leaves)
     encodings = encoding_tree.get_codings()
-    symbols_counts = local_count_symbols(filepath)
+    symbols_counts = local_count_symbols(filepath, symbol_size)
 
     all_symbols = sum(symbols_counts.values())
     bitrate = 0
@@ -113,8 +148,9 @@ def calculate_bitrate_basic(filepath: Path, symbol_size: int = 1
 
 def calculate_bitrate_adaptive(filepath: Path) -> float:
     tree = HuffmanTree()
-    for byte in read_n_bytes(filepath):
-        tree.encode(byte)
+    for block in read_symbols(filepath):
+        for byte in block:
+            tree.encode(byte)
 
     return tree.bitrate()
 
@@ -125,19 +161,29 @@ if __name__ == "__main__":
     times_encode_adaptive = []
     times_decode_basic = []
     times_decode_adaptive = []
+    times_encode_tans = []
+    times_decode_tans = []
 
     entropy_1B = []
     entropy_2B = []
     entropy_3B = []
+    entropy_med = []
 
     bitrate_basic = []
     bitrate_adaptive = []
+    bitrate_tans = []
 
     filesizes = []
     filesizes_basic = []
     filesizes_adaptive = []
+    filesizes_tans = []
+    filesizes_basic_med = []
+    filesizes_basic_context = []
     cr_basic = []
+    cr_basic_med = []
+    cr_basic_context = []
     cr_adaptive = []
+    cr_tans = []
 
     DATA_DIR = Path("data")
     RESULTS_DIR = Path("results")
@@ -175,6 +221,19 @@ if __name__ == "__main__":
                 file_destination=DECODING_RESULTS.joinpath(file.name),
             )
         )
+        file_med = ENCODING_RESULTS.joinpath(f"{file.stem}_med{file.suffix}")
+        basic_encode(filepath=file, new_filepath=file_med, symbol_size=1,
+                     transform=True)
+        file_size_basic_med = os.path.getsize(file_med)
+        filesizes_basic_med.append(file_size_basic_med)
+        cr_basic_med.append(file_size_basic_med / file_size)
+        file_context = ENCODING_RESULTS.joinpath(
+            f"{file.stem}_context{file.suffix}")
+        basic_encode(filepath=file, new_filepath=file_context, symbol_size=1,
+                     context_model=True)
+        file_size_basic_context = os.path.getsize(file_context)
+        filesizes_basic_context.append(file_size_basic_context)
+        cr_basic_context.append(file_size_basic_context / file_size)
         times_encode_adaptive.append(
             measure_time_encode_adaptive(
                 file_target=file,
@@ -191,10 +250,28 @@ if __name__ == "__main__":
                 file_destination=DECODING_RESULTS.joinpath(file.name),
             )
         )
+        file_tans = ENCODING_RESULTS.joinpath(f"{file.stem}_tans{file.suffix}")
+        times_encode_tans.append(
+            measure_time_encode_tans(
+                file_target=file,
+                file_destination=file_tans
+            )
+        )
+        file_size_tans = os.path.getsize(file_tans)
+        filesizes_tans.append(file_size_tans)
+        cr_tans.append(file_size_tans / file_size)
+        bitrate_tans.append(tans_read_info(file_tans).bit_rate)
+        times_decode_tans.append(
+            measure_time_decode_tans(
+                file_target=file_tans,
+                file_destination=DECODING_RESULTS.joinpath(file.name),
+            )
+        )
 
         entropy_1B.append(calculate_entropy(local_count_symbols(file, 1)))
         entropy_2B.append(calculate_entropy(local_count_symbols(file, 2)))
         entropy_3B.append(calculate_entropy(local_count_symbols(file, 3)))
+        entropy_med.append(calculate_entropy_med(file))
 
     times_data = {
         "Filename": filenames,
@@ -202,6 +279,8 @@ if __name__ == "__main__":
         "Decode basic [s]": times_decode_basic,
         "Encode adaptive [s]": times_encode_adaptive,
         "Decode adaptive [s]": times_decode_adaptive,
+        "Encode tANS [s]": times_encode_tans,
+        "Decode tANS [s]": times_decode_tans,
     }
     times = pd.DataFrame(times_data)
 
@@ -210,6 +289,7 @@ if __name__ == "__main__":
         "Entropy 1B": entropy_1B,
         "Entropy 2B": entropy_2B,
         "Entropy 3B": entropy_3B,
+        "Entropy MED residuals": entropy_med,
     }
     entr = pd.DataFrame(entropy_data)
 
@@ -218,6 +298,7 @@ if __name__ == "__main__":
         "Entropy": entropy_1B,
         "Bitrate basic": bitrate_basic,
         "Bitrate adaptive": bitrate_adaptive,
+        "Bitrate tANS": bitrate_tans,
     }
     bitrate = pd.DataFrame(bitrate_data)
 
@@ -226,8 +307,14 @@ if __name__ == "__main__":
         "File size [B]": filesizes,
         "Size basic [B]": filesizes_basic,
         "Size adaptive [B]": filesizes_adaptive,
+        "Size tANS [B]": filesizes_tans,
+        "Size basic MED [B]": filesizes_basic_med,
+        "Size basic context [B]": filesizes_basic_context,
         "Compression rate basic": cr_basic,
         "Compression rate adaptive": cr_adaptive,
+        "Compression rate tANS": cr_tans,
+        "Compression rate basic MED": cr_basic_med,
+        "Compression rate basic context": cr_basic_context,
     }
     cr = pd.DataFrame(cr_data)
 
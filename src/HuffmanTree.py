@@ -1,10 +1,38 @@
-from typing import Union
+import struct
+from typing import Callable, Iterable, Union
 from bitarray import bitarray
+from bitarray.util import int2ba
 from src.node import Node, ChildSide
+from src.utility import SYMBOL_BYTEORDER, symbols2bytes
+
+
+#   checkpoint structure:
+#   1 byte: size of symbols (s)
+#   4 bytes: number of nodes
+#   nodes ordered by their positions:
+#       1 byte: type of the node
+#       8 bytes: weight
+#       internal node: 4 bytes: position of the left child, 4 bytes: position of the right child
+#       symbol node: s bytes: bytes of the symbol, in the order of encoded contents
+#   other numbers are big-endian
+
+INTERNAL_NODE = 0
+SYMBOL_NODE = 1
+NYT_NODE = 2
+EOF_NODE = 3
+
+_CHECKPOINT_HEADER = struct.Struct(">BI")
+_NODE = struct.Struct(">BQ")
+_CHILDREN = struct.Struct(">II")
+
+
+def _code_to_ba(code: int, length: int) -> bitarray:
+    return int2ba(code, length) if length > 0 else bitarray()
 
 
 class HuffmanTree:
-    def __init__(self, eof=True):
+    def __init__(self, eof=True, symbol_size=1):
+        self.symbol_size = symbol_size
         self.NYT = Node()
         self.nodes = [self.NYT]  # attribute
         if eof:
@@ -12,39 +40,152 @@ class HuffmanTree:
             self._new_leaf(self.EOF)
             self._increment(self.EOF)
         self.active_node = self.nodes[0]
-        self.leafs = {}
+        self.leafs: dict[int, Node] = {}
+        # Bits of a new symbol that did not fit in the previously decoded chunk
+        self.pending = bitarray()
 
         self.sum_weights = 0
         self.sum_code_lens = 0
 
+    def checkpoint(self) -> bytes:
+        """
+        Serializes state of the tree, which can be restored with `from_checkpoint`
+
+        Returns:
+            bytes: Checkpoint of the tree
+        """
+        data = bytearray(_CHECKPOINT_HEADER.pack(self.symbol_size, len(self.nodes)))
+        for node in self.nodes:
+            left, right = node.children
+            if left is not None and right is not None:
+                data += _NODE.pack(INTERNAL_NODE, node.weight)
+                data += _CHILDREN.pack(left.pos, right.pos)
+            elif node is self.NYT:
+                data += _NODE.pack(NYT_NODE, node.weight)
+            elif node.symbol is None:
+                data += _NODE.pack(EOF_NODE, node.weight)
+            else:
+                data += _NODE.pack(SYMBOL_NODE, node.weight)
+                data += node.symbol.to_bytes(self.symbol_size, byteorder=SYMBOL_BYTEORDER)
+        return bytes(data)
+
+    @classmethod
+    def from_checkpoint(cls, data: bytes) -> "HuffmanTree":
+        """
+        Restores a tree saved with `checkpoint`, encoding or decoding with it continues where
+        it stopped
+
+        Args:
+            data (bytes): Checkpoint of the tree
+
+        Raises:
+            ValueError: Raised if data is not a valid checkpoint
+
+        Returns:
+            HuffmanTree: Restored tree
+        """
+        try:
+            symbol_size, n_nodes = _CHECKPOINT_HEADER.unpack_from(data)
+            tree = cls(eof=False, symbol_size=symbol_size)
+            tree.nodes = [Node() for _ in range(n_nodes)]
+            offset = _CHECKPOINT_HEADER.size
+            for pos, node in enumerate(tree.nodes):
+                node.pos = pos
+                node_type, node.weight = _NODE.unpack_from(data, offset)
+                offset += _NODE.size
+                if node_type == INTERNAL_NODE:
+                    left, right = _CHILDREN.unpack_from(data, offset)
+                    offset += _CHILDREN.size
+                    # Children are placed after their parents
+                    if not pos < left < n_nodes or not pos < right < n_nodes:
+                        raise ValueError("Invalid position of a child")
+                    node.set_child(tree.nodes[left], ChildSide.LEFT)
+                    node.set_child(tree.nodes[right], ChildSide.RIGHT)
+                elif node_type == SYMBOL_NODE:
+                    symbol_bytes = data[offset : offset + symbol_size]
+                    if len(symbol_bytes) < symbol_size:
+                        raise ValueError("Checkpoint is truncated")
+                    offset += symbol_size
+                    node.symbol = int.from_bytes(symbol_bytes, byteorder=SYMBOL_BYTEORDER)
+                    tree.leafs[node.symbol] = node
+                elif node_type == NYT_NODE:
+                    tree.NYT = node
+                elif node_type == EOF_NODE:
+                    tree.EOF = node
+                else:
+                    raise ValueError(f"Unknown type of node: {node_type}")
+        except struct.error as error:
+            raise ValueError("Checkpoint is truncated") from error
+        if offset != len(data) or not tree.nodes or tree.nodes[-1] is not tree.NYT:
+            raise ValueError("Invalid checkpoint")
+        tree.active_node = tree.nodes[0]
+        return tree
+
     def bitrate(self):
         return self.sum_code_lens / self.sum_weights
 
     def encode_eof(self):
-        return self._encode_node(self.EOF)
+        return _code_to_ba(*self.eof_code())
 
-    def encode(self, symbol):
+    def eof_code(self) -> tuple[int, int]:
+        """
+        Returns:
+            tuple[int, int]: Code of the end of file as an unsigned integer and its length
+        """
+        return self._node_code(self.EOF)
+
+    def encode(self, symbol: int):
+        return _code_to_ba(*self.encode_code(symbol))
+
+    def encode_code(self, symbol: int) -> tuple[int, int]:
+        """
+        Encodes a symbol without creating bitarrays and updates the tree
+
+        Args:
+            symbol (int): Symbol as unsigned integer
+
+        Returns:
+            tuple[int, int]: Code of the symbol as an unsigned integer, followed by bytes of the
+            symbol if it is new, and length of the code
+        """
         if symbol in self.leafs:
             node = self.leafs[symbol]
-            code = self._encode_node(node)
+            code, length = self._node_code(node)
         else:
-            code = self._encode_node(self.NYT)
-            code.frombytes(symbol)
+            code, length = self._node_code(self.NYT)
+            symbol_bytes = symbol.to_bytes(length=self.symbol_size, byteorder=SYMBOL_BYTEORDER)
+            code = code << 8 * self.symbol_size | int.from_bytes(symbol_bytes, byteorder="big")
+            length += 8 * self.symbol_size
             node = self._new_leaf(Node(0, symbol=symbol))
         self.sum_weights += 1
-        self.sum_code_lens += len(code)
+        self.sum_code_lens += length
         self._increment(node)
 
-        return code
+        return code, length
+
+    def encode_symbols(self, symbols: Iterable[int], write: Callable[[int, int], None]):
+        """
+        Encodes symbols and updates the tree
+
+        Args:
+            symbols (Iterable[int]): Symbols as unsigned integers
+            write (Callable[[int, int], None]): Function called with code of every symbol as an
+                unsigned integer and its length, like `BitWriter.write`
+        """
+        encode_code = self.encode_code
+        for symbol in symbols:
+            write(*encode_code(symbol))
 
-    def _encode_node(self, n: Node):
-        code = ""
+    def _node_code(self, n: Node) -> tuple[int, int]:
+        code = 0
+        length = 0
         while n.parent:
-            code = str(n.side.value) + code
+            code |= n.side.value << length
+            length += 1
             n = n.parent
-        return bitarray(code)
+        return code, length
 
-    def decode(self, encoding: bitarray) -> tuple[Union[bytes, None], int, bool]:
+    def decode(self, encoding: bitarray) -> tuple[Union[int, None], int, bool]:
         """
         Decodes a single encoded symbol
 
@@ -52,28 +193,32 @@ class HuffmanTree:
             encoding (bitarray): Array of bits containing the encoded symbol
 
         Returns:
-            tuple[bytes | None, int, bool]: Tuple containing: decoded symbol, number of bits used in decoding, value of EOF flag
+            tuple[int | None, int, bool]: Tuple containing: decoded symbol, number of bits used in decoding, value of EOF flag
         """
-        for cursor, child in enumerate(encoding):
-            self.active_node = self.active_node.children[child]
+        cursor = 0
+        while self.active_node != self.NYT:
+            if cursor >= len(encoding):
+                return None, cursor, False
+            self.active_node = self.active_node.children[encoding[cursor]]
 
             if self.active_node == self.EOF:
                 return None, cursor, True
-            if self.active_node == self.NYT:
-                cursor += 1
-                symbol = encoding[cursor : cursor + 8].tobytes()
-                cursor += 8
-                self._new_leaf(Node(0, symbol=symbol))
-            elif self.active_node.symbol is not None:
-                cursor += 1
+            cursor += 1
+            if self.active_node.symbol is not None:
                 symbol = self.active_node.symbol
-            else:
-                continue
+                self._increment(self.leafs[symbol])
+                self.active_node = self.nodes[0]
+                return symbol, cursor, False
 
-            self._increment(self.leafs[symbol])
-            self.active_node = self.nodes[0]
-            return symbol, cursor, False
-        return None, 0, False
+        symbol_bits = 8 * self.symbol_size
+        if len(encoding) - cursor < symbol_bits:
+            return None, cursor, False
+        symbol_bytes = encoding[cursor : cursor + symbol_bits].tobytes()
+        symbol = int.from_bytes(symbol_bytes, byteorder=SYMBOL_BYTEORDER)
+        cursor += symbol_bits
+        self._increment(self._new_leaf(Node(0, symbol=symbol)))
+        self.active_node = self.nodes[0]
+        return symbol, cursor, False
 
     def decode_chunk(self, chunk: bitarray):
         """
@@ -83,16 +228,18 @@ class HuffmanTree:
             chunk (bitarray): Array of bits containing encoded symbols
 
         Returns:
-            tuple[bitarray, bool]: Tuple containing: decoded symbols, value of EOF flag
+            tuple[bytes, bool]: Tuple containing: bytes of decoded symbols, value of EOF flag
         """
-        content = b""
+        chunk = self.pending + chunk
+        symbols = []
         cursor = 0
         symbol, offset, is_eof = self.decode(chunk)
         while symbol is not None:
             cursor += offset
-            content += symbol
+            symbols.append(symbol)
             symbol, offset, is_eof = self.decode(chunk[cursor:])
-        return content, is_eof
+        self.pending = chunk[cursor + offset :]
+        return symbols2bytes(symbols, self.symbol_size), is_eof
 
     def _new_leaf(self, leaf):
         nyt = self.nodes[-1]
@@ -107,7 +254,7 @@ class HuffmanTree:
         self.nodes[-1] = parent
         self.nodes.append(leaf)
         self.nodes.append(nyt)
-        if leaf.symbol:
+        if leaf.symbol is not None:
             self.leafs[leaf.symbol] = leaf
         return leaf
 
@@ -1,59 +1,296 @@
+import os
+import struct
+from collections import Counter
+from importlib.util import find_spec
+from itertools import chain
 from math import ceil
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator
 
 from bitarray import bitarray
-from bitarray.util import int2ba
 
+from src.bitWriter import BitWriter
+from src.fileInfo import FileInfo, histogram_info
 from src.HuffmanTree import HuffmanTree
-from src.utility import bytes2ba, read_n_bytes
+from src.pipeline import Pipeline, optional_reader, optional_writer
+from src.runLength import RunLengthDecoder, decoded_size, run_length_tokens
+from src.utility import (
+    SYMBOL_BYTEORDER,
+    bytes2ba,
+    bytes2symbols,
+    make_first_byte,
+    read_algorithm_identifier,
+    read_symbols,
+)
+
+if TYPE_CHECKING:
+    from src.arrayHuffmanTree import ArrayHuffmanTree
 
 ADAPTIVE_HUFFMAN = 1
+ADAPTIVE_HUFFMAN_EXTENDED = 6
+
+# Flags of extended format
+RUN_LENGTH = 1  # encoded symbols are 2 byte run-length tokens
+CHECKPOINT = 2  # file ends with a checkpoint of the tree, which allows to append data
 
 #   encoded file structure:
 #   header: 1 byte: 1 bit to specify algorithm, 7 bits to specify how many bits are taken by encoded extension (n)
 #   encoded extension: ceil(n/8) bytes
 #   encoded contents: until EOF
+#
+#   extended format structure:
+#   header: 1 byte: 1 bit set to 0, 3 bits of padding 0s, 4 bits to specify format type (3)
+#           1 byte of flags specifying features used in encoding
+#           1 byte to specify how many bits are taken by encoded extension (n)
+#   encoded extension: ceil(n/8) bytes
+#   encoded contents: until EOF, padded to whole bytes
+#   checkpoint trailer (if CHECKPOINT flag is set):
+#       checkpoint of the tree after encoding the last symbol (see HuffmanTree.py): k bytes
+#       8 bytes: position of the first bit of EOF code in the file
+#       4 bytes: k
+
+_CHECKPOINT_FOOTER = struct.Struct(">QI")
+
+# Loops of ArrayHuffmanTree are faster than HuffmanTree only when they are compiled by Numba,
+# which is imported only when the tree is used
+USE_ARRAY_TREE = find_spec("numba") is not None
+
+
+def _tree_class() -> "type[HuffmanTree | ArrayHuffmanTree]":
+    if USE_ARRAY_TREE:
+        from src.arrayHuffmanTree import ArrayHuffmanTree
+
+        return ArrayHuffmanTree
+    return HuffmanTree
+
+
+def _read_symbols(src: Path, run_length: bool, pipeline: Pipeline | None) -> Iterator[int]:
+    chunks = read_symbols(src) if pipeline is None else pipeline.read_symbols(src)
+    if run_length:
+        chunks = (bytes2symbols(tokens, 2) for tokens in run_length_tokens(chunks))
+    return chain.from_iterable(chunks)
+
+
+def _encode_contents(
+    writer: BitWriter, tree: "HuffmanTree | ArrayHuffmanTree", symbols: Iterable[int]
+) -> int:
+    """
+    Writes codes of symbols followed by EOF code
+
+    Returns:
+        int: Number of bits written before EOF code
+    """
+    tree.encode_symbols(symbols, writer.write)
+    eof_position = len(writer)
+    writer.write(*tree.eof_code())
+    writer.finish()
+    return eof_position
+
+
+def _write_checkpoint(file: BinaryIO, tree: "HuffmanTree | ArrayHuffmanTree", eof_position: int):
+    checkpoint = tree.checkpoint()
+    file.write(checkpoint)
+    file.write(_CHECKPOINT_FOOTER.pack(eof_position, len(checkpoint)))
+
+
+def _read_checkpoint(file: BinaryIO) -> tuple[bytes, int]:
+    """
+    Returns:
+        tuple[bytes, int]: Checkpoint of the tree from the trailer of the file and position of
+        the first bit of EOF code
+    """
+    file.seek(-_CHECKPOINT_FOOTER.size, os.SEEK_END)
+    eof_position, checkpoint_size = _CHECKPOINT_FOOTER.unpack(file.read(_CHECKPOINT_FOOTER.size))
+    file.seek(-_CHECKPOINT_FOOTER.size - checkpoint_size, os.SEEK_END)
+    return file.read(checkpoint_size), eof_position
 
 
-def encode(src: Path, dst: Path):
-    tree = HuffmanTree()
-    encoded = bitarray()
-    with open(dst, "wb") as dst_file:
+def encode(
+    src: Path,
+    dst: Path,
+    run_length: bool = False,
+    pipeline: Pipeline | None = None,
+    checkpoint: bool = False,
+):
+    """
+    Encodes file with adaptive Huffman algorithm
+
+    Args:
+        src (Path): Path to the file to encode
+        dst (Path): Path where encoded file will be saved
+        run_length (bool, optional): Replace repeated bytes with run-length tokens before
+            encoding. Defaults to False.
+        pipeline (Pipeline | None, optional): If given, the file is read and the encoded file is
+            written by background threads of the pipeline. Defaults to None.
+        checkpoint (bool, optional): Save state of the tree at the end of the encoded file, so
+            that data can be appended to it with `append`. Defaults to False.
+    """
+    tree = _tree_class()(symbol_size=2 if run_length else 1)
+    symbols = _read_symbols(src, run_length, pipeline)
+    extension = src.suffix.encode()
+    if run_length:
+        extension = bytes2symbols(b"".join(run_length_tokens([extension])), 2)
+    flags = (RUN_LENGTH if run_length else 0) | (CHECKPOINT if checkpoint else 0)
+
+    with open(dst, "wb") as file, optional_writer(file, pipeline) as dst_file:
         encoding = bitarray()
-        for character in src.suffix:
-            encoding += tree.encode(character.encode())
-        header = bitarray([ADAPTIVE_HUFFMAN])
-        header.extend(int2ba(len(encoding), 7))
+        for character in extension:
+            encoding += tree.encode(character)
+        if flags:
+            header = make_first_byte(ADAPTIVE_HUFFMAN_EXTENDED)
+            header += flags.to_bytes(length=1, byteorder="big")
+            header += len(encoding).to_bytes(length=1, byteorder="big")
+        else:
+            header = bytes([ADAPTIVE_HUFFMAN << 7 | len(encoding)])
         dst_file.write(header)
-        dst_file.write(encoding)
-        encoding.clear()
+        # Padding of the extension is zeroed, so encoded files are reproducible
+        encoding_bytes = encoding.tobytes()
+        dst_file.write(encoding_bytes)
+
+        eof_position = _encode_contents(BitWriter(dst_file), tree, symbols)
+        if checkpoint:
+            contents_start = len(header) + len(encoding_bytes)
+            _write_checkpoint(dst_file, tree, 8 * contents_start + eof_position)
+
+
+def append(src: Path, dst: Path, pipeline: Pipeline | None = None):
+    """
+    Appends contents of a file to a file encoded with adaptive Huffman algorithm and a
+    checkpoint. Encoding continues from the saved state of the tree, so only appended data is
+    read. Decoding the result gives concatenation of both files.
+
+    Args:
+        src (Path): Path to the file to append
+        dst (Path): File encoded with a checkpoint, it is modified in place
+        pipeline (Pipeline | None, optional): If given, the file is read and encoded data is
+            written by background threads of the pipeline. Defaults to None.
+
+    Raises:
+        ValueError: Raised if `dst` was not encoded with a checkpoint
+    """
+    with open(dst, "r+b") as file:
+        header = file.read(2)
+        if (
+            len(header) < 2
+            or read_algorithm_identifier(header) != ADAPTIVE_HUFFMAN_EXTENDED
+            or not header[1] & CHECKPOINT
+        ):
+            raise ValueError(f"{dst} was not encoded with a checkpoint")
+        checkpoint, eof_position = _read_checkpoint(file)
+        tree = _tree_class().from_checkpoint(checkpoint)
+        # EOF code and the trailer are overwritten, bits before EOF in its byte are kept
+        start, n_bits = divmod(eof_position, 8)
+        file.seek(start)
+        last_bits = file.read(1)[0] >> 8 - n_bits if n_bits else 0
+        file.seek(start)
+
+        symbols = _read_symbols(src, bool(header[1] & RUN_LENGTH), pipeline)
+        with optional_writer(file, pipeline) as dst_file:
+            writer = BitWriter(dst_file)
+            writer.write(last_bits, n_bits)
+            eof_position = _encode_contents(writer, tree, symbols)
+            _write_checkpoint(dst_file, tree, 8 * start + eof_position)
+        file.truncate()
 
-        for byte in read_n_bytes(src):
-            encoded += tree.encode(byte)
-            if len(encoded) >= 2**10:
-                dst_file.write(encoded[: 2**10])
-                encoded = encoded[2**10 :]
 
-        encoded += tree.encode_eof()
-        dst_file.write(encoded)
+def read_info(src: Path) -> FileInfo:
+    """
+    Reads sizes of the file encoded with adaptive Huffman algorithm. Statistics of contents and
+    original size are read from weights of the tree in the checkpoint, if the file has one.
 
+    Args:
+        src (Path): Encoded file
 
-def decode(src: Path, dst: Path):
-    tree = HuffmanTree()
+    Raises:
+        ValueError: Raised if file was not encoded with adaptive Huffman algorithm
+
+    Returns:
+        FileInfo: Info of the file
+    """
+    compressed_size = src.stat().st_size
+    with open(src, "rb") as file:
+        header = file.read(1)
+        flags = 0
+        identifier = read_algorithm_identifier(header)
+        if identifier == ADAPTIVE_HUFFMAN_EXTENDED:
+            flags = file.read(1)[0]
+            ext_len = file.read(1)[0]
+        elif identifier == ADAPTIVE_HUFFMAN:
+            ext_len = header[0] & 127
+        else:
+            raise ValueError("File was not encoded with adaptive Huffman algorithm")
+        symbol_size = 2 if flags & RUN_LENGTH else 1
+        if not flags & CHECKPOINT:
+            return FileInfo("adaptive Huffman", compressed_size, symbol_size=symbol_size)
+
+        encoded_extension = bytes2ba(file.read(ceil(ext_len / 8)))[:ext_len]
+        contents_start = file.tell()
+        checkpoint, eof_position = _read_checkpoint(file)
+
+    tree = HuffmanTree.from_checkpoint(checkpoint)
+    counts = Counter({symbol: leaf.weight for symbol, leaf in tree.leafs.items()})
+    # Weights include symbols of the extension, which is decoded with a new tree
+    extension, _ = HuffmanTree(symbol_size=symbol_size).decode_chunk(encoded_extension)
+    counts.subtract(bytes2symbols(extension, symbol_size))
+    if flags & RUN_LENGTH:
+        tokens = ((token.to_bytes(2, SYMBOL_BYTEORDER), n) for token, n in counts.items())
+        original_size = decoded_size(tokens)
+    else:
+        original_size = counts.total()
+    return histogram_info(
+        "adaptive Huffman",
+        compressed_size,
+        original_size,
+        symbol_size,
+        list(counts.values()),
+        eof_position - 8 * contents_start,
+    )
+
+
+def decode(src: Path, dst: Path, pipeline: Pipeline | None = None):
+    """
+    Decodes file encoded with adaptive Huffman algorithm
+
+    Args:
+        src (Path): Encoded file
+        dst (Path): Path where decoded file will be saved, its extension is replaced with the
+            extension of the original file
+        pipeline (Pipeline | None, optional): If given, encoded contents are read and decoded
+            file is written by background threads of the pipeline. Defaults to None.
+    """
     with open(src, "rb") as file:
-        ext_len = int.from_bytes(file.read(1), byteorder="big") & 127
+        header = file.read(1)
+        flags = 0
+        if read_algorithm_identifier(header) == ADAPTIVE_HUFFMAN_EXTENDED:
+            flags = file.read(1)[0]
+            ext_len = file.read(1)[0]
+        else:
+            ext_len = header[0] & 127
+        run_length = RunLengthDecoder() if flags & RUN_LENGTH else None
+        tree = _tree_class()(symbol_size=2 if run_length else 1)
+
         ext_enc = file.read(ceil(ext_len / 8))
         ext_enc = bytes2ba(ext_enc)[:ext_len]
         ext_chunk, is_eof = tree.decode_chunk(ext_enc)
         ext = ext_chunk
+        if run_length:
+            ext = run_length.feed(ext) + run_length.finish()
         destination = dst.with_suffix(ext.decode())
 
-        with open(destination, "wb") as dst_file:
-            while not is_eof and (chunk := file.read(2**10)) != b"":
+        with (
+            optional_reader(file, pipeline) as reader,
+            open(destination, "wb") as output,
+            optional_writer(output, pipeline) as dst_file,
+        ):
+            while not is_eof and (chunk := reader.read(2**10)) != b"":
                 encoded_chunk = bitarray()
                 encoded_chunk.frombytes(chunk)
                 ext_chunk, is_eof = tree.decode_chunk(encoded_chunk)
+                if run_length:
+                    ext_chunk = run_length.feed(ext_chunk)
                 dst_file.write(ext_chunk)
+            if run_length:
+                dst_file.write(run_length.finish())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,263 @@
+import os
+from collections import Counter
+from math import ceil
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, NamedTuple
+
+from bitarray import bitarray
+
+from src.basicHuffman import TreeDecoder, code_table, decoder, pad_counts
+from src.fileInfo import FileInfo, histogram_info
+from src.npy import counts_shape, iter_counts, save_counts
+from src.utility import bytes2ba, encode_symbols, make_first_byte, read_symbols, symbols2bytes
+
+if TYPE_CHECKING:
+    from src.flatTree import LazyDecoder
+
+#   archive file structure:
+#   header: 1 byte: 1 bit set to 0, 3 bits of padding 0s, 4 bits to specify format type (4)
+#           4 bytes to specify how many bytes are taken by symbol counts (n)
+#           4 bytes to specify number of members (m)
+#   symbol counts: n bytes, counts of symbols of all members
+#   encoded members: codes of every member, each starting at a new byte
+#   member index: for every member:
+#                 2 bytes to specify length of its name in bytes (k)
+#                 k bytes: name of the member encoded with UTF-8
+#                 8 bytes: offset of its code from the beginning of encoded members in bytes
+#                 8 bytes: length of its code in bits
+#                 8 bytes: size of the member in bytes
+#   footer: 8 bytes: offset of member index from the beginning of the file
+
+ARCHIVE = 8
+
+HEADER_SIZE = 9
+FOOTER_SIZE = 8
+
+
+class Member(NamedTuple):
+    name: str
+    offset: int
+    code_len: int
+    size: int
+
+
+def create_archive(files: list[Path], archive: Path, symbol_size: int = 1):
+    """
+    Encodes files with basic Huffman algorithm into a single archive, using codes created from
+    symbol counts of all of them
+
+    Args:
+        files (list[Path]): Files to encode
+        archive (Path): Path where archive will be saved
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+
+    Raises:
+        ValueError: Raised if some files have equal names, members are identified by names
+    """
+    names = Counter(file.name for file in files)
+    duplicates = [name for name, count in names.items() if count > 1]
+    if duplicates:
+        raise ValueError(f"Files have equal names: {', '.join(duplicates)}")
+    counts = Counter[int]()
+    for file in files:
+        for symbols in read_symbols(file, symbol_size):
+            counts.update(symbols)
+    serialized_counts = save_counts(pad_counts(list(counts.items())), symbol_size)
+    encodings, _ = code_table(serialized_counts)
+
+    members: list[Member] = []
+    with open(archive, "wb") as writer:
+        writer.write(make_first_byte(ARCHIVE))
+        writer.write(len(serialized_counts).to_bytes(length=4, byteorder="big"))
+        writer.write(len(files).to_bytes(length=4, byteorder="big"))
+        writer.write(serialized_counts)
+        contents_offset = writer.tell()
+        for file in files:
+            code = bitarray()
+            for symbols in read_symbols(file, symbol_size):
+                encode_symbols(code, encodings, symbols)
+            offset = writer.tell() - contents_offset
+            writer.write(code.tobytes())
+            members.append(Member(file.name, offset, len(code), file.stat().st_size))
+
+        index_offset = writer.tell()
+        for member in members:
+            name = member.name.encode()
+            writer.write(len(name).to_bytes(length=2, byteorder="big") + name)
+            for field in member[1:]:
+                writer.write(field.to_bytes(length=8, byteorder="big"))
+        writer.write(index_offset.to_bytes(length=8, byteorder="big"))
+
+
+def _read_table(reader: BinaryIO):
+    header = reader.read(HEADER_SIZE)
+    counts_len = int.from_bytes(header[1:5], byteorder="big")
+    return decoder(reader.read(counts_len)), HEADER_SIZE + counts_len
+
+
+def list_members(archive: Path) -> list[Member]:
+    """
+    Reads index of the archive
+
+    Args:
+        archive (Path): Archive created with `create_archive`
+
+    Returns:
+        list[Member]: Members of the archive
+    """
+    with open(archive, "rb") as reader:
+        header = reader.read(HEADER_SIZE)
+        n_members = int.from_bytes(header[5:9], byteorder="big")
+        reader.seek(-FOOTER_SIZE, os.SEEK_END)
+        reader.seek(int.from_bytes(reader.read(FOOTER_SIZE), byteorder="big"))
+        members = []
+        for _ in range(n_members):
+            name_len = int.from_bytes(reader.read(2), byteorder="big")
+            name = reader.read(name_len).decode()
+            fields = [int.from_bytes(reader.read(8), byteorder="big") for _ in range(3)]
+            members.append(Member(name, *fields))
+    return members
+
+
+def read_info(archive: Path) -> FileInfo:
+    """
+    Reads sizes of the archive and statistics of its members from its symbol counts and index
+
+    Args:
+        archive (Path): Archive created with `create_archive`
+
+    Returns:
+        FileInfo: Info of the archive, sizes of all members are added
+    """
+    members = list_members(archive)
+    with open(archive, "rb") as reader:
+        header = reader.read(HEADER_SIZE)
+        serialized_counts = reader.read(int.from_bytes(header[1:5], byteorder="big"))
+    _, symbol_size = counts_shape(serialized_counts)
+    return histogram_info(
+        "archive",
+        archive.stat().st_size,
+        sum(member.size for member in members),
+        symbol_size,
+        [count for _, count in iter_counts(serialized_counts)],
+        sum(member.code_len for member in members),
+    )
+
+
+def _extract(
+    reader: BinaryIO,
+    symbol_decoder: "TreeDecoder | LazyDecoder",
+    contents_offset: int,
+    member: Member,
+) -> bytes:
+    reader.seek(contents_offset + member.offset)
+    code = bytes2ba(reader.read(ceil(member.code_len / 8)))[: member.code_len]
+    symbols, _ = symbol_decoder.decode(code)
+    return symbols2bytes(symbols, symbol_decoder.symbol_size)[: member.size]
+
+
+def _member_path(directory: Path, name: str) -> Path:
+    """
+    Raises:
+        ValueError: Raised if name of the member is not a plain file name, which could place
+            the member outside of the directory
+
+    Returns:
+        Path: Path where the member is saved
+    """
+    if name in ("", ".", "..") or Path(name).name != name or "\\" in name:
+        raise ValueError(f"Archive member has invalid name: {name!r}")
+    return directory.joinpath(name)
+
+
+def extract_member(archive: Path, member: Member, directory: Path) -> Path:
+    """
+    Decodes a single member of the archive
+
+    Args:
+        archive (Path): Archive created with `create_archive`
+        member (Member): Member to decode, as returned by `list_members`
+        directory (Path): Directory where decoded member will be saved
+
+    Raises:
+        ValueError: Raised if name of the member contains path separators or is a relative or
+            absolute path
+
+    Returns:
+        Path: Path of decoded member
+    """
+    destination = _member_path(directory, member.name)
+    with open(archive, "rb") as reader:
+        symbol_decoder, contents_offset = _read_table(reader)
+        decoded = _extract(reader, symbol_decoder, contents_offset, member)
+    destination.write_bytes(decoded)
+    return destination
+
+
+# Table of the archive read once by every worker process of `extract_archive`
+_worker_state = {}
+
+
+def _init_worker(archive: Path, directory: Path):
+    reader = open(archive, "rb")
+    symbol_decoder, contents_offset = _read_table(reader)
+    _worker_state.update(
+        reader=reader,
+        decoder=symbol_decoder,
+        offset=contents_offset,
+        directory=directory,
+    )
+
+
+def _extract_in_worker(member: Member) -> Path:
+    decoded = _extract(
+        _worker_state["reader"],
+        _worker_state["decoder"],
+        _worker_state["offset"],
+        member,
+    )
+    destination = _member_path(_worker_state["directory"], member.name)
+    destination.write_bytes(decoded)
+    return destination
+
+
+def extract_archive(
+    archive: Path, directory: Path, names: list[str] | None = None, workers: int | None = None
+) -> list[Path]:
+    """
+    Decodes members of the archive in parallel
+
+    Args:
+        archive (Path): Archive created with `create_archive`
+        directory (Path): Directory where decoded members will be saved
+        names (list[str] | None, optional): Names of members to decode, all members are decoded
+            if omitted. Defaults to None.
+        workers (int | None, optional): Number of worker processes, members are decoded in the
+            current process if equal to 1. Defaults to None (number of processors).
+
+    Raises:
+        ValueError: Raised if name of any decoded member contains path separators or is
+            a relative or absolute path, no member is decoded then
+
+    Returns:
+        list[Path]: Paths of decoded members
+    """
+    members = list_members(archive)
+    if names is not None:
+        members = [member for member in members if member.name in names]
+    for member in members:
+        _member_path(directory, member.name)
+    if workers == 1 or len(members) <= 1:
+        _init_worker(archive, directory)
+        try:
+            return [_extract_in_worker(member) for member in members]
+        finally:
+            _worker_state.pop("reader").close()
+    # Importing process pool is slow, it is not needed by other functions
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(len(members) // (4 * workers), 1)
+    initargs = (archive, directory)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+        return list(pool.map(_extract_in_worker, members, chunksize=chunksize))
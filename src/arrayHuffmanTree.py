@@ -0,0 +1,452 @@
+from itertools import islice
+from math import ceil
+from typing import Callable, Iterable
+
+import numpy as np
+from bitarray import bitarray
+from bitarray.util import int2ba
+
+from src.HuffmanTree import (
+    _CHECKPOINT_HEADER,
+    _CHILDREN,
+    _NODE,
+    EOF_NODE,
+    INTERNAL_NODE,
+    NYT_NODE,
+    SYMBOL_NODE,
+    HuffmanTree,
+)
+from src.utility import SYMBOL_BYTEORDER
+
+try:
+    from numba import njit
+
+    JIT_AVAILABLE = True
+except ImportError:
+    JIT_AVAILABLE = False
+
+#   Array-based version of HuffmanTree. Nodes are columns of a 2D array of integers instead of
+#   Node objects, so that loops updating the tree and walking it can be compiled by Numba. The
+#   loops do exactly the same operations as methods of HuffmanTree, so encoded streams and
+#   checkpoints are identical. Without Numba the same functions run as pure Python, which is
+#   slower than HuffmanTree, so they are used only when Numba is installed.
+#
+#   Nodes are identified by indices of their columns, which don't change when nodes are
+#   swapped, positions of nodes are their indices in the ordering of the tree (HuffmanTree.nodes)
+
+# Rows of the array of nodes
+ORDER = 0  # ids of nodes by their positions
+POSITION = 1
+PARENT = 2
+SIDE = 3
+LEFT = 4  # LEFT + side is the row of the child on given side
+RIGHT = 5
+WEIGHT = 6
+SYMBOL = 7
+N_ROWS = 8
+
+# Items of the array of scalar state of the tree
+N_NODES = 0
+NYT = 1
+EOF = 2
+ACTIVE = 3  # node reached by decoding an incomplete code
+
+NO_NODE = -1
+# Leaves for every symbol are allocated up front, so larger symbols would take too much memory
+MAX_SYMBOL_SIZE = 2
+# Number of symbols converted to an array and encoded at once
+ENCODE_CHUNK = 2**15
+# Size of the buffer encoded bits are written to, in bytes
+BUFFER_SIZE = 2**16
+
+
+def _swap(nodes: np.ndarray, a: int, b: int):
+    if a == b:
+        return
+    parent_a, parent_b = nodes[PARENT, a], nodes[PARENT, b]
+    if parent_a != NO_NODE:
+        nodes[LEFT + nodes[SIDE, a], parent_a] = b
+    if parent_b != NO_NODE:
+        nodes[LEFT + nodes[SIDE, b], parent_b] = a
+    nodes[PARENT, a], nodes[PARENT, b] = parent_b, parent_a
+    nodes[SIDE, a], nodes[SIDE, b] = nodes[SIDE, b], nodes[SIDE, a]
+    i, j = nodes[POSITION, a], nodes[POSITION, b]
+    nodes[ORDER, i], nodes[ORDER, j] = b, a
+    nodes[POSITION, a], nodes[POSITION, b] = j, i
+
+
+def _increment(nodes: np.ndarray, node: int):
+    root = nodes[ORDER, 0]
+    while node != root:
+        # Slide to the position of the leader of nodes of equal weight, skipping the parent
+        parent = nodes[PARENT, node]
+        weight = nodes[WEIGHT, node]
+        leader = node
+        for position in range(nodes[POSITION, node], 0, -1):
+            other = nodes[ORDER, position]
+            if other == parent:
+                continue
+            if nodes[WEIGHT, other] == weight:
+                leader = other
+            if nodes[WEIGHT, other] > weight:
+                break
+        _swap(nodes, node, leader)
+        nodes[WEIGHT, node] += 1
+        node = nodes[PARENT, node]
+
+
+def _new_leaf(nodes: np.ndarray, state: np.ndarray, leaves: np.ndarray, symbol: int) -> int:
+    """
+    Splits NYT node into a new internal node with NYT and a new leaf as its children
+
+    Returns:
+        int: Id of the new leaf
+    """
+    nyt = state[NYT]
+    parent = state[N_NODES]
+    leaf = parent + 1
+    state[N_NODES] += 2
+    grandparent = nodes[PARENT, nyt]
+    nodes[PARENT, parent] = grandparent
+    nodes[SIDE, parent] = nodes[SIDE, nyt]
+    if grandparent != NO_NODE:
+        nodes[LEFT + nodes[SIDE, nyt], grandparent] = parent
+    nodes[LEFT, parent] = nyt
+    nodes[RIGHT, parent] = leaf
+    nodes[WEIGHT, parent] = 0
+    nodes[SYMBOL, parent] = NO_NODE
+    nodes[PARENT, nyt] = parent
+    nodes[SIDE, nyt] = 0
+    nodes[PARENT, leaf] = parent
+    nodes[SIDE, leaf] = 1
+    nodes[LEFT, leaf] = NO_NODE
+    nodes[RIGHT, leaf] = NO_NODE
+    nodes[WEIGHT, leaf] = 0
+    nodes[SYMBOL, leaf] = symbol
+
+    position = nodes[POSITION, nyt]
+    nodes[ORDER, position] = parent
+    nodes[ORDER, position + 1] = leaf
+    nodes[ORDER, position + 2] = nyt
+    nodes[POSITION, parent] = position
+    nodes[POSITION, leaf] = position + 1
+    nodes[POSITION, nyt] = position + 2
+    if symbol != NO_NODE:
+        leaves[symbol] = leaf
+    return leaf
+
+
+def _write_code(nodes: np.ndarray, node: int, out: np.ndarray, bit: int) -> int:
+    """
+    Writes code of a node to zeroed bytes of `out`, starting at the given bit
+
+    Returns:
+        int: Position of the bit after the code
+    """
+    depth = 0
+    walked = node
+    while nodes[PARENT, walked] != NO_NODE:
+        depth += 1
+        walked = nodes[PARENT, walked]
+    walked = node
+    for index in range(bit + depth - 1, bit - 1, -1):
+        if nodes[SIDE, walked]:
+            out[index >> 3] |= 128 >> (index & 7)
+        walked = nodes[PARENT, walked]
+    return bit + depth
+
+
+def _write_symbol(out: np.ndarray, bit: int, symbol: int, symbol_size: int, little: bool) -> int:
+    for k in range(symbol_size):
+        byte = symbol >> 8 * (k if little else symbol_size - 1 - k) & 255
+        for index in range(8):
+            if byte & 128 >> index:
+                position = bit + 8 * k + index
+                out[position >> 3] |= 128 >> (position & 7)
+    return bit + 8 * symbol_size
+
+
+def _read_symbol(bits: np.ndarray, cursor: int, symbol_size: int, little: bool) -> int:
+    symbol = 0
+    for k in range(symbol_size):
+        byte = 0
+        for index in range(8):
+            byte = byte << 1 | bits[cursor + 8 * k + index]
+        symbol |= byte << 8 * (k if little else symbol_size - 1 - k)
+    return symbol
+
+
+def _encode_symbols(
+    nodes: np.ndarray,
+    state: np.ndarray,
+    leaves: np.ndarray,
+    symbols: np.ndarray,
+    symbol_size: int,
+    little: bool,
+    out: np.ndarray,
+) -> tuple[int, int]:
+    """
+    Writes codes of symbols to zeroed `out` and updates the tree, like
+    `HuffmanTree.encode_code`, until all symbols are encoded or `out` may not fit the next code
+
+    Returns:
+        tuple[int, int]: Number of encoded symbols and number of written bits
+    """
+    bit = 0
+    for i in range(len(symbols)):
+        # Code of a node is shorter than the number of nodes
+        if 8 * len(out) - bit < state[N_NODES] + 8 * symbol_size:
+            return i, bit
+        symbol = symbols[i]
+        node = leaves[symbol]
+        if node == NO_NODE:
+            bit = _write_code(nodes, state[NYT], out, bit)
+            bit = _write_symbol(out, bit, symbol, symbol_size, little)
+            node = _new_leaf(nodes, state, leaves, symbol)
+        else:
+            bit = _write_code(nodes, node, out, bit)
+        _increment(nodes, node)
+    return len(symbols), bit
+
+
+def _decode_bits(
+    nodes: np.ndarray,
+    state: np.ndarray,
+    leaves: np.ndarray,
+    bits: np.ndarray,
+    symbol_size: int,
+    little: bool,
+    out: np.ndarray,
+) -> tuple[int, int, bool]:
+    """
+    Decodes symbols to `out` and updates the tree, like `HuffmanTree.decode`, until the end of
+    bits or EOF
+
+    Returns:
+        tuple[int, int, bool]: Number of decoded symbols, number of used bits, value of EOF flag
+    """
+    n_decoded = 0
+    cursor = 0
+    nyt = state[NYT]
+    while True:
+        node = state[ACTIVE]
+        symbol = NO_NODE
+        while node != nyt:
+            if cursor >= len(bits):
+                state[ACTIVE] = node
+                return n_decoded, cursor, False
+            node = nodes[LEFT + bits[cursor], node]
+            if node == state[EOF]:
+                state[ACTIVE] = node
+                return n_decoded, cursor, True
+            cursor += 1
+            if nodes[SYMBOL, node] != NO_NODE:
+                symbol = nodes[SYMBOL, node]
+                break
+        if symbol == NO_NODE:
+            if len(bits) - cursor < 8 * symbol_size:
+                state[ACTIVE] = nyt
+                return n_decoded, cursor, False
+            symbol = _read_symbol(bits, cursor, symbol_size, little)
+            cursor += 8 * symbol_size
+            node = _new_leaf(nodes, state, leaves, symbol)
+        _increment(nodes, node)
+        state[ACTIVE] = nodes[ORDER, 0]
+        out[n_decoded] = symbol
+        n_decoded += 1
+
+
+if JIT_AVAILABLE:
+    # Functions calling each other are compiled with compiled versions of the functions they call
+    _swap = njit(cache=True)(_swap)
+    _increment = njit(cache=True)(_increment)
+    _new_leaf = njit(cache=True)(_new_leaf)
+    _write_code = njit(cache=True)(_write_code)
+    _write_symbol = njit(cache=True)(_write_symbol)
+    _read_symbol = njit(cache=True)(_read_symbol)
+    _encode_symbols = njit(cache=True)(_encode_symbols)
+    _decode_bits = njit(cache=True)(_decode_bits)
+
+
+class ArrayHuffmanTree:
+    def __init__(self, eof=True, symbol_size=1):
+        """
+        Args:
+            eof (bool, optional): Add EOF node to the tree. Defaults to True.
+            symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+
+        Raises:
+            ValueError: Raised if symbol size is larger than MAX_SYMBOL_SIZE
+        """
+        if symbol_size > MAX_SYMBOL_SIZE:
+            raise ValueError(f"Symbols can't be longer than {MAX_SYMBOL_SIZE} bytes")
+        self.symbol_size = symbol_size
+        self.little = SYMBOL_BYTEORDER == "little"
+        n_symbols = 256**symbol_size
+        # Every symbol and EOF add 2 nodes to NYT
+        self.nodes = np.full((N_ROWS, 2 * (n_symbols + 1) + 1), NO_NODE, dtype=np.int64)
+        self.leaves = np.full(n_symbols, NO_NODE, dtype=np.int64)
+        self.state = np.array([1, 0, NO_NODE, 0], dtype=np.int64)
+        self.nodes[:, 0] = [0, 0, NO_NODE, 0, NO_NODE, NO_NODE, 0, NO_NODE]
+        if eof:
+            self.state[EOF] = _new_leaf(self.nodes, self.state, self.leaves, NO_NODE)
+            _increment(self.nodes, self.state[EOF])
+        self.state[ACTIVE] = self.nodes[ORDER, 0]
+        self.buffer = np.zeros(BUFFER_SIZE, dtype=np.uint8)
+        # Bits of a new symbol that did not fit in the previously decoded chunk
+        self.pending = bitarray()
+
+    def checkpoint(self) -> bytes:
+        """
+        Serializes state of the tree like `HuffmanTree.checkpoint`
+
+        Returns:
+            bytes: Checkpoint of the tree
+        """
+        n_nodes = int(self.state[N_NODES])
+        data = bytearray(_CHECKPOINT_HEADER.pack(self.symbol_size, n_nodes))
+        for node in self.nodes[ORDER, :n_nodes].tolist():
+            _, _, _, _, left, right, weight, symbol = self.nodes[:, node].tolist()
+            if left != NO_NODE:
+                data += _NODE.pack(INTERNAL_NODE, weight)
+                data += _CHILDREN.pack(self.nodes[POSITION, left], self.nodes[POSITION, right])
+            elif node == self.state[NYT]:
+                data += _NODE.pack(NYT_NODE, weight)
+            elif node == self.state[EOF]:
+                data += _NODE.pack(EOF_NODE, weight)
+            else:
+                data += _NODE.pack(SYMBOL_NODE, weight)
+                data += symbol.to_bytes(self.symbol_size, byteorder=SYMBOL_BYTEORDER)
+        return bytes(data)
+
+    @classmethod
+    def from_checkpoint(cls, data: bytes) -> "ArrayHuffmanTree":
+        """
+        Restores a tree saved with `checkpoint` or `HuffmanTree.checkpoint`
+
+        Args:
+            data (bytes): Checkpoint of the tree
+
+        Raises:
+            ValueError: Raised if data is not a valid checkpoint
+
+        Returns:
+            ArrayHuffmanTree: Restored tree
+        """
+        tree = HuffmanTree.from_checkpoint(data)
+        restored = cls(eof=False, symbol_size=tree.symbol_size)
+        n_nodes = len(tree.nodes)
+        if n_nodes > restored.nodes.shape[1]:
+            raise ValueError("Invalid checkpoint")
+        # Ids of nodes are their positions
+        for node in tree.nodes:
+            left, right = node.children
+            restored.nodes[:, node.pos] = [
+                node.pos,
+                node.pos,
+                NO_NODE if node.parent is None else node.parent.pos,
+                0 if node.side is None else node.side.value,
+                NO_NODE if left is None else left.pos,
+                NO_NODE if right is None else right.pos,
+                node.weight,
+                NO_NODE if node.symbol is None else node.symbol,
+            ]
+            if node.symbol is not None:
+                restored.leaves[node.symbol] = node.pos
+        eof = getattr(tree, "EOF", None)
+        restored.state[:] = [n_nodes, tree.NYT.pos, NO_NODE if eof is None else eof.pos, 0]
+        return restored
+
+    def _buffer_code(self, n_bits: int) -> int:
+        """
+        Returns:
+            int: First bits of the buffer as an unsigned integer
+        """
+        code = int.from_bytes(self.buffer[: ceil(n_bits / 8)].tobytes(), byteorder="big")
+        return code >> -n_bits % 8
+
+    def _encode_part(self, symbols: np.ndarray) -> tuple[int, int, int]:
+        """
+        Returns:
+            tuple[int, int, int]: Number of encoded symbols, their codes as an unsigned integer
+            and its length
+        """
+        self.buffer[:] = 0
+        n_encoded, n_bits = _encode_symbols(
+            self.nodes, self.state, self.leaves, symbols, self.symbol_size, self.little, self.buffer
+        )
+        return n_encoded, self._buffer_code(n_bits), n_bits
+
+    def encode_symbols(self, symbols: Iterable[int], write: Callable[[int, int], None]):
+        """
+        Encodes symbols and updates the tree
+
+        Args:
+            symbols (Iterable[int]): Symbols as unsigned integers
+            write (Callable[[int, int], None]): Function called with codes of consecutive parts
+                of symbols as an unsigned integer and their length, like `BitWriter.write`
+
+        Raises:
+            OverflowError: Raised if a symbol doesn't fit in `symbol_size` bytes
+        """
+        symbols = iter(symbols)
+        while len(chunk := np.fromiter(islice(symbols, ENCODE_CHUNK), dtype=np.int64)):
+            if chunk.min() < 0 or chunk.max() >= len(self.leaves):
+                raise OverflowError(f"Symbol doesn't fit in {self.symbol_size} bytes")
+            start = 0
+            while start < len(chunk):
+                n_encoded, code, length = self._encode_part(chunk[start:])
+                start += n_encoded
+                write(code, length)
+
+    def encode_code(self, symbol: int) -> tuple[int, int]:
+        """
+        Encodes a symbol like `HuffmanTree.encode_code` and updates the tree
+
+        Args:
+            symbol (int): Symbol as unsigned integer
+
+        Returns:
+            tuple[int, int]: Code of the symbol as an unsigned integer, followed by bytes of the
+            symbol if it is new, and length of the code
+
+        Raises:
+            OverflowError: Raised if the symbol doesn't fit in `symbol_size` bytes
+        """
+        if not 0 <= symbol < len(self.leaves):
+            raise OverflowError(f"Symbol doesn't fit in {self.symbol_size} bytes")
+        _, code, length = self._encode_part(np.array([symbol], dtype=np.int64))
+        return code, length
+
+    def encode(self, symbol: int) -> bitarray:
+        code, length = self.encode_code(symbol)
+        return int2ba(code, length) if length > 0 else bitarray()
+
+    def eof_code(self) -> tuple[int, int]:
+        """
+        Returns:
+            tuple[int, int]: Code of the end of file as an unsigned integer and its length
+        """
+        self.buffer[: ceil(self.state[N_NODES] / 8)] = 0
+        n_bits = _write_code(self.nodes, self.state[EOF], self.buffer, 0)
+        return self._buffer_code(n_bits), n_bits
+
+    def decode_chunk(self, chunk: bitarray) -> tuple[bytes, bool]:
+        """
+        Decodes encoded symbols like `HuffmanTree.decode_chunk`
+
+        Args:
+            chunk (bitarray): Array of bits containing encoded symbols
+
+        Returns:
+            tuple[bytes, bool]: Tuple containing: bytes of decoded symbols, value of EOF flag
+        """
+        chunk = self.pending + chunk
+        bits = np.frombuffer(chunk.unpack(), dtype=np.uint8)
+        decoded = np.empty(len(bits), dtype=np.int64)
+        n_decoded, n_bits, is_eof = _decode_bits(
+            self.nodes, self.state, self.leaves, bits, self.symbol_size, self.little, decoded
+        )
+        self.pending = chunk[n_bits:]
+        symbols = decoded[:n_decoded].astype(f"=u{self.symbol_size}")
+        return symbols.tobytes(), bool(is_eof)
@@ -1,77 +1,139 @@
-from collections import defaultdict
-from io import BytesIO
+import os
+from collections import Counter
+from functools import lru_cache
 from math import ceil
 from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, BinaryIO, Iterable
 
-import numpy as np
-from bitarray import bitarray
-from bitarray.util import ba2int, int2ba
+from bitarray import bitarray, decodetree
+from bitarray.util import ba2int
 
+from src.externalCounts import count_symbols_external
+from src.fileInfo import FileInfo, histogram_info
 from src.node import ChildSide, Node
-from src.utility import bytes2ba, get_n_bits, read_n_bytes, subsequences
+from src.npy import counts_shape, iter_counts, load_counts, save_counts
+from src.parallel import count_ranges, encode_ranges
+from src.pipeline import Pipeline, optional_reader, optional_writer
+from src.runLength import RunLengthWriter, decoded_size, run_length_forward
+from src.stored import encode as stored_encode, stored_size
+from src.utility import (
+    SYMBOL_BYTEORDER,
+    bytes2ba,
+    bytes2symbols,
+    encode_symbols,
+    get_n_bits,
+    make_first_byte,
+    read_algorithm_identifier,
+    read_symbols,
+    symbols2bytes,
+)
+
+# Modules of other features depend on NumPy, they are imported only when the feature is used
+if TYPE_CHECKING:
+    from src.flatTree import CodeTable, LazyDecoder
 
 #   encoded file structure:
-#   header: 1 byte: 1 bit to specify algorithm, 3 bits to specify number of padding bits at the end of the file (x), rest is padding 0s
+#   header: 1 byte: 1 bit to specify algorithm, 3 bits to specify number of padding bits at the end of the file (x),
+#                   4 bits to specify format type (0 - basic, 2 - extended)
 #           4 bytes to specify how many bytes are taken by symbol counts (n),
 #           1 byte to specify how many bits are taken by encoded extension (m)
-#   symbol counts: n bytes
+#           only in extended format:
+#           1 byte of flags specifying features used in encoding
+#           8 bytes to specify size of encoded contents in bytes
+#   symbol counts: n bytes, array of symbols and their counts in NPY format (see src/npy.py)
 #   encoded extension: ceil(m/8) bytes
-#   encoded contents: until EOF - x
+#   encoded contents: until EOF - x, or until index, if it is present. In extended format with
+#                     interleaved streams their structure is described in src/interleaved.py
+#   only in extended format with index:
+#   index: k * 8 bytes: offsets in bits from the beginning of encoded contents to codes of every
+#                       i-th symbol
+#          4 bytes to specify i
+#          8 bytes to specify number of entries in index (k)
 
 
 BASIC_HUFFMAN = 0
+BASIC_HUFFMAN_EXTENDED = 4
 
+HEADER_SIZE = 6
+EXTENDED_HEADER_SIZE = 15
 
-def count_symbols(filepath: Path, symbol_size: int = 1):
+# Flags of extended format
+TRANSFORM_MED = 1
+CONTEXT_MODEL = 2  # symbol counts are replaced with serialized ContextModel
+RUN_LENGTH = 4  # encoded symbols are run-length tokens, 1 byte longer than original symbols
+INDEXED = 8  # encoded contents are followed by index
+INTERLEAVED = 16  # symbols are encoded in interleaved streams
+
+INDEX_FOOTER_SIZE = 12
+DEFAULT_INDEX_INTERVAL = 2**12
+
+# Number of recently used code tables kept in memory
+CODE_TABLE_CACHE_SIZE = 64
+# Trees of alphabets with more symbols are built in arrays (src/flatTree.py) instead of Nodes
+FLAT_TREE_MIN_SYMBOLS = 2**10
+
+
+def count_symbols(
+    filepath: Path,
+    symbol_size: int = 1,
+    workers: int | None = 1,
+    pipeline: Pipeline | None = None,
+):
     """
     Counts symbols in given file
 
     Args:
         filepath (Path): File to count symbols in
         symbol_size (int, optional): Desired size of symbol in bytes. Defaults to 1.
+        workers (int | None, optional): Number of processes counting ranges of the file, if
+            different than 1. Defaults to 1.
+        pipeline (Pipeline | None, optional): If given, blocks of the file are prefetched by
+            a background thread. Not used by workers. Defaults to None.
 
     Returns:
-        NDArray: Numpy array with columns `symbol` and `count`. `Symbol` contains arrays of bytes
-        of length equal `symbol_size` found in file at `filepath`, `count` - number of times
-        corresponding symbols appears in that file
-    """
-    counts = defaultdict[bytes, int](int)
-
-    for symbol in subsequences(filepath.suffix.encode(), symbol_size):
-        if len(symbol) < symbol_size:
-            symbol = symbol.ljust(symbol_size, b"\x00")
-        counts[symbol] += 1
-    for symbol in read_n_bytes(filepath, symbol_size):
-        counts[symbol] += 1
-
-    def dict_to_nparray():
-        max_count = max(counts.values())
-        count_dtype = np.min_scalar_type(max_count)
-        array = np.array(
-            list(counts.items()),
-            dtype=[("symbol", f"V{symbol_size}"), ("count", count_dtype)],
-        )
-        return array
-
-    array = dict_to_nparray()
-    return array
-
-
-def np_serialize(array: np.ndarray):
-    serialization_proxy = BytesIO()
-    np.save(serialization_proxy, array)
-    return serialization_proxy.getvalue()
+        list[tuple[int, int]]: Pairs of symbols of length equal `symbol_size` found in file at
+        `filepath`, as unsigned integers, and number of times they appear in that file, in order
+        of first appearance
+    """
+    # Counter keeps symbols in order of their first appearance
+    counts = Counter(bytes2symbols(filepath.suffix.encode(), symbol_size))
+    if workers == 1:
+        if pipeline is None:
+            chunks = read_symbols(filepath, symbol_size)
+        else:
+            chunks = pipeline.read_symbols(filepath, symbol_size)
+        for symbols in chunks:
+            counts.update(symbols)
+    else:
+        counts.update(count_ranges(filepath, symbol_size, workers))
+
+    return list(counts.items())
+
+
+def pad_counts(symbols_counts: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """
+    Adds symbols with zero counts to counts of less than two symbols, the tree needs at least
+    two leaves for every symbol to have a non-empty code
 
+    Args:
+        symbols_counts (list[tuple[int, int]]): Symbol counts as returned by `count_symbols`
 
-def np_deserialize(serialized: bytes):
-    deserialization_proxy = BytesIO(serialized)
-    return np.load(deserialization_proxy)
+    Returns:
+        list[tuple[int, int]]: Symbol counts of at least two symbols
+    """
+    if len(symbols_counts) >= 2:
+        return symbols_counts
+    present = {symbol for symbol, _ in symbols_counts}
+    padding = [(symbol, 0) for symbol in range(2) if symbol not in present]
+    return symbols_counts + padding[: 2 - len(symbols_counts)]
 
 
-def counts_to_nodes(symbols_counts: np.ndarray):
+def counts_to_nodes(symbols_counts: list[tuple[int, int]]):
     nodes: list[Node] = []
     for symbol, count in symbols_counts:
-        symbol = bytes(symbol)
+        symbol = int(symbol)
         weight = int(count)
         nodes.append(Node(symbol=symbol, weight=weight))
     return nodes
@@ -106,134 +168,711 @@ def build_tree(nodes: list[Node]) -> Node:
     return nodes[0]
 
 
-def _encode_extension(filepath: Path, encodings: dict[bytes, bitarray], symbol_size: int):
+def build_code_table(serialized_counts: bytes) -> "tuple[dict[int, bitarray] | CodeTable, int]":
+    """
+    Builds codes of symbols from serialized symbol counts. Decoding uses `decoder` instead.
+
+    Args:
+        serialized_counts (bytes): Symbol counts serialized with `save_counts`
+
+    Returns:
+        tuple[dict[int, bitarray] | CodeTable, int]: Codes of symbols and size of symbols in
+        bytes. Codes of large alphabets are kept in arrays of CodeTable, which encodes whole
+        chunks of symbols at once, codes of the others in dict of symbol: symbol_encoding pairs.
+        Both are used with `encode_symbols`.
+    """
+    n_symbols, symbol_size = counts_shape(serialized_counts)
+    if n_symbols >= FLAT_TREE_MIN_SYMBOLS:
+        from src.flatTree import FlatTree
+
+        flat_tree = FlatTree.from_counts(iter_counts(serialized_counts), symbol_size)
+        return flat_tree.code_table(), symbol_size
+    symbols_counts, _ = load_counts(serialized_counts)
+    return build_tree(counts_to_nodes(symbols_counts)).get_codings(), symbol_size
+
+
+@lru_cache(maxsize=CODE_TABLE_CACHE_SIZE)
+def code_table(serialized_counts: bytes) -> "tuple[dict[int, bitarray] | CodeTable, int]":
+    """
+    Same as `build_code_table`, but recently used tables are cached, so they must not be
+    modified
+    """
+    return build_code_table(serialized_counts)
+
+
+class TreeDecoder:
+    """
+    Decodes codes of all symbols with a single decodetree
+    """
+
+    def __init__(self, encodings: dict[int, bitarray], symbol_size: int):
+        """
+        Args:
+            encodings (dict[int, bitarray]): Dict of symbol: symbol_encoding pairs
+            symbol_size (int): Size of symbols in bytes
+        """
+        self.symbol_size = symbol_size
+        # The only symbol is encoded with empty code, so there is nothing to decode
+        self.tree = decodetree(encodings) if len(encodings) > 1 else None
+        self.code_lengths = {symbol: len(code) for symbol, code in encodings.items()}
+        self.max_length = max(self.code_lengths.values(), default=0)
+
+    def decode(self, codeblock: bitarray) -> tuple[list[int], int]:
+        """
+        Decodes codes until the end of the codeblock
+
+        Args:
+            codeblock (bitarray): A block of code to be decoded
+
+        Returns:
+            tuple[list[int], int]: Decoded symbols and number of decoded bits, the last code can
+            be incomplete
+        """
+        decoded = []
+        if self.tree is not None:
+            try:
+                for symbol in codeblock.iterdecode(self.tree):
+                    decoded.append(symbol)
+            except ValueError:
+                # Code of the last symbol is incomplete
+                pass
+        return decoded, sum(map(self.code_lengths.__getitem__, decoded))
+
+
+@lru_cache(maxsize=CODE_TABLE_CACHE_SIZE)
+def decoder(serialized_counts: bytes) -> "TreeDecoder | LazyDecoder":
+    """
+    Creates decoder of codes built from serialized symbol counts. Decoders of large alphabets
+    build tables of rare codes only when they are used, so that decoding starts sooner. Recently
+    used decoders are cached.
+
+    Args:
+        serialized_counts (bytes): Symbol counts serialized with `save_counts`
+
+    Returns:
+        TreeDecoder | LazyDecoder: Decoder with `decode` method and `symbol_size` and
+        `max_length` (length of the longest code) attributes
+    """
+    n_symbols, symbol_size = counts_shape(serialized_counts)
+    if n_symbols >= FLAT_TREE_MIN_SYMBOLS:
+        from src.flatTree import FlatTree
+
+        return FlatTree.from_counts(iter_counts(serialized_counts), symbol_size).lazy_decoder()
+    encodings, _ = code_table(serialized_counts)
+    return TreeDecoder(encodings, symbol_size)  # type: ignore
+
+
+def _encode_extension(
+    filepath: Path, encodings: "dict[int, bitarray] | CodeTable", symbol_size: int
+):
     code = bitarray()
-    for symbol in subsequences(filepath.suffix.encode(), symbol_size):
-        if len(symbol) < symbol_size:
-            symbol = symbol.ljust(symbol_size, b"\x00")
-        code += encodings[symbol]
+    encode_symbols(code, encodings, bytes2symbols(filepath.suffix.encode(), symbol_size))
     return (code.tobytes(), len(code))
 
 
 def _encode_contents(
-    filepath: Path, encodings: dict[bytes, bitarray], symbol_size: int, chunk_size: int = 2**10
+    filepath: Path,
+    encodings: "dict[int, bitarray] | CodeTable",
+    symbol_size: int,
+    chunk_symbols: int = 2**16,
+    index: list[int] | None = None,
+    index_interval: int = DEFAULT_INDEX_INTERVAL,
+    pipeline: Pipeline | None = None,
 ):
     """
     Encode contents of file in chunks.
 
     Args:
         filepath (Path): Path to the file to encode
-        encodings (dict[bytes, bitarray]): Dict of symbol: symbol_encoding pairs
-        chunk_size (int, optional): Number of bytes to encode in every chunk. Defaults to 2**10 (1kB).
+        encodings (dict[int, bitarray] | CodeTable): Codes of symbols, as returned by
+            `code_table`
+        symbol_size (int): Size of symbols in bytes
+        chunk_symbols (int, optional): Number of symbols encoded in every chunk, rounded up to
+            a multiple of `index_interval` if index is created. Defaults to 2**16.
+        index (list[int] | None, optional): If given, offsets in bits of codes of every
+            `index_interval`-th symbol are appended to it. Defaults to None.
+        index_interval (int, optional): Number of symbols between entries of index. Defaults to
+            DEFAULT_INDEX_INTERVAL.
+        pipeline (Pipeline | None, optional): If given, the file is read in its prefetched
+            blocks instead of chunks of `chunk_symbols`. Defaults to None.
 
     Yields:
         tuple[bytes, int]: Pair of encoded chunk of data and number of bits in the chunk that
-        encode original information. Number of bits is equal to length of the chunk multiplied
-        by 8 for all chunks except for the last one due to it being padded to full bytes.
+        encode original information. Only the last chunk is padded to full bytes.
     """
+    alignment = index_interval if index is not None else 1
+    if pipeline is None:
+        chunks = read_symbols(filepath, symbol_size, ceil(chunk_symbols / alignment) * alignment)
+    else:
+        chunks = pipeline.read_symbols(filepath, symbol_size, alignment)
     code = bitarray()
-    for symbol in read_n_bytes(filepath, symbol_size, chunk_size):
-        code += encodings[symbol]
-        if len(code) > chunk_size * 8:
-            yield code[: chunk_size * 8].tobytes(), chunk_size * 8
-            code = code[chunk_size * 8 :]
+    written_bits = 0
+    for symbols in chunks:
+        if index is None:
+            encode_symbols(code, encodings, symbols)
+        else:
+            for start in range(0, len(symbols), index_interval):
+                index.append(written_bits + len(code))
+                encode_symbols(code, encodings, symbols[start : start + index_interval])
+        whole_bits = len(code) // 8 * 8
+        yield code[:whole_bits].tobytes(), whole_bits
+        del code[:whole_bits]
+        written_bits += whole_bits
     yield code.tobytes(), len(code)
 
 
-def encode(filepath: Path, new_filepath: Path, symbol_size: int = 1):
-    symbols_counts = count_symbols(filepath, symbol_size)
+def _encoded_length(
+    symbols_counts: Iterable[tuple[int, int]], encodings: "dict[int, bitarray] | CodeTable"
+) -> int:
+    if isinstance(encodings, dict):
+        return sum(count * len(encodings[symbol]) for symbol, count in symbols_counts)
+    return encodings.encoded_length(symbols_counts)
+
 
-    leaves = counts_to_nodes(symbols_counts)
+def estimate_encoded_size(
+    symbols_counts: Iterable[tuple[int, int]],
+    encodings: "dict[int, bitarray] | CodeTable",
+    counts_len: int,
+    extension_len: int,
+    header_size: int = HEADER_SIZE,
+    extra_size: int = 0,
+) -> int:
+    """
+    Computes exact size of the encoded file without encoding its contents
 
-    encoding_tree = build_tree(leaves)
-    encodings = encoding_tree.get_codings()
+    Args:
+        symbols_counts (Iterable[tuple[int, int]]): Symbol counts as returned by
+            `count_symbols`, they are read once
+        encodings (dict[int, bitarray] | CodeTable): Codes of symbols, as returned by
+            `code_table`
+        counts_len (int): Number of bytes taken by serialized symbol counts
+        extension_len (int): Number of bits taken by encoded extension
+        header_size (int, optional): Number of bytes taken by header. Defaults to HEADER_SIZE.
+        extra_size (int, optional): Number of bytes taken by index or lengths of interleaved
+            streams. Defaults to 0.
+
+    Returns:
+        int: Size of the encoded file in bytes
+    """
+    # Counts include symbols of the extension, which are encoded separately
+    code_len = _encoded_length(symbols_counts, encodings) - extension_len
+    encoded_size = header_size + counts_len + ceil(extension_len / 8) + ceil(code_len / 8)
+    return encoded_size + extra_size
+
+
+def encode(
+    filepath: Path,
+    new_filepath: Path,
+    symbol_size: int = 1,
+    allow_stored: bool = True,
+    transform: bool = False,
+    context_model: bool = False,
+    run_length: bool = False,
+    index_interval: int | None = None,
+    streams: int | None = None,
+    workers: int | None = 1,
+    pipeline: Pipeline | None = None,
+    memory_budget: int | None = None,
+):
+    """
+    Encodes file with basic Huffman algorithm
+
+    Args:
+        filepath (Path): Path to the file to encode
+        new_filepath (Path): Path where encoded file will be saved
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+        allow_stored (bool, optional): Save file in stored format instead, if encoding would not
+            make it smaller. Ignored with `index_interval`, stored files can't be decoded with
+            `decode_range`. Defaults to True.
+        transform (bool, optional): Encode residuals of MED prediction instead of pixels. Ignored
+            for files that are not binary PGM images. Defaults to False.
+        context_model (bool, optional): Encode every symbol with code table chosen by the
+            previous symbol. Requires `symbol_size` equal to 1 and can't be used with
+            `run_length`. Defaults to False.
+        run_length (bool, optional): Replace repeated symbols with run-length tokens before
+            encoding. Defaults to False.
+        index_interval (int | None, optional): If given, encoded contents are followed by index
+            with offsets of codes of every `index_interval`-th symbol, allowing to decode parts
+            of the file with `decode_range`. Can't be used with other features. Defaults to None.
+        streams (int | None, optional): If given, symbols are encoded in `streams` interleaved
+            streams, which are decoded together. Can't be used with `context_model`. Defaults to
+            None.
+        workers (int | None, optional): Number of processes counting and encoding ranges of the
+            file, all processors are used if None. Output doesn't depend on it. Ignored with
+            `context_model`. Defaults to 1.
+        pipeline (Pipeline | None, optional): If given, the file is read and the encoded file is
+            written by background threads of the pipeline. Output doesn't depend on it. Defaults
+            to None.
+        memory_budget (int | None, optional): If given, symbols are counted within about this
+            many bytes of memory, spilling sorted partial counts to temporary files, and symbol
+            counts are saved in order of symbols instead of their first appearance. Workers and
+            pipeline are not used for counting. Only counting is limited, counts and codes of
+            all distinct symbols are kept in memory while encoding, in arrays if there are at
+            least FLAT_TREE_MIN_SYMBOLS of them. Ignored with `context_model`. Defaults to None.
+    """
+    flags = 0
+    if index_interval is not None:
+        if transform or context_model or run_length or streams is not None:
+            raise ValueError("Index can't be used with other features")
+        flags |= INDEXED
+    if context_model:
+        if symbol_size != 1 or run_length:
+            raise ValueError("Context model can be used only with symbols of size 1")
+        if streams is not None:
+            raise ValueError("Context model can't be used with interleaved streams")
+        flags |= CONTEXT_MODEL
+    if streams is not None:
+        if not 0 < streams < 256:
+            raise ValueError("Number of interleaved streams must be between 1 and 255")
+        flags |= INTERLEAVED
+    with TemporaryDirectory() as directory:
+        # Transformed files keep the extension, so that it is encoded
+        contents_path = filepath
+        if transform:
+            from src.transform import is_pgm, med_forward
+
+            if is_pgm(filepath):
+                flags |= TRANSFORM_MED
+                residuals = Path(directory).joinpath("residuals").with_suffix(filepath.suffix)
+                med_forward(contents_path, residuals)
+                contents_path = residuals
+        if run_length:
+            flags |= RUN_LENGTH
+            tokens = Path(directory).joinpath("tokens").with_suffix(filepath.suffix)
+            run_length_forward(contents_path, tokens, symbol_size)
+            contents_path = tokens
+            symbol_size += 1
+        _encode(
+            filepath,
+            contents_path,
+            new_filepath,
+            symbol_size,
+            allow_stored,
+            flags,
+            index_interval,
+            streams,
+            workers,
+            pipeline,
+            memory_budget,
+        )
 
-    serialized_counts = np_serialize(symbols_counts)
 
-    extension, extension_len = _encode_extension(filepath, encodings, symbol_size)
+def _encode(
+    filepath: Path,
+    contents_path: Path,
+    new_filepath: Path,
+    symbol_size: int,
+    allow_stored: bool,
+    flags: int,
+    index_interval: int | None = None,
+    streams: int | None = None,
+    workers: int | None = 1,
+    pipeline: Pipeline | None = None,
+    memory_budget: int | None = None,
+):
+    identifier = BASIC_HUFFMAN_EXTENDED if flags else BASIC_HUFFMAN
+    header_size = EXTENDED_HEADER_SIZE if flags else HEADER_SIZE
+
+    if flags & CONTEXT_MODEL:
+        from src.contextModel import ContextModel, count_contexts
+
+        context_counts = count_contexts(contents_path)
+        model = ContextModel.from_counts(context_counts)
+        serialized_counts = model.serialize()
+        extension, extension_len = model.encode_extension(contents_path)
+        code_len = model.code_len(context_counts) - extension_len
+        encoded_size = header_size + len(serialized_counts) + ceil(extension_len / 8)
+        encoded_size += ceil(code_len / 8)
+        encoded_contents = model.encode_contents(contents_path)
+    else:
+        symbols_counts: Iterable[tuple[int, int]]
+        if memory_budget is None:
+            symbols_counts = count_symbols(contents_path, symbol_size, workers, pipeline)
+            symbols_counts = pad_counts(symbols_counts)
+            serialized_counts = save_counts(symbols_counts, symbol_size)
+            encodings, _ = code_table(serialized_counts)
+        else:
+            serialized_counts = count_symbols_external(contents_path, symbol_size, memory_budget)
+            n_symbols, _ = counts_shape(serialized_counts)
+            if n_symbols < 2:
+                sorted_counts = sorted(pad_counts(load_counts(serialized_counts)[0]))
+                serialized_counts = save_counts(sorted_counts, symbol_size)
+            symbols_counts = iter_counts(serialized_counts)
+            # Cache would keep counts and codes of all distinct symbols after encoding
+            encodings, _ = build_code_table(serialized_counts)
+
+        extension, extension_len = _encode_extension(contents_path, encodings, symbol_size)
+        n_symbols = ceil(contents_path.stat().st_size / symbol_size)
+        extra_size = 0
+        if index_interval is not None:
+            extra_size = ceil(n_symbols / index_interval) * 8 + INDEX_FOOTER_SIZE
+        if streams is not None:
+            from src.interleaved import encode_interleaved, interleaved_overhead
+
+            extra_size = interleaved_overhead(n_symbols, streams)
+        encoded_size = estimate_encoded_size(
+            symbols_counts,
+            encodings,
+            len(serialized_counts),
+            extension_len,
+            header_size,
+            extra_size,
+        )
+        index: list[int] | None = [] if index_interval is not None else None
+        if streams is not None:
+            encoded_contents = encode_interleaved(contents_path, encodings, symbol_size, streams)
+        elif index is None and workers != 1:
+            encoded_contents = encode_ranges(contents_path, encodings, symbol_size, workers)
+        else:
+            encoded_contents = _encode_contents(
+                contents_path,
+                encodings,
+                symbol_size,
+                index=index,
+                index_interval=index_interval or 1,
+                pipeline=pipeline,
+            )
+
+    # Stored files have no index
+    if allow_stored and index_interval is None and encoded_size >= stored_size(filepath):
+        stored_encode(filepath, new_filepath)
+        return
 
     header_no_1st_byte = len(serialized_counts).to_bytes(
         length=4, byteorder="big"
     ) + extension_len.to_bytes(length=1, byteorder="big")
+    if flags:
+        header_no_1st_byte += flags.to_bytes(length=1, byteorder="big")
+        header_no_1st_byte += contents_path.stat().st_size.to_bytes(length=8, byteorder="big")
 
     with open(new_filepath, "wb") as file:
-        file.seek(6)
-        file.write(serialized_counts + extension)
-        padding_bits = 0
-        for chunk, code_len in _encode_contents(filepath, encodings, symbol_size):
-            file.write(chunk)
-            padding_bits = len(chunk) * 8 - code_len
+        file.seek(header_size)
+        with optional_writer(file, pipeline) as writer:
+            writer.write(serialized_counts + extension)
+            padding_bits = 0
+            for chunk, code_len in encoded_contents:
+                writer.write(chunk)
+                padding_bits = len(chunk) * 8 - code_len
+            if flags & INDEXED:
+                for offset in index:  # type: ignore
+                    writer.write(offset.to_bytes(length=8, byteorder="big"))
+                writer.write(index_interval.to_bytes(length=4, byteorder="big"))  # type: ignore
+                writer.write(len(index).to_bytes(length=8, byteorder="big"))  # type: ignore
         file.seek(0)
-        header_1st_byte = (bitarray([BASIC_HUFFMAN]) + int2ba(padding_bits, 3)).tobytes()
+        header_1st_byte = make_first_byte(identifier, padding_bits)
         file.write(header_1st_byte + header_no_1st_byte)
 
 
-def _decode_codeblock(codeblock: bitarray, decoding_tree: Node):
+def _decode_codeblock(codeblock: bitarray, symbol_decoder: "TreeDecoder | LazyDecoder"):
     """
     Decodes given block of code
 
     Args:
         codeblock (bitarray): A block of code to be decoded
-        decoding_tree (Node): Tree of codes to be used in decoding
+        symbol_decoder (TreeDecoder | LazyDecoder): Decoder as returned by `decoder`
 
     Returns:
-        tuple[bytes, bitarray]: Decoded symbols and remainder at the end of the codeblock that
-        could not be mapped to any symbol
+        tuple[bytes, bitarray]: Bytes of decoded symbols and remainder at the end of the codeblock
+        that could not be mapped to any symbol
+    """
+    decoded, decoded_len = symbol_decoder.decode(codeblock)
+    return symbols2bytes(decoded, symbol_decoder.symbol_size), codeblock[decoded_len:]
+
+
+def _decode_contents(
+    reader: BinaryIO,
+    writer: BinaryIO,
+    symbol_decoder: "TreeDecoder | LazyDecoder",
+    end_padding: int,
+    contents_size: int | None,
+):
     """
+    Decodes contents of the file until its end
+
+    Args:
+        reader (BinaryIO): Encoded file positioned at the beginning of encoded contents
+        writer (BinaryIO): File decoded contents are written to
+        symbol_decoder (TreeDecoder | LazyDecoder): Decoder as returned by `decoder`
+        end_padding (int): Number of padding bits at the end of encoded file
+        contents_size (int | None): Size of decoded contents in bytes. If None, trailing zeros
+            used to pad the last symbol are removed instead.
+    """
+    remainder = bitarray()
+    encoded = bitarray()
     decoded = bytes()
-    code = codeblock
-    while True:
-        node: Node = decoding_tree
-        i = 0
-        while not node.is_leaf() and i < len(code):
-            # Presence of children is examined while checking if node is a leaf
-            node = node.children[code[i]]  # type: ignore
-            i += 1
-        if not node.is_leaf():
-            break
-        # Symbol is inspected while checking if node is a leaf
-        decoded += node.symbol  # type: ignore
-        code = code[i:]
-    return decoded, code
-
-
-def decode(filepath: Path, destination: Path):
+    written = 0
+    # Iterator will stop when b"" is read (EOF)
+    for chunk in iter(lambda: reader.read(2**10), b""):
+        decoded, remainder = _decode_codeblock(encoded, symbol_decoder)
+        if contents_size is not None and written + len(decoded) >= contents_size:
+            # Anything after the contents (padding, index) is not decoded
+            writer.write(decoded[: contents_size - written])
+            return
+        writer.write(decoded)
+        written += len(decoded)
+        # Operations up to this moment were executed data from chunk from previous iteration
+        code = bitarray()
+        code.frombytes(chunk)
+        encoded = remainder + code
+    # Encoded here is the last not-empty chunk from reader
+    if end_padding > 0:
+        encoded = encoded[:-end_padding]
+    decoded, _ = _decode_codeblock(encoded, symbol_decoder)
+    if contents_size is None:
+        while decoded[-1:] == b"\x00":
+            decoded = decoded[:-1]
+    else:
+        decoded = decoded[: contents_size - written]
+    writer.write(decoded)
+
+
+def _read_header(reader: BinaryIO) -> SimpleNamespace:
+    """
+    Reads header, symbol counts and encoded extension of encoded file
+
+    Args:
+        reader (BinaryIO): Encoded file positioned at its beginning
+
+    Raises:
+        ValueError: Raised if file was not encoded with basic Huffman algorithm
+
+    Returns:
+        SimpleNamespace: Values of header fields: `flags`, `end_padding`, `contents_size` (None
+        if not specified), `serialized_counts` and `encoded_extension`
+    """
+    header = reader.read(HEADER_SIZE)
+    identifier = read_algorithm_identifier(header)
+    if identifier not in [BASIC_HUFFMAN, BASIC_HUFFMAN_EXTENDED]:
+        raise ValueError("File was not encoded with basic Huffman algorithm")
+    fields = SimpleNamespace(flags=0, contents_size=None)
+    fields.end_padding = ba2int(get_n_bits(header[0:1], 1, 3))
+    counts_len = int.from_bytes(header[1:5], byteorder="big")
+    extension_len = header[5]
+
+    if identifier == BASIC_HUFFMAN_EXTENDED:
+        header += reader.read(EXTENDED_HEADER_SIZE - HEADER_SIZE)
+        fields.flags = header[6]
+        fields.contents_size = int.from_bytes(header[7:15], byteorder="big")
+
+    chunk = reader.read(counts_len + ceil(extension_len / 8))
+    fields.serialized_counts = chunk[:counts_len]
+    fields.encoded_extension = bytes2ba(chunk[counts_len:])[:extension_len]
+    return fields
+
+
+def _decode_extension(encoded_extension: bitarray, serialized_counts: bytes) -> bytes:
+    extension, _ = _decode_codeblock(encoded_extension, decoder(serialized_counts))
+    while extension[-1:] == b"\x00":
+        extension = extension[:-1]
+    return extension
+
+
+def read_extension(filepath: Path) -> str:
+    """
+    Reads extension of the original file from encoded file
+
+    Args:
+        filepath (Path): Encoded file
+
+    Returns:
+        str: Extension of the original file
+    """
+    with open(filepath, "rb") as reader:
+        header = _read_header(reader)
+    if header.flags & CONTEXT_MODEL:
+        from src.contextModel import load_model
+
+        model = load_model(header.serialized_counts)
+        return model.decode_extension(header.encoded_extension).decode()
+    return _decode_extension(header.encoded_extension, header.serialized_counts).decode()
+
+
+def _code_lengths(serialized_counts: bytes) -> list[int]:
+    """
+    Computes lengths of codes without building codes themselves
+
+    Args:
+        serialized_counts (bytes): Symbol counts serialized with `save_counts`
+
+    Returns:
+        list[int]: Lengths of codes of symbols, in order of serialized counts
+    """
+    n_symbols, symbol_size = counts_shape(serialized_counts)
+    if n_symbols >= FLAT_TREE_MIN_SYMBOLS:
+        from src.flatTree import FlatTree
+
+        flat_tree = FlatTree.from_counts(iter_counts(serialized_counts), symbol_size)
+        _, lengths = flat_tree.codes()
+        return lengths.tolist()
+    symbols_counts, _ = load_counts(serialized_counts)
+    codings = build_tree(counts_to_nodes(symbols_counts)).get_codings()
+    return [len(codings[symbol]) for symbol, _ in symbols_counts]
+
+
+def read_info(filepath: Path) -> FileInfo:
+    """
+    Reads sizes of the file encoded with basic Huffman algorithm and statistics of its contents
+    from symbol counts in its header, without decoding the contents
+
+    Args:
+        filepath (Path): Encoded file
+
+    Raises:
+        ValueError: Raised if file was not encoded with basic Huffman algorithm
+
+    Returns:
+        FileInfo: Info of the file. Statistics of files encoded with context model are not
+        known. Original size of files in basic format includes padding of the last symbol.
+    """
     with open(filepath, "rb") as reader:
-        header = reader.read(6)
-        end_padding = ba2int(get_n_bits(header[0:1], 1, 3))
-        counts_len = int.from_bytes(header[1:5], byteorder="big")
-        extension_len = header[-1]
+        header = _read_header(reader)
+    compressed_size = filepath.stat().st_size
+    if header.flags & CONTEXT_MODEL:
+        return FileInfo("basic Huffman", compressed_size, header.contents_size)
+
+    _, symbol_size = counts_shape(header.serialized_counts)
+    counts = Counter(dict(iter_counts(header.serialized_counts)))
+    # Counts include symbols of the extension, which are encoded separately
+    extension, _ = decoder(header.serialized_counts).decode(header.encoded_extension)
+    counts.subtract(extension)
+    # Counter keeps order of serialized counts
+    code_lengths = _code_lengths(header.serialized_counts)
+    code_len = sum(count * length for count, length in zip(counts.values(), code_lengths))
+
+    if header.flags & RUN_LENGTH:
+        # Symbols of the extension, which are not tokens, are left with zero counts
+        tokens = (
+            (token.to_bytes(symbol_size, SYMBOL_BYTEORDER), count)
+            for token, count in counts.items()
+            if count > 0
+        )
+        original_size = decoded_size(tokens, symbol_size - 1)
+    elif header.contents_size is not None:
+        original_size = header.contents_size
+    else:
+        original_size = counts.total() * symbol_size
+    return histogram_info(
+        "basic Huffman",
+        compressed_size,
+        original_size,
+        symbol_size,
+        list(counts.values()),
+        code_len,
+    )
+
+
+def decode_range(filepath: Path, start: int, length: int) -> bytes:
+    """
+    Decodes a part of the file encoded with index. Only codes following the last index entry
+    before `start` are read.
 
-        chunk = reader.read(counts_len + ceil(extension_len / 8))
+    Args:
+        filepath (Path): File encoded with index
+        start (int): Offset of the first decoded byte in the original file
+        length (int): Number of decoded bytes
 
-        symbols_counts = np_deserialize(chunk[:counts_len])
+    Raises:
+        ValueError: Raised if file was not encoded with basic Huffman algorithm with index
 
-        leaves = counts_to_nodes(symbols_counts)
-        decoding_tree = build_tree(leaves)
+    Returns:
+        bytes: Decoded part of the file, shorter than `length` if it reaches behind the end of
+        the file
+    """
+    with open(filepath, "rb") as reader:
+        header = _read_header(reader)
+        if not header.flags & INDEXED:
+            raise ValueError(f"{filepath} was encoded without index")
+        contents_offset = reader.tell()
+        end = min(start + length, header.contents_size)
+        if start >= end:
+            return b""
+
+        symbol_decoder = decoder(header.serialized_counts)
+        symbol_size = symbol_decoder.symbol_size
+
+        reader.seek(-INDEX_FOOTER_SIZE, os.SEEK_END)
+        footer = reader.read(INDEX_FOOTER_SIZE)
+        index_interval = int.from_bytes(footer[:4], byteorder="big")
+        n_entries = int.from_bytes(footer[4:], byteorder="big")
+        index_offset = reader.tell() - INDEX_FOOTER_SIZE - n_entries * 8
+
+        first_symbol = start // symbol_size
+        entry = first_symbol // index_interval
+        reader.seek(index_offset + entry * 8)
+        bit_offset = int.from_bytes(reader.read(8), byteorder="big")
+
+        n_symbols = ceil(end / symbol_size) - entry * index_interval
+        n_bytes = ceil((bit_offset % 8 + n_symbols * symbol_decoder.max_length) / 8)
+        reader.seek(contents_offset + bit_offset // 8)
+        code = bytes2ba(reader.read(min(n_bytes, index_offset - reader.tell())))
+        symbols, _ = symbol_decoder.decode(code[bit_offset % 8 :])
+        decoded = symbols2bytes(symbols[:n_symbols], symbol_size)
+    skipped = entry * index_interval * symbol_size
+    return decoded[start - skipped : end - skipped]
+
+
+def decode(filepath: Path, destination: Path, pipeline: Pipeline | None = None):
+    """
+    Decodes file encoded with basic Huffman algorithm
 
-        encoded_extension = bytes2ba(chunk[counts_len:])
-        encoded_extension = encoded_extension[:extension_len]
-        extension, _ = _decode_codeblock(encoded_extension, decoding_tree)
-        while extension[-1:] == b"\x00":
-            extension = extension[:-1]
+    Args:
+        filepath (Path): Encoded file
+        destination (Path): Path where decoded file will be saved, its extension is replaced
+            with the extension of the original file
+        pipeline (Pipeline | None, optional): If given, encoded contents are read and decoded
+            file is written by background threads of the pipeline. Defaults to None.
+    """
+    with open(filepath, "rb") as file:
+        header = _read_header(file)
+        flags = header.flags
+        end_padding = header.end_padding
+        contents_size = header.contents_size
+        encoded_extension = header.encoded_extension
+
+        if flags & CONTEXT_MODEL:
+            from src.contextModel import load_model
+
+            model = load_model(header.serialized_counts)
+            extension = model.decode_extension(encoded_extension)
+
+            def decode_contents(reader: BinaryIO, writer: BinaryIO):
+                model.decode_contents(reader, writer, contents_size)  # type: ignore
+
+        else:
+            symbol_decoder = decoder(header.serialized_counts)
+            symbol_size = symbol_decoder.symbol_size
+            extension = _decode_extension(encoded_extension, header.serialized_counts)
+
+            def decode_symbols(reader, writer):
+                if flags & INTERLEAVED:
+                    from src.interleaved import InterleavedDecoder
+
+                    encodings, _ = code_table(header.serialized_counts)
+                    interleaved_decoder = InterleavedDecoder(encodings, symbol_decoder)
+                    interleaved_decoder.decode(reader, writer, contents_size)  # type: ignore
+                else:
+                    _decode_contents(reader, writer, symbol_decoder, end_padding, contents_size)
+
+            def decode_contents(reader: BinaryIO, writer: BinaryIO):
+                if flags & RUN_LENGTH:
+                    run_length_writer = RunLengthWriter(writer, symbol_size - 1)
+                    decode_symbols(reader, run_length_writer)
+                    run_length_writer.finish()
+                else:
+                    decode_symbols(reader, writer)
 
         destination = destination.with_suffix(extension.decode())
-        with open(destination, "wb") as writer:
-            remainder = bitarray()
-            encoded = bitarray()
-            decoded = bytes()
-            # Iterator will stop when b"" is read (EOF)
-            for chunk in iter(lambda: reader.read(2**10), b""):
-                decoded, remainder = _decode_codeblock(encoded, decoding_tree)
-                writer.write(decoded)
-                # Operations up to this moment were executed data from chunk from previous iteration
-                code = bitarray()
-                code.frombytes(chunk)
-                encoded = remainder + code
-            # Encoded here is the last not-empty chunk from reader
-            if end_padding > 0:
-                encoded = encoded[:-end_padding]
-            decoded, _ = _decode_codeblock(encoded, decoding_tree)
-            while decoded[-1:] == b"\x00":
-                decoded = decoded[:-1]
-            writer.write(decoded)
+        with optional_reader(file, pipeline) as reader:
+            if flags & TRANSFORM_MED:
+                from src.transform import med_inverse
+
+                with TemporaryDirectory() as directory:
+                    residuals = Path(directory).joinpath(destination.name)
+                    with open(residuals, "wb") as output:
+                        with optional_writer(output, pipeline) as writer:
+                            decode_contents(reader, writer)
+                    med_inverse(residuals, destination)
+            else:
+                with open(destination, "wb") as output:
+                    with optional_writer(output, pipeline) as writer:
+                        decode_contents(reader, writer)
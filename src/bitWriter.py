@@ -0,0 +1,77 @@
+from typing import BinaryIO
+
+#   Codes are appended to an integer holding bits that don't form whole bytes yet. Whole bytes
+#   are moved to a preallocated block, which is written to the file when it is full, so that
+#   every write except for the last one has exactly `block_size` bytes.
+
+DEFAULT_BLOCK_SIZE = 2**20
+# Bits gathered in the integer before whole bytes are moved to the block, shifting longer
+# integers costs more than moving bytes more often
+PENDING_BITS = 256
+
+
+class BitWriter:
+    def __init__(self, file: BinaryIO, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Args:
+            file (BinaryIO): File opened for writing, positioned at a byte where bits start
+            block_size (int, optional): Number of bytes written at once. Defaults to
+                DEFAULT_BLOCK_SIZE.
+        """
+        self.file = file
+        self.block = bytearray(block_size)
+        self.filled = 0
+        self.pending = 0
+        self.pending_len = 0
+        self.written_bits = 0
+
+    def __len__(self) -> int:
+        """
+        Returns:
+            int: Number of bits written so far, including ones not flushed to the file
+        """
+        return self.written_bits
+
+    def write(self, code: int, length: int):
+        """
+        Appends a code
+
+        Args:
+            code (int): Bits of the code as an unsigned integer, the first bit is the most
+                significant one
+            length (int): Number of bits of the code
+        """
+        self.pending = self.pending << length | code
+        self.pending_len += length
+        self.written_bits += length
+        if self.pending_len >= PENDING_BITS:
+            self._move_bytes()
+
+    def _move_bytes(self):
+        n_bytes, self.pending_len = divmod(self.pending_len, 8)
+        data = (self.pending >> self.pending_len).to_bytes(n_bytes, byteorder="big")
+        self.pending &= (1 << self.pending_len) - 1
+        offset = 0
+        while offset < n_bytes:
+            n_copied = min(n_bytes - offset, len(self.block) - self.filled)
+            self.block[self.filled : self.filled + n_copied] = data[offset : offset + n_copied]
+            self.filled += n_copied
+            offset += n_copied
+            if self.filled == len(self.block):
+                self.file.write(self.block)
+                self.filled = 0
+
+    def finish(self) -> int:
+        """
+        Writes remaining bits to the file, the last byte is padded with zeros
+
+        Returns:
+            int: Number of padding bits
+        """
+        padding = -self.pending_len % 8
+        self.pending <<= padding
+        self.pending_len += padding
+        self._move_bytes()
+        self.file.write(self.block[: self.filled])
+        self.filled = 0
+        return padding
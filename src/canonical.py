@@ -0,0 +1,113 @@
+from bitarray import bitarray
+from bitarray.util import ba2int
+
+#   Canonical Huffman codes are described by number of codes of every length and list of
+#   symbols sorted by their codes. Codes of the same length are consecutive integers, the first
+#   code of every length is created by appending 0 to the last code of the previous length
+#   incremented by 1.
+#
+#   serialized table structure:
+#   1 byte to specify length of the longest code (L)
+#   L * 2 bytes: numbers of codes of lengths 1..L
+#   sum of above numbers bytes: symbols sorted by their codes
+
+ROOT_BITS = 10
+
+
+def serialize_table(count: list[int], symbols: list[int]) -> bytes:
+    """
+    Serializes canonical Huffman code of 1 byte symbols
+
+    Args:
+        count (list[int]): Numbers of codes of every length, starting with length 0
+        symbols (list[int]): Symbols sorted by their codes
+
+    Returns:
+        bytes: Serialized code
+    """
+    max_length = len(count) - 1
+    serialized = max_length.to_bytes(length=1, byteorder="big")
+    for length in range(1, max_length + 1):
+        serialized += count[length].to_bytes(length=2, byteorder="big")
+    return serialized + bytes(symbols)
+
+
+def deserialize_table(serialized: bytes, offset: int = 0):
+    """
+    Deserializes canonical Huffman code of 1 byte symbols
+
+    Args:
+        serialized (bytes): Data containing serialized code
+        offset (int, optional): Index of the first byte of serialized code. Defaults to 0.
+
+    Returns:
+        tuple[list[int], list[int], int]: Numbers of codes of every length, symbols sorted by
+        their codes and index of the first byte after serialized code
+    """
+    max_length = serialized[offset]
+    offset += 1
+    count = [0]
+    for _ in range(max_length):
+        count.append(int.from_bytes(serialized[offset : offset + 2], byteorder="big"))
+        offset += 2
+    symbols = list(serialized[offset : offset + sum(count)])
+    return count, symbols, offset + sum(count)
+
+
+class DecodeTable:
+    """
+    Lookup table decoding canonical Huffman codes. Codes not longer than `root_bits` are decoded
+    with a single lookup, longer ones are decoded by comparing them with the first codes of
+    every length.
+    """
+
+    def __init__(self, count: list[int], symbols: list, root_bits: int = ROOT_BITS):
+        self.max_length = len(count) - 1
+        self.root_bits = min(root_bits, self.max_length)
+        self.count = count
+        self.symbols = symbols
+
+        # First code and index of its symbol for every length
+        self.first_code = [0] * len(count)
+        self.first_index = [0] * len(count)
+        code = 0
+        index = 0
+        for length in range(1, len(count)):
+            self.first_code[length] = code
+            self.first_index[length] = index
+            code = (code + count[length]) << 1
+            index += count[length]
+
+        # Lengths equal to 0 mark prefixes of codes longer than root_bits
+        self.root_symbols: list = [None] * 2**self.root_bits
+        self.root_lengths = [0] * 2**self.root_bits
+        for length in range(1, self.root_bits + 1):
+            fill = self.root_bits - length
+            for i in range(count[length]):
+                start = (self.first_code[length] + i) << fill
+                symbol = symbols[self.first_index[length] + i]
+                for value in range(start, start + 2**fill):
+                    self.root_symbols[value] = symbol
+                    self.root_lengths[value] = length
+
+    def decode(self, code: bitarray, position: int):
+        """
+        Decodes a single symbol
+
+        Args:
+            code (bitarray): Encoded data, needs to contain at least `max_length` bits after
+                `position`, pad it with zeros if necessary
+            position (int): Index of the first bit of the code
+
+        Returns:
+            tuple[Any, int]: Decoded symbol and length of its code
+        """
+        value = ba2int(code[position : position + self.root_bits])
+        length = self.root_lengths[value]
+        if length:
+            return self.root_symbols[value], length
+        for length in range(self.root_bits + 1, self.max_length + 1):
+            value = ba2int(code[position : position + length]) - self.first_code[length]
+            if value < self.count[length]:
+                return self.symbols[self.first_index[length] + value], length
+        raise ValueError("Data does not contain a valid code")
@@ -0,0 +1,374 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+from bitarray import bitarray
+from bitarray.util import canonical_huffman, zeros
+
+from src.canonical import DecodeTable, deserialize_table, serialize_table
+from src.utility import read_chunks
+
+#   Order-1 model of 1 byte symbols. Every symbol is encoded with a code table chosen by its
+#   context - the most significant bits of the previous symbol (0 for the first symbol).
+#   Contexts with few symbols share a single table.
+#
+#   serialized model structure:
+#   1 byte to specify number of bits of the previous symbol forming the context (b)
+#   2^b bytes: indices of code tables used in every context
+#   1 byte to specify number of code tables (t)
+#   t serialized canonical code tables
+
+CONTEXT_BITS = 4
+MIN_CONTEXT_SYMBOLS = 2**10
+CHUNK_SIZE = 2**16
+# Number of bits looked up at once while decoding, codes of all symbols fitting in them are
+# decoded together. Bits are read from 3 bytes, so there can be at most 17 of them.
+DECODE_BITS = 12
+# Number of recently used models kept in memory
+MODEL_CACHE_SIZE = 16
+
+
+def _context_keys(data: bytes, previous: int, shift: int) -> np.ndarray:
+    """
+    Combines symbols with their contexts into keys equal to (context << 8) + symbol
+    """
+    symbols = np.frombuffer(data, dtype=np.uint8).astype(np.int64)
+    previous_symbols = np.concatenate(([previous], symbols[:-1]))[: len(symbols)]
+    return ((previous_symbols >> shift) << 8) + symbols
+
+
+def count_contexts(filepath: Path, context_bits: int = CONTEXT_BITS) -> np.ndarray:
+    """
+    Counts symbols of the file and its extension in every context
+
+    Args:
+        filepath (Path): File to count symbols in
+        context_bits (int, optional): Number of bits of the previous symbol forming the context.
+            Defaults to CONTEXT_BITS.
+
+    Returns:
+        np.ndarray: Array of shape (2^context_bits, 256) with numbers of symbols in every context
+    """
+    shift = 8 - context_bits
+    counts = np.zeros(256 << context_bits, dtype=np.int64)
+    extension_keys = _context_keys(filepath.suffix.encode(), 0, shift)
+    counts += np.bincount(extension_keys, minlength=len(counts))
+    previous = 0
+    for chunk in read_chunks(filepath, CHUNK_SIZE):
+        counts += np.bincount(_context_keys(chunk, previous, shift), minlength=len(counts))
+        previous = chunk[-1]
+    return counts.reshape(-1, 256)
+
+
+class ContextModel:
+    def __init__(self, context_map: list[int], tables: list[tuple[list[int], list[int]]]):
+        """
+        Args:
+            context_map (list[int]): Index of code table used in every context
+            tables (list[tuple[list[int], list[int]]]): Canonical code tables, pairs of numbers
+                of codes of every length (starting with length 0) and symbols sorted by codes
+        """
+        self.context_bits = (len(context_map) - 1).bit_length()
+        self.shift = 8 - self.context_bits
+        self.context_map = context_map
+        self.tables = tables
+        self.codes = self._build_codes()
+        self.decode_tables = [DecodeTable(count, symbols) for count, symbols in tables]
+        self.max_length = max((table.max_length for table in self.decode_tables), default=0)
+        # Number of bits needed after the last decoded code
+        self.lookahead = max(self.max_length, DECODE_BITS)
+        self._entries: list[tuple[bytes, int, int]] | None = None
+
+    @classmethod
+    def from_counts(cls, counts: np.ndarray, min_context_symbols: int = MIN_CONTEXT_SYMBOLS):
+        """
+        Creates code tables for contexts, contexts with less than `min_context_symbols` symbols
+        share a single table
+
+        Args:
+            counts (np.ndarray): Numbers of symbols in every context, as returned by
+                `count_contexts`
+            min_context_symbols (int, optional): Minimal number of symbols in a context with its
+                own table. Defaults to MIN_CONTEXT_SYMBOLS.
+
+        Returns:
+            ContextModel: Model with code tables built from counts
+        """
+        totals = counts.sum(axis=1)
+        shared = (totals > 0) & (totals < min_context_symbols)
+        frequencies = []
+        # Empty data is encoded with a shared table too
+        if shared.any() or not totals.any():
+            frequencies.append(counts[shared].sum(axis=0))
+        context_map = [0] * len(counts)
+        for context, total in enumerate(totals):
+            if total >= min_context_symbols:
+                context_map[context] = len(frequencies)
+                frequencies.append(counts[context])
+
+        tables = []
+        for frequency in frequencies:
+            symbol_frequencies = {
+                int(symbol): int(frequency[symbol]) for symbol in np.flatnonzero(frequency)
+            }
+            if not symbol_frequencies:
+                # Like in `pad_counts` of basicHuffman.py, a symbol with zero count is added
+                symbol_frequencies[0] = 0
+            _, count, symbols = canonical_huffman(symbol_frequencies)
+            tables.append((count, symbols))
+        return cls(context_map, tables)
+
+    def _build_codes(self) -> dict[int, bitarray]:
+        """
+        Returns:
+            dict[int, bitarray]: Codes of symbols in contexts, keys are equal to
+            (context << 8) + symbol
+        """
+        table_codes = []
+        for count, symbols in self.tables:
+            codes = {}
+            code = 0
+            index = 0
+            for length in range(1, len(count)):
+                for _ in range(count[length]):
+                    codes[symbols[index]] = bitarray(format(code, f"0{length}b"))
+                    code += 1
+                    index += 1
+                code <<= 1
+            table_codes.append(codes)
+        return {
+            (context << 8) + symbol: code
+            for context, table_index in enumerate(self.context_map)
+            for symbol, code in table_codes[table_index].items()
+        }
+
+    def serialize(self) -> bytes:
+        serialized = self.context_bits.to_bytes(length=1, byteorder="big")
+        serialized += bytes(self.context_map)
+        serialized += len(self.tables).to_bytes(length=1, byteorder="big")
+        for count, symbols in self.tables:
+            serialized += serialize_table(count, symbols)
+        return serialized
+
+    @classmethod
+    def deserialize(cls, serialized: bytes):
+        context_bits = serialized[0]
+        context_map = list(serialized[1 : 1 + 2**context_bits])
+        offset = 1 + 2**context_bits
+        n_tables = serialized[offset]
+        offset += 1
+        tables = []
+        for _ in range(n_tables):
+            count, symbols, offset = deserialize_table(serialized, offset)
+            tables.append((count, symbols))
+        return cls(context_map, tables)
+
+    def code_len(self, counts: np.ndarray) -> int:
+        """
+        Computes number of bits taken by encoded symbols
+
+        Args:
+            counts (np.ndarray): Numbers of symbols in every context, as returned by
+                `count_contexts`
+
+        Returns:
+            int: Number of bits
+        """
+        flat_counts = counts.reshape(-1)
+        return sum(int(flat_counts[key]) * len(code) for key, code in self.codes.items())
+
+    def encode_symbols(self, data: bytes, previous: int = 0) -> bitarray:
+        code = bitarray()
+        code.encode(self.codes, _context_keys(data, previous, self.shift).tolist())
+        return code
+
+    def encode_extension(self, filepath: Path):
+        code = self.encode_symbols(filepath.suffix.encode())
+        return (code.tobytes(), len(code))
+
+    def encode_contents(self, filepath: Path):
+        """
+        Encode contents of file in chunks.
+
+        Args:
+            filepath (Path): Path to the file to encode
+
+        Yields:
+            tuple[bytes, int]: Pair of encoded chunk of data and number of bits in the chunk that
+            encode original information. Only the last chunk is padded to full bytes.
+        """
+        code = bitarray()
+        previous = 0
+        for chunk in read_chunks(filepath, CHUNK_SIZE):
+            code += self.encode_symbols(chunk, previous)
+            previous = chunk[-1]
+            whole_bytes = len(code) // 8 * 8
+            yield code[:whole_bytes].tobytes(), whole_bytes
+            code = code[whole_bytes:]
+        yield code.tobytes(), len(code)
+
+    def _decode_entries(self) -> list[tuple[bytes, int, int]]:
+        """
+        Builds lookup table decoding at once all codes fitting in DECODE_BITS bits, following
+        changes of contexts. Entries are indexed by (table << DECODE_BITS) + bits, where table
+        is the index of the code table of the first code.
+
+        Returns:
+            list[tuple[bytes, int, int]]: Decoded symbols, number of bits taken by their codes
+            and index of the table of the next code shifted by DECODE_BITS. Entries of bits
+            starting with a longer code are empty.
+        """
+        if self._entries is not None:
+            return self._entries
+        size = 1 << DECODE_BITS
+        n_entries = len(self.tables) * size
+        # Symbol and length of the first code of bits in every table, length is 0 if the code
+        # is longer
+        first_symbols = np.zeros(n_entries, dtype=np.int64)
+        first_lengths = np.zeros(n_entries, dtype=np.int64)
+        for index, (count, symbols) in enumerate(self.tables):
+            code = 0
+            first = 0
+            for length in range(1, min(DECODE_BITS, len(count) - 1) + 1):
+                fill = DECODE_BITS - length
+                start = index * size + (code << fill)
+                end = start + (count[length] << fill)
+                length_symbols = symbols[first : first + count[length]]
+                first_symbols[start:end] = np.repeat(length_symbols, 1 << fill)
+                first_lengths[start:end] = length
+                code = (code + count[length]) << 1
+                first += count[length]
+        next_tables = np.array(self.context_map)[np.arange(256) >> self.shift]
+
+        # Codes are decoded from all entries together, until none of them fits
+        tables = np.repeat(np.arange(len(self.tables)), size)
+        bits = np.tile(np.arange(size), len(self.tables))
+        used = np.zeros(n_entries, dtype=np.int64)
+        n_symbols = np.zeros(n_entries, dtype=np.int64)
+        decoded = [np.zeros(n_entries, dtype=np.uint8)]
+        while True:
+            index = tables * size + ((bits << used) & (size - 1))
+            lengths = first_lengths[index]
+            fits = (lengths > 0) & (used + lengths <= DECODE_BITS)
+            if not fits.any():
+                break
+            symbols = first_symbols[index]
+            decoded.append(symbols.astype(np.uint8))
+            used += np.where(fits, lengths, 0)
+            n_symbols += fits
+            tables = np.where(fits, next_tables[symbols], tables)
+
+        # Rows of symbols decoded by entries, once a code does not fit the next are ignored
+        rows = np.stack(decoded[1:], axis=1).tobytes()
+        depth = len(decoded) - 1
+        self._entries = list(
+            zip(
+                [rows[i * depth : i * depth + n] for i, n in enumerate(n_symbols.tolist())],
+                used.tolist(),
+                (tables << DECODE_BITS).tolist(),
+            )
+        )
+        return self._entries
+
+    def _decode_symbols(self, code: bitarray, end: int, n_symbols: int, previous: int):
+        """
+        Decodes symbols until `n_symbols` are decoded or position of the next code reaches `end`
+
+        Args:
+            code (bitarray): Encoded symbols followed by at least `lookahead` bits after `end`
+            end (int): Position after the last code to decode
+            n_symbols (int): Maximal number of decoded symbols
+            previous (int): Symbol preceding the first code
+
+        Returns:
+            tuple[bytearray, int]: Decoded symbols and position of the next code, it is not
+            exact if decoding stopped after `n_symbols`
+        """
+        entries = self._decode_entries()
+        decode_bits = DECODE_BITS
+        # Bits following every bit are read from 3 bytes starting with its byte
+        data = np.frombuffer(code.tobytes() + bytes(2), dtype=np.uint8).astype(np.uint32)
+        words = (data[:-2] << 16 | data[1:-1] << 8 | data[2:]).tolist()
+        shift = 24 - decode_bits
+        mask = (1 << decode_bits) - 1
+
+        parts: list[bytes] = []
+        append = parts.append
+        position = 0
+        table = self.context_map[previous >> self.shift] << decode_bits
+        # Entries decode codes up to DECODE_BITS after position, they must not pass the end
+        last = end - decode_bits
+        while position <= last:
+            symbols, length, next_table = entries[
+                table + (words[position >> 3] >> shift - (position & 7) & mask)
+            ]
+            if length:
+                append(symbols)
+                position += length
+                table = next_table
+            else:
+                symbol, length = self.decode_tables[table >> decode_bits].decode(code, position)
+                append(bytes([symbol]))
+                position += length
+                table = self.context_map[symbol >> self.shift] << decode_bits
+
+        decoded = bytearray().join(parts)
+        while position < end and len(decoded) < n_symbols:
+            symbol, length = self.decode_tables[table >> DECODE_BITS].decode(code, position)
+            decoded.append(symbol)
+            position += length
+            table = self.context_map[symbol >> self.shift] << DECODE_BITS
+        del decoded[n_symbols:]
+        return decoded, position
+
+    def decode_extension(self, code: bitarray) -> bytes:
+        end = len(code)
+        code = code + zeros(self.lookahead)
+        extension, _ = self._decode_symbols(code, end, end, 0)
+        return bytes(extension)
+
+    def decode_contents(self, reader: BinaryIO, writer: BinaryIO, contents_size: int):
+        """
+        Decodes contents of the file
+
+        Args:
+            reader (BinaryIO): Encoded file positioned at the beginning of encoded contents
+            writer (BinaryIO): File decoded contents are written to
+            contents_size (int): Size of decoded contents in bytes
+        """
+        code = bitarray()
+        position = 0
+        previous = 0
+        while contents_size > 0:
+            chunk = reader.read(CHUNK_SIZE)
+            code = code[position:]
+            code.frombytes(chunk)
+            is_last = len(chunk) < CHUNK_SIZE
+            if is_last:
+                # Codes can end at the last bit of data
+                end = len(code)
+                code.extend(zeros(self.lookahead))
+            else:
+                end = len(code) - self.lookahead
+            decoded, position = self._decode_symbols(code, end, contents_size, previous)
+            writer.write(decoded)
+            contents_size -= len(decoded)
+            if decoded:
+                previous = decoded[-1]
+            if is_last and contents_size > 0:
+                raise ValueError("Encoded contents are shorter than expected")
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def load_model(serialized: bytes) -> ContextModel:
+    """
+    Deserializes context model, recently used models are cached, so they must not be modified
+
+    Args:
+        serialized (bytes): Model serialized with `ContextModel.serialize`
+
+    Returns:
+        ContextModel: Deserialized model
+    """
+    return ContextModel.deserialize(serialized)
@@ -0,0 +1,233 @@
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import Callable
+
+from src.daemonClient import DEFAULT_SOCKET
+
+#   Daemon runs command line tools in a pool of worker processes, which keep recently used code
+#   tables in memory between jobs. Clients connect to a Unix domain socket and send a single
+#   request, the daemon answers with a single response. Both are JSON objects followed by
+#   a newline.
+#
+#   requests:
+#   {"command": "run", "tool": name, "argv": [arguments], "cwd": working directory}
+#       response: {"status": exit status, "output": printed text}
+#   {"command": "metrics"}
+#       response: numbers of jobs and failures and time spent in every tool, and statistics of
+#                 caches of code tables and decoders summed over worker processes
+#   {"command": "shutdown"}
+#       response: {"status": 0}
+#
+#   The socket can be used only by its owner. Jobs that could not be run, e.g. because their
+#   worker process died, get a response with status 1 and the error as output.
+
+
+def _cache_stats() -> dict[str, dict[str, int]]:
+    """
+    Returns:
+        dict[str, dict[str, int]]: Hits, misses and sizes of caches of modules imported by jobs
+    """
+    caches = {}
+    if "src.basicHuffman" in sys.modules:
+        caches["code_tables"] = sys.modules["src.basicHuffman"].code_table.cache_info()
+        caches["decoders"] = sys.modules["src.basicHuffman"].decoder.cache_info()
+    if "src.contextModel" in sys.modules:
+        caches["context_models"] = sys.modules["src.contextModel"].load_model.cache_info()
+    return {
+        name: {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+        for name, info in caches.items()
+    }
+
+
+def _run_job(tool: str, main: Callable[[list[str]], None], argv: list[str], cwd: str) -> dict:
+    """
+    Runs tool in a worker process, capturing everything it prints
+    """
+    output = StringIO()
+    status = 0
+    start = time.perf_counter()
+    os.chdir(cwd)
+    # Name of the tool is shown in usage messages
+    sys.argv = [f"{tool}.py", *argv]
+    with redirect_stdout(output), redirect_stderr(output):
+        try:
+            main(argv)
+        except SystemExit as exit:
+            if isinstance(exit.code, int):
+                status = exit.code
+            elif exit.code is not None:
+                print(exit.code)
+                status = 1
+        except Exception as error:
+            print(f"{type(error).__name__}: {error}")
+            status = 1
+    return {
+        "status": status,
+        "output": output.getvalue(),
+        "seconds": time.perf_counter() - start,
+        "pid": os.getpid(),
+        "caches": _cache_stats(),
+    }
+
+
+def _prepare_socket(socket_path: Path):
+    """
+    Creates private directory of the default socket and removes socket left by a daemon that
+    has stopped
+
+    Args:
+        socket_path (Path): Path of the socket
+
+    Raises:
+        PermissionError: Raised if directory of the default socket is accessible by other users
+        FileExistsError: Raised if the path exists and is not a socket
+        OSError: Raised if another daemon answers at the socket
+    """
+    if socket_path == DEFAULT_SOCKET:
+        socket_path.parent.mkdir(mode=0o700, exist_ok=True)
+        directory = socket_path.parent.lstat()
+        if (
+            not stat.S_ISDIR(directory.st_mode)
+            or directory.st_uid != os.getuid()
+            or directory.st_mode & 0o077
+        ):
+            raise PermissionError(f"{socket_path.parent} is not a private directory")
+    try:
+        mode = socket_path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{socket_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(str(socket_path))
+        except ConnectionRefusedError:
+            socket_path.unlink()
+            return
+    raise OSError(f"Another daemon is running at {socket_path}")
+
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        tools: dict[str, Callable[[list[str]], None]],
+        socket_path: Path = DEFAULT_SOCKET,
+        workers: int | None = None,
+    ):
+        """
+        Args:
+            tools (dict[str, Callable[[list[str]], None]]): Names of tools and their functions
+                called with command line arguments. Functions must be importable by workers.
+            socket_path (Path, optional): Path of the socket. Defaults to DEFAULT_SOCKET.
+            workers (int | None, optional): Number of worker processes. Defaults to None (number
+                of processors).
+
+        Raises:
+            OSError: Raised if another daemon is running at the socket or the socket can't be
+                created
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        _prepare_socket(socket_path)
+        # Socket is created with permissions of its owner only
+        umask = os.umask(0o177)
+        try:
+            super().__init__(str(socket_path), _RequestHandler)
+        finally:
+            os.umask(umask)
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+        self.tools = tools
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(workers)
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.jobs = defaultdict[str, int](int)
+        self.failures = defaultdict[str, int](int)
+        self.seconds = defaultdict[str, float](float)
+        self.worker_caches: dict[int, dict] = {}
+
+    def run(self, tool: str, argv: list[str], cwd: str) -> dict:
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        if tool not in self.tools:
+            return {"status": 2, "output": f"Unknown tool: {tool}\n"}
+        pool = self.pool
+        try:
+            result = pool.submit(_run_job, tool, self.tools[tool], argv, cwd).result()
+        except Exception as error:
+            with self.lock:
+                self.jobs[tool] += 1
+                self.failures[tool] += 1
+                # A worker died and the pool stopped all of them, the first failed job replaces it
+                if isinstance(error, BrokenProcessPool) and pool is self.pool:
+                    self.pool = ProcessPoolExecutor(self.workers)
+                    self.worker_caches.clear()
+            return {"status": 1, "output": f"{type(error).__name__}: {error}\n"}
+        with self.lock:
+            self.jobs[tool] += 1
+            self.failures[tool] += result["status"] != 0
+            self.seconds[tool] += result["seconds"]
+            self.worker_caches[result["pid"]] = result["caches"]
+        return {"status": result["status"], "output": result["output"]}
+
+    def metrics(self) -> dict:
+        with self.lock:
+            caches = defaultdict[str, dict[str, int]](lambda: defaultdict(int))
+            for worker_caches in self.worker_caches.values():
+                for name, stats in worker_caches.items():
+                    for field, value in stats.items():
+                        caches[name][field] += value
+            return {
+                "uptime": time.time() - self.started,
+                "workers": len(self.worker_caches),
+                "jobs": dict(self.jobs),
+                "failures": dict(self.failures),
+                "seconds": dict(self.seconds),
+                "caches": {name: dict(stats) for name, stats in caches.items()},
+            }
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: Daemon
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # Connection was closed without request, e.g. by a daemon checking the socket
+            return
+        try:
+            request = json.loads(line)
+            match request.get("command"):
+                case "run":
+                    response = self.server.run(request["tool"], request["argv"], request["cwd"])
+                case "metrics":
+                    response = self.server.metrics()
+                case "shutdown":
+                    # Shutdown waits for the serving loop to end, so its thread can't call it
+                    threading.Thread(target=self.server.shutdown).start()
+                    response = {"status": 0}
+                case command:
+                    response = {"status": 2, "output": f"Unknown command: {command}\n"}
+        except (ValueError, KeyError, AttributeError) as error:
+            response = {"status": 2, "output": f"Invalid request: {error}\n"}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
@@ -0,0 +1,34 @@
+import json
+import os
+import socket
+import tempfile
+from pathlib import Path
+
+# Protocol of the daemon is described in src/daemon.py, this module doesn't import the codec
+
+# Directory of the default socket is accessible only by its owner, so that other users can't
+# send jobs to the daemon or replace its socket
+DEFAULT_SOCKET = Path(tempfile.gettempdir()).joinpath(f"huffman-{os.getuid()}", "daemon.sock")
+
+
+def send_request(request: dict, socket_path: Path = DEFAULT_SOCKET) -> dict:
+    """
+    Sends request to the daemon and waits for the response
+
+    Args:
+        request (dict): Request described at the top of the module
+        socket_path (Path, optional): Path of the socket of the daemon. Defaults to
+            DEFAULT_SOCKET.
+
+    Raises:
+        OSError: Raised if the daemon is not running
+
+    Returns:
+        dict: Response of the daemon
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(str(socket_path))
+        with connection.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
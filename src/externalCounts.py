@@ -0,0 +1,159 @@
+import heapq
+import struct
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import BinaryIO, Iterable, Iterator
+
+from src.npy import save_counts_stream
+from src.utility import bytes2symbols, read_symbols
+
+#   Symbols are counted in memory until the counter holds as many symbols as fit in the memory
+#   budget. Then its items are sorted by symbols and spilled to a temporary file (a run) and
+#   counting continues with an empty counter. Runs are merged in streaming passes, which add
+#   counts of equal symbols, so apart from the returned serialized counts the memory used
+#   doesn't depend on the number of distinct symbols.
+#
+#   run structure: records sorted by symbols:
+#       s bytes: symbol, big-endian, so that records are ordered like their bytes
+#       8 bytes: count, big-endian
+
+DEFAULT_MEMORY_BUDGET = 2**28
+# Smaller budgets would make runs so short that merging them would take too long
+MIN_MEMORY_BUDGET = 2**20
+# Approximate number of bytes taken by an item of Counter with its int objects, including
+# memory used temporarily while the counter grows and while its items are sorted
+COUNTER_ENTRY_SIZE = 160
+# Maximal number of runs merged at once, more runs are merged in several passes
+MAX_MERGED_RUNS = 64
+# Maximal size of buffers of runs read or written at once
+RUN_BUFFER_SIZE = 2**16
+
+
+def _write_run(
+    file: BinaryIO, items: Iterable[tuple[bytes, int]], record: struct.Struct, buffer_size: int
+) -> tuple[int, int]:
+    """
+    Returns:
+        tuple[int, int]: Number of written records and the largest count
+    """
+    n_records = 0
+    max_count = 0
+    buffer = bytearray()
+    for symbol, count in items:
+        buffer += record.pack(symbol, count)
+        n_records += 1
+        max_count = max(max_count, count)
+        if len(buffer) >= buffer_size:
+            file.write(buffer)
+            buffer.clear()
+    file.write(buffer)
+    return n_records, max_count
+
+
+def _read_run(
+    file: BinaryIO, record: struct.Struct, buffer_size: int
+) -> Iterator[tuple[bytes, int]]:
+    block_size = max(buffer_size // record.size, 1) * record.size
+    while block := file.read(block_size):
+        yield from record.iter_unpack(block)
+
+
+def _merge(runs: list[Iterator[tuple[bytes, int]]]) -> Iterator[tuple[bytes, int]]:
+    """
+    Merges sorted runs, adding counts of equal symbols
+
+    Yields:
+        tuple[bytes, int]: Symbol and its count, in order of symbols
+    """
+    symbol, count = None, 0
+    for next_symbol, next_count in heapq.merge(*runs):
+        if next_symbol == symbol:
+            count += next_count
+            continue
+        if symbol is not None:
+            yield symbol, count
+        symbol, count = next_symbol, next_count
+    if symbol is not None:
+        yield symbol, count
+
+
+def _merge_files(
+    paths: list[Path], record: struct.Struct, buffer_size: int
+) -> Iterator[tuple[bytes, int]]:
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(path, "rb")) for path in paths]
+        yield from _merge([_read_run(file, record, buffer_size) for file in files])
+
+
+def count_symbols_external(
+    filepath: Path, symbol_size: int = 1, memory_budget: int = DEFAULT_MEMORY_BUDGET
+) -> bytes:
+    """
+    Counts symbols in given file like `count_symbols` in basicHuffman.py, keeping in memory only
+    as many distinct symbols as fit in the memory budget and spilling the rest to temporary files
+
+    Args:
+        filepath (Path): File to count symbols in
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+        memory_budget (int, optional): Approximate number of bytes of memory used for counting.
+            Defaults to DEFAULT_MEMORY_BUDGET.
+
+    Raises:
+        ValueError: Raised if memory budget is smaller than MIN_MEMORY_BUDGET
+
+    Returns:
+        bytes: Symbol counts serialized with `save_counts_stream` in npy.py, in order of symbols
+    """
+    if memory_budget < MIN_MEMORY_BUDGET:
+        raise ValueError(f"Memory budget must be at least {MIN_MEMORY_BUDGET} bytes")
+    max_entries = memory_budget // COUNTER_ENTRY_SIZE
+    # All symbols of a chunk can be new, so chunks are added only while they fit in the counter
+    chunk_symbols = min(2**16, max_entries // 2)
+    record = struct.Struct(f">{symbol_size}sQ")
+    # Buffers of merged runs and of the merged run take at most half of the budget
+    buffer_size = min(RUN_BUFFER_SIZE, memory_budget // (2 * (MAX_MERGED_RUNS + 1)))
+
+    with TemporaryDirectory() as directory:
+        # Runs created in the n-th merging pass are named run{n}_{i}
+        runs: list[Path] = []
+
+        def spill(counts: Counter[int]):
+            runs.append(Path(directory).joinpath(f"run0_{len(runs)}"))
+            items = (
+                (symbol.to_bytes(symbol_size, "big"), counts[symbol]) for symbol in sorted(counts)
+            )
+            with open(runs[-1], "wb") as file:
+                _write_run(file, items, record, buffer_size)
+
+        counts = Counter(bytes2symbols(filepath.suffix.encode(), symbol_size))
+        for symbols in read_symbols(filepath, symbol_size, chunk_symbols):
+            counts.update(symbols)
+            if len(counts) > max_entries - chunk_symbols:
+                spill(counts)
+                counts.clear()
+        spill(counts)
+        del counts
+
+        level = 0
+        while True:
+            level += 1
+            merged: list[Path] = []
+            for start in range(0, len(runs), MAX_MERGED_RUNS):
+                merged.append(Path(directory).joinpath(f"run{level}_{len(merged)}"))
+                with open(merged[-1], "wb") as file:
+                    items = _merge_files(runs[start : start + MAX_MERGED_RUNS], record, buffer_size)
+                    n_rows, max_count = _write_run(file, items, record, buffer_size)
+                for path in runs[start : start + MAX_MERGED_RUNS]:
+                    path.unlink()
+            runs = merged
+            if len(runs) == 1:
+                break
+
+        with open(runs[0], "rb") as file:
+            rows = (
+                (int.from_bytes(symbol, "big"), count)
+                for symbol, count in _read_run(file, record, buffer_size)
+            )
+            return save_counts_stream(rows, n_rows, max_count, symbol_size)
@@ -0,0 +1,85 @@
+from typing import NamedTuple
+
+from src.symbolSize import entropy
+
+
+class FileInfo(NamedTuple):
+    """
+    Sizes and statistics of an encoded file, read without decoding its contents. Values that
+    can't be read from the file are None. Symbols are the ones the contents were encoded as,
+    e.g. run-length tokens or residuals of MED prediction, excluding symbols of the extension.
+    """
+
+    algorithm: str
+    compressed_size: int
+    original_size: int | None = None
+    symbol_size: int | None = None
+    n_symbols: int | None = None
+    entropy: float | None = None  # bits of information per symbol
+    bit_rate: float | None = None  # bits of encoded contents per symbol
+
+    @property
+    def compression_rate(self) -> float | None:
+        if not self.original_size:
+            return None
+        return self.compressed_size / self.original_size
+
+    def describe(self) -> list[str]:
+        """
+        Returns:
+            list[str]: Lines describing known values
+        """
+        lines = [
+            f"algorithm: {self.algorithm}",
+            f"compressed size: {self.compressed_size} B",
+        ]
+        if self.original_size is not None:
+            lines.append(f"original size: {self.original_size} B")
+        if self.compression_rate is not None:
+            lines.append(f"compression rate: {self.compression_rate:.4f}")
+        if self.symbol_size is not None:
+            lines.append(f"symbol size: {self.symbol_size} B")
+        if self.n_symbols is not None:
+            lines.append(f"symbols: {self.n_symbols}")
+        if self.entropy is not None:
+            lines.append(f"entropy: {self.entropy:.4f} bits/symbol")
+        if self.bit_rate is not None:
+            lines.append(f"bit rate: {self.bit_rate:.4f} bits/symbol")
+        return lines
+
+
+def histogram_info(
+    algorithm: str,
+    compressed_size: int,
+    original_size: int,
+    symbol_size: int,
+    counts: list[int],
+    code_len: int,
+) -> FileInfo:
+    """
+    Creates info of a file with statistics computed from numbers of occurrences of symbols
+
+    Args:
+        algorithm (str): Name of the algorithm the file was encoded with
+        compressed_size (int): Size of the encoded file in bytes
+        original_size (int): Size of the original file in bytes
+        symbol_size (int): Size of symbols in bytes
+        counts (list[int]): Numbers of occurrences of encoded symbols, can include zeros
+        code_len (int): Number of bits taken by codes of the symbols
+
+    Returns:
+        FileInfo: Info of the file
+    """
+    n_symbols = sum(counts)
+    if n_symbols == 0:
+        return FileInfo(algorithm, compressed_size, original_size, symbol_size, 0)
+    counts = [count for count in counts if count > 0]
+    return FileInfo(
+        algorithm,
+        compressed_size,
+        original_size,
+        symbol_size,
+        n_symbols,
+        entropy(counts),
+        code_len / n_symbols,
+    )
@@ -0,0 +1,336 @@
+from array import array
+from typing import Iterable, Sequence
+
+import numpy as np
+from bitarray import bitarray, decodetree
+
+from src.utility import bytes2ba
+
+#   Static Huffman tree stored in arrays instead of Node objects. Leaves have indices from 0 to
+#   n - 1 (in order of given symbols), internal nodes from n to 2n - 2 (in order of creation),
+#   the root is the last node. Nodes are merged in the same order as by `build_tree` in
+#   basicHuffman.py, so both give equal codes: leaves are sorted by weight (stable), the two
+#   lightest nodes are merged and on equal weights leaves are taken before internal nodes.
+
+# Symbols of at most this size are indices of code tables, larger ones are searched for
+DENSE_SYMBOL_SIZE = 2
+# Codes are stored as unsigned 64 bit integers
+MAX_CODE_LENGTH = 64
+# Part of encoded symbols whose codes are decoded by the root of LazyDecoder
+ROOT_COVERAGE = 0.99
+# Number of bits decoded by LazyDecoder from one slice of a codeblock, bounds bits copied after
+# every escape to a rare code
+DECODE_WINDOW = 2**15
+
+
+def pack_codes(codes: np.ndarray, lengths: np.ndarray) -> bitarray:
+    """
+    Joins codes without converting them to bitarrays one by one
+
+    Args:
+        codes (np.ndarray): Codes as unsigned integers
+        lengths (np.ndarray): Lengths of codes
+
+    Returns:
+        bitarray: Concatenated codes
+    """
+    # Codes are aligned to the left of the fewest bytes fitting the longest code, bits of all
+    # codes are unpacked at once and those past lengths of codes are dropped
+    width = (int(lengths.max(initial=0)) + 7) // 8
+    aligned = np.asarray(codes, dtype=np.uint64) << (8 * width - lengths).astype(np.uint64)
+    columns = aligned.astype(">u8").view(np.uint8).reshape(-1, 8)[:, 8 - width :]
+    bits = np.unpackbits(columns, axis=1)[np.arange(8 * width) < lengths[:, None]]
+    return bytes2ba(np.packbits(bits).tobytes())[: len(bits)]
+
+
+def codes_to_dict(symbols: np.ndarray, codes: np.ndarray, lengths: np.ndarray) -> dict:
+    """
+    Returns:
+        dict[int, bitarray]: Dict of symbol: symbol_encoding pairs
+    """
+    packed = pack_codes(codes, lengths)
+    ends = np.cumsum(lengths, dtype=np.int64).tolist()
+    return {
+        symbol: packed[end - length : end]
+        for symbol, length, end in zip(symbols.tolist(), lengths.tolist(), ends)
+    }
+
+
+class FlatTree:
+    def __init__(self, symbols: np.ndarray, weights: np.ndarray, symbol_size: int):
+        """
+        Args:
+            symbols (np.ndarray): Symbols of leaves as unsigned integers
+            weights (np.ndarray): Weights of leaves
+            symbol_size (int): Size of symbols in bytes
+        """
+        self.symbol_size = symbol_size
+        self.symbols = np.asarray(symbols, dtype=np.uint64)
+        n_leaves = len(self.symbols)
+        # Nodes are kept in arrays of machine integers, lists of Python integers would take
+        # several times more memory for large alphabets
+        node_weights = array("Q", np.asarray(weights, dtype=np.uint64).tobytes())
+        node_weights.frombytes(bytes(8 * (n_leaves - 1)))
+        left = array("q", bytes(8 * (n_leaves - 1)))
+        right = array("q", bytes(8 * (n_leaves - 1)))
+
+        leaves = array("q", np.argsort(np.asarray(weights), kind="stable").tobytes())
+        next_leaf = 0
+        next_internal = n_leaves
+        for new_node in range(n_leaves, 2 * n_leaves - 1):
+            children = []
+            for _ in range(2):
+                # Internal nodes are created with nondecreasing weights, so both queues are sorted
+                if next_leaf < n_leaves and (
+                    next_internal == new_node
+                    or node_weights[leaves[next_leaf]] <= node_weights[next_internal]
+                ):
+                    children.append(leaves[next_leaf])
+                    next_leaf += 1
+                else:
+                    children.append(next_internal)
+                    next_internal += 1
+            left[new_node - n_leaves], right[new_node - n_leaves] = children
+            node_weights[new_node] = node_weights[children[0]] + node_weights[children[1]]
+
+        self.weights = np.frombuffer(node_weights, dtype=np.uint64).copy()
+        self.left = np.frombuffer(left, dtype=np.int64).astype(np.intp)
+        self.right = np.frombuffer(right, dtype=np.int64).astype(np.intp)
+
+    @classmethod
+    def from_counts(cls, symbols_counts: Iterable[tuple[int, int]], symbol_size: int):
+        """
+        Args:
+            symbols_counts (Iterable[tuple[int, int]]): Symbol counts as returned by
+                `count_symbols` or `iter_counts` in npy.py, they are read once
+            symbol_size (int): Size of symbols in bytes
+
+        Returns:
+            FlatTree: Tree of symbols weighted by their counts
+        """
+        rows = np.fromiter(symbols_counts, dtype=np.dtype((np.uint64, 2)))
+        return cls(rows[:, 0], rows[:, 1], symbol_size)
+
+    def codes(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes codes of leaves by pointer jumping: every node keeps bits of the path from one
+        of its ancestors, which are prepended with bits of the path to that ancestor, so that
+        paths double in length until they start at the root
+
+        Raises:
+            ValueError: Raised if codes are longer than MAX_CODE_LENGTH
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Codes and lengths of codes of leaves
+        """
+        n_leaves = len(self.symbols)
+        root = 2 * n_leaves - 2
+        ancestors = np.full(2 * n_leaves - 1, root, dtype=np.intp)
+        ancestors[self.left] = ancestors[self.right] = np.arange(n_leaves, root + 1)
+        lengths = np.ones(2 * n_leaves - 1, dtype=np.int64)
+        lengths[root] = 0
+        codes = np.zeros(2 * n_leaves - 1, dtype=np.uint64)
+        codes[self.right] = 1
+        while (ancestors != root).any():
+            # Bits shifted past the 64th are lost only if codes are too long anyway
+            shifts = np.minimum(lengths, MAX_CODE_LENGTH - 1).astype(np.uint64)
+            codes |= codes[ancestors] << shifts
+            lengths += lengths[ancestors]
+            ancestors = ancestors[ancestors]
+        if lengths.max() > MAX_CODE_LENGTH:
+            raise ValueError(f"Codes are longer than {MAX_CODE_LENGTH} bits")
+        return codes[:n_leaves], lengths[:n_leaves].astype(np.uint8)
+
+    def code_table(self) -> "CodeTable":
+        codes, lengths = self.codes()
+        return CodeTable(self.symbols, codes, lengths, self.symbol_size)
+
+    def lazy_decoder(self) -> "LazyDecoder":
+        codes, lengths = self.codes()
+        leaf_weights = self.weights[: len(self.symbols)]
+        return LazyDecoder(self.symbols, codes, lengths, leaf_weights, self.symbol_size)
+
+
+class CodeTable:
+    def __init__(
+        self, symbols: np.ndarray, codes: np.ndarray, lengths: np.ndarray, symbol_size: int
+    ):
+        """
+        Args:
+            symbols (np.ndarray): Symbols as unsigned integers
+            codes (np.ndarray): Codes of symbols
+            lengths (np.ndarray): Lengths of codes of symbols
+            symbol_size (int): Size of symbols in bytes
+        """
+        self.symbol_size = symbol_size
+        self.dense = symbol_size <= DENSE_SYMBOL_SIZE
+        if self.dense:
+            # Tables are indexed by symbols, absent symbols have codes of length 0
+            self.symbols = symbols
+            self.codes = np.zeros(256**symbol_size, dtype=np.uint64)
+            self.lengths = np.zeros(256**symbol_size, dtype=np.uint8)
+            self.codes[symbols] = codes
+            self.lengths[symbols] = lengths
+        else:
+            order = np.argsort(symbols)
+            self.symbols = symbols[order]
+            self.codes = codes[order]
+            self.lengths = lengths[order]
+
+    def lookup(self, symbols: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Args:
+            symbols (np.ndarray): Symbols present in the table, as unsigned integers
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Codes and lengths of codes of symbols
+        """
+        if self.dense:
+            return self.codes[symbols], self.lengths[symbols]
+        indices = np.searchsorted(self.symbols, symbols)
+        return self.codes[indices], self.lengths[indices]
+
+    def encode(self, symbols: Sequence[int]) -> bitarray:
+        """
+        Args:
+            symbols (Sequence[int]): Symbols present in the table, as returned by
+                `bytes2symbols`
+
+        Returns:
+            bitarray: Concatenated codes of symbols
+        """
+        if isinstance(symbols, bytes):
+            symbols = np.frombuffer(symbols, dtype=np.uint8)
+        return pack_codes(*self.lookup(np.asarray(symbols, dtype=np.uint64)))
+
+    def encoded_length(self, symbols_counts: Iterable[tuple[int, int]]) -> int:
+        """
+        Args:
+            symbols_counts (Iterable[tuple[int, int]]): Symbols present in the table and their
+                counts, they are read once
+
+        Returns:
+            int: Number of bits taken by codes of all counted symbols
+        """
+        rows = np.fromiter(symbols_counts, dtype=np.dtype((np.uint64, 2)))
+        _, lengths = self.lookup(rows[:, 0])
+        return int(np.dot(rows[:, 1].astype(np.int64), lengths.astype(np.int64)))
+
+    def to_dict(self) -> dict[int, bitarray]:
+        """
+        Returns:
+            dict[int, bitarray]: Dict of symbol: symbol_encoding pairs
+        """
+        codes, lengths = self.lookup(self.symbols)
+        return codes_to_dict(self.symbols, codes, lengths)
+
+
+class LazyDecoder:
+    """
+    Decodes codes of the most frequent symbols with a root decodetree, built up front. Codes
+    longer than `root_bits` are grouped by their first `root_bits` bits, which are added to the
+    root as escape codes. Subtables decoding the rest of codes of a group are built when the
+    group is used for the first time, so rare symbols cost nothing until they appear.
+    """
+
+    def __init__(
+        self,
+        symbols: np.ndarray,
+        codes: np.ndarray,
+        lengths: np.ndarray,
+        weights: np.ndarray,
+        symbol_size: int,
+    ):
+        """
+        Args:
+            symbols (np.ndarray): Symbols as unsigned integers
+            codes (np.ndarray): Codes of symbols
+            lengths (np.ndarray): Lengths of codes of symbols
+            weights (np.ndarray): Numbers of occurrences of symbols
+            symbol_size (int): Size of symbols in bytes
+        """
+        self.symbol_size = symbol_size
+        self.max_length = int(lengths.max(initial=0))
+        # The shortest length of codes covering ROOT_COVERAGE of encoded symbols
+        weight_by_length = np.bincount(lengths, weights=weights.astype(np.float64))
+        covered = np.cumsum(weight_by_length) >= ROOT_COVERAGE * weight_by_length.sum()
+        self.root_bits = max(int(np.argmax(covered)), 1)
+
+        short = lengths <= self.root_bits
+        root = codes_to_dict(symbols[short], codes[short], lengths[short])
+        self.root_lengths = dict(zip(symbols[short].tolist(), lengths[short].tolist()))
+
+        # Long codes sorted by their groups
+        long_lengths = lengths[~short]
+        prefixes = codes[~short] >> (long_lengths - self.root_bits).astype(np.uint64)
+        order = np.argsort(prefixes, kind="stable")
+        self.long_symbols = symbols[~short][order]
+        self.long_codes = codes[~short][order]
+        self.long_lengths = long_lengths[order]
+        group_prefixes, starts = np.unique(prefixes[order], return_index=True)
+        self.group_starts = starts.tolist() + [len(order)]
+        # Escape codes are decoded as negative numbers ~group
+        escapes = codes_to_dict(
+            ~np.arange(len(group_prefixes)),
+            group_prefixes,
+            np.full(len(group_prefixes), self.root_bits, dtype=np.uint8),
+        )
+        root.update(escapes)
+        self.root = decodetree(root) if len(root) > 1 else None
+        self.subtables: dict[int, tuple[decodetree, dict[int, int]]] = {}
+
+    def _subtable(self, group: int) -> tuple[decodetree, dict[int, int]]:
+        if group not in self.subtables:
+            start, end = self.group_starts[group], self.group_starts[group + 1]
+            symbols = self.long_symbols[start:end]
+            suffix_lengths = self.long_lengths[start:end] - self.root_bits
+            masks = (np.uint64(1) << suffix_lengths.astype(np.uint64)) - np.uint64(1)
+            suffixes = codes_to_dict(symbols, self.long_codes[start:end] & masks, suffix_lengths)
+            lengths = dict(zip(symbols.tolist(), suffix_lengths.tolist()))
+            self.subtables[group] = decodetree(suffixes), lengths
+        return self.subtables[group]
+
+    def decode(self, codeblock: bitarray) -> tuple[list[int], int]:
+        """
+        Decodes codes until the end of the codeblock
+
+        Args:
+            codeblock (bitarray): A block of code to be decoded
+
+        Returns:
+            tuple[list[int], int]: Decoded symbols and number of decoded bits, the last code can
+            be incomplete
+        """
+        decoded: list[int] = []
+        position = 0
+        window_bits = max(DECODE_WINDOW, self.max_length)
+        while self.root is not None and position < len(codeblock):
+            window = codeblock[position : position + window_bits]
+            start = len(decoded)
+            group = None
+            try:
+                for symbol in window.iterdecode(self.root):
+                    if symbol < 0:
+                        group = ~symbol
+                        break
+                    decoded.append(symbol)
+            except ValueError:
+                # Code of the last symbol of the window is incomplete
+                pass
+            window_position = sum(map(self.root_lengths.__getitem__, decoded[start:]))
+            if group is not None:
+                subtable, suffix_lengths = self._subtable(group)
+                suffix_start = window_position + self.root_bits
+                suffix = window[suffix_start : suffix_start + self.max_length]
+                try:
+                    symbol = next(suffix.iterdecode(subtable))
+                    decoded.append(symbol)
+                    window_position = suffix_start + suffix_lengths[symbol]
+                except (ValueError, StopIteration):
+                    # Code is cut by the end of the window, the next window starts with it
+                    pass
+            if window_position == 0:
+                # Windows cover the longest code, so only the last code can be incomplete
+                break
+            position += window_position
+        return decoded, position
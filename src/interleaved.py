@@ -0,0 +1,140 @@
+from math import ceil
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+import numpy as np
+from bitarray import bitarray, decodetree
+
+from src.utility import bytes2ba, encode_symbols, read_symbols, symbols2bytes
+
+if TYPE_CHECKING:
+    from src.basicHuffman import TreeDecoder
+    from src.flatTree import CodeTable, LazyDecoder
+
+#   Symbols of every block are distributed among n streams in round-robin order, i-th symbol
+#   of the block is encoded in stream i mod n. Lengths of streams are stored, so every stream is
+#   decoded at once, without checking for an incomplete last code, and its symbols are copied
+#   to their places in the block together.
+#
+#   interleaved contents structure:
+#   1 byte to specify number of streams (n)
+#   4 bytes to specify number of symbols in a block (b), the last block can be shorter
+#   for every block:
+#       n * 4 bytes: lengths of streams in bits
+#       n streams, each starting at a new byte
+
+DEFAULT_STREAMS = 4
+DEFAULT_BLOCK_SYMBOLS = 2**18
+
+
+def interleaved_overhead(
+    n_symbols: int, n_streams: int, block_symbols: int = DEFAULT_BLOCK_SYMBOLS
+) -> int:
+    """
+    Computes upper bound of number of bytes taken by stream lengths and padding of streams
+
+    Args:
+        n_symbols (int): Number of encoded symbols
+        n_streams (int): Number of streams in every block
+        block_symbols (int, optional): Number of symbols in a block. Defaults to
+            DEFAULT_BLOCK_SYMBOLS.
+
+    Returns:
+        int: Number of bytes
+    """
+    return 5 + ceil(n_symbols / block_symbols) * n_streams * 5
+
+
+def encode_interleaved(
+    filepath: Path,
+    encodings: "dict[int, bitarray] | CodeTable",
+    symbol_size: int,
+    n_streams: int = DEFAULT_STREAMS,
+    block_symbols: int = DEFAULT_BLOCK_SYMBOLS,
+):
+    """
+    Encode contents of file in blocks of interleaved streams.
+
+    Args:
+        filepath (Path): Path to the file to encode
+        encodings (dict[int, bitarray] | CodeTable): Codes of symbols, as returned by
+            `code_table` in basicHuffman.py
+        symbol_size (int): Size of symbols in bytes
+        n_streams (int, optional): Number of streams in every block. Defaults to DEFAULT_STREAMS.
+        block_symbols (int, optional): Number of symbols in a block. Defaults to
+            DEFAULT_BLOCK_SYMBOLS.
+
+    Yields:
+        tuple[bytes, int]: Pair of encoded chunk of data and number of bits in it, chunks are
+        never padded
+    """
+    header = n_streams.to_bytes(length=1, byteorder="big")
+    header += block_symbols.to_bytes(length=4, byteorder="big")
+    yield header, len(header) * 8
+    for block in read_symbols(filepath, symbol_size, block_symbols):
+        streams = []
+        for i in range(n_streams):
+            stream = bitarray()
+            encode_symbols(stream, encodings, block[i::n_streams])
+            streams.append(stream)
+        chunk = b"".join(len(stream).to_bytes(length=4, byteorder="big") for stream in streams)
+        chunk += b"".join(stream.tobytes() for stream in streams)
+        yield chunk, len(chunk) * 8
+
+
+class InterleavedDecoder:
+    def __init__(
+        self,
+        encodings: "dict[int, bitarray] | CodeTable",
+        symbol_decoder: "TreeDecoder | LazyDecoder",
+    ):
+        """
+        Args:
+            encodings (dict[int, bitarray] | CodeTable): Codes of symbols, as returned by
+                `code_table` in basicHuffman.py
+            symbol_decoder (TreeDecoder | LazyDecoder): Decoder of the same codes, as returned by
+                `decoder` in basicHuffman.py, used for streams of large alphabets
+        """
+        self.symbol_decoder = symbol_decoder
+        self.symbol_size = symbol_decoder.symbol_size
+
+        # Streams end with complete codes, so they are decoded at once with a decodetree
+        self.tree = decodetree(encodings) if isinstance(encodings, dict) else None
+
+    def _decode_stream(self, stream: bitarray) -> list[int]:
+        if self.tree is not None:
+            return stream.decode(self.tree)
+        symbols, _ = self.symbol_decoder.decode(stream)
+        return symbols
+
+    def _decode_block(self, streams: list[bitarray], n_symbols: int) -> bytes:
+        decoded = np.empty(n_symbols, dtype=f"V{self.symbol_size}")
+        for i, stream in enumerate(streams):
+            stream_symbols = self._decode_stream(stream)
+            decoded[i :: len(streams)] = np.frombuffer(
+                symbols2bytes(stream_symbols, self.symbol_size), dtype=f"V{self.symbol_size}"
+            )
+        return decoded.tobytes()
+
+    def decode(self, reader: BinaryIO, writer: BinaryIO, contents_size: int):
+        """
+        Decodes contents of the file
+
+        Args:
+            reader (BinaryIO): Encoded file positioned at the beginning of encoded contents
+            writer (BinaryIO): File decoded contents are written to
+            contents_size (int): Size of decoded contents in bytes
+        """
+        n_streams = reader.read(1)[0]
+        block_symbols = int.from_bytes(reader.read(4), byteorder="big")
+        n_symbols = ceil(contents_size / self.symbol_size)
+        for block_start in range(0, n_symbols, block_symbols):
+            block_len = min(block_symbols, n_symbols - block_start)
+            lengths = reader.read(n_streams * 4)
+            streams = []
+            for i in range(n_streams):
+                stream_len = int.from_bytes(lengths[i * 4 : i * 4 + 4], byteorder="big")
+                streams.append(bytes2ba(reader.read(ceil(stream_len / 8)))[:stream_len])
+            decoded = self._decode_block(streams, block_len)
+            block_size = min(len(decoded), contents_size - block_start * self.symbol_size)
+            writer.write(decoded[:block_size])
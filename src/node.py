@@ -14,7 +14,7 @@ class Node:
         weight: int = 0,
         parent: Union["Node", None] = None,
         side: Union[ChildSide, None] = None,
-        symbol: Union[bytes, None] = None,
+        symbol: Union[int, None] = None,
     ):
         self.parent = parent
         self.pos = 0
@@ -25,7 +25,7 @@ class Node:
 
     def __str__(self):
         prefix = "\\" if self.side else "-"
-        suffix = f"({self.symbol})" if self.symbol else ""
+        suffix = f"({self.symbol})" if self.symbol is not None else ""
         return f"{prefix}{self.weight} {suffix}"
 
     def print(self, pad=1):
@@ -38,14 +38,14 @@ class Node:
         if left is not None:
             left.print(pad + 1)
 
-    def get_codings(self) -> dict[bytes, bitarray]:
+    def get_codings(self) -> dict[int, bitarray]:
         """
         Constructs codes for symbols based on structure of the tree
 
         Returns:
-            dict[bytes, bitarray]: codes for symbols present in tree
+            dict[int, bitarray]: codes for symbols present in tree
         """
-        codings: dict[bytes, bitarray] = {}
+        codings: dict[int, bitarray] = {}
 
         def explore(node: Node, code_prefix=bitarray()):
             for side_index in [side.value for side in ChildSide]:
@@ -0,0 +1,139 @@
+import re
+import struct
+from typing import Iterable, Iterator
+
+from src.utility import SYMBOL_BYTEORDER
+
+#   Symbol counts are saved in NPY format, as a 1-dimensional array with fields `symbol` (bytes
+#   of the symbol) and `count` (the smallest unsigned integer type fitting all counts). Files
+#   are equal to those created with `numpy.save`, but NumPy is not needed to read or write them.
+#
+#   NPY file structure:
+#   6 bytes: magic string b"\x93NUMPY"
+#   2 bytes: version of the format (1.0)
+#   2 bytes: length of the header (n), little endian
+#   header: n bytes, Python literal of dict describing the array, padded with spaces and ended
+#           with a newline, so that the data starts at a multiple of 64 bytes
+#   data: symbol and count of every row, counts are little endian
+
+MAGIC = b"\x93NUMPY"
+VERSION = b"\x01\x00"
+ALIGNMENT = 64
+
+COUNT_DESCRIPTORS = {1: "|u1", 2: "<u2", 4: "<u4", 8: "<u8"}
+HEADER_PATTERN = re.compile(
+    r"\('symbol', '\|V(\d+)'\), \('count', '[|<]u(\d)'\)\].*'shape': \((\d+),\)"
+)
+
+
+def save_counts(symbols_counts: list[tuple[int, int]], symbol_size: int = 1) -> bytes:
+    """
+    Serializes symbol counts into NPY format
+
+    Args:
+        symbols_counts (list[tuple[int, int]]): Symbols as unsigned integers and their counts
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+
+    Returns:
+        bytes: Serialized symbol counts
+    """
+    max_count = max(count for _, count in symbols_counts)
+    return save_counts_stream(symbols_counts, len(symbols_counts), max_count, symbol_size)
+
+
+def save_counts_stream(
+    symbols_counts: Iterable[tuple[int, int]], n_rows: int, max_count: int, symbol_size: int = 1
+) -> bytes:
+    """
+    Serializes symbol counts into NPY format, going through them once
+
+    Args:
+        symbols_counts (Iterable[tuple[int, int]]): Symbols as unsigned integers and their counts
+        n_rows (int): Number of symbols
+        max_count (int): The largest of counts
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+
+    Returns:
+        bytes: Serialized symbol counts
+    """
+    count_size = next(size for size in COUNT_DESCRIPTORS if max_count < 2 ** (size * 8))
+
+    descriptor = f"[('symbol', '|V{symbol_size}'), ('count', '{COUNT_DESCRIPTORS[count_size]}')]"
+    shape = f"({n_rows},)"
+    header = f"{{'descr': {descriptor}, 'fortran_order': False, 'shape': {shape}, }}"
+    preamble_size = len(MAGIC) + len(VERSION) + 2
+    header += " " * (-(preamble_size + len(header) + 1) % ALIGNMENT) + "\n"
+
+    serialized = bytearray(MAGIC + VERSION)
+    serialized += len(header).to_bytes(length=2, byteorder="little")
+    serialized += header.encode("latin1")
+    for symbol, count in symbols_counts:
+        serialized += symbol.to_bytes(length=symbol_size, byteorder=SYMBOL_BYTEORDER)
+        serialized += count.to_bytes(length=count_size, byteorder="little")
+    return bytes(serialized)
+
+
+def _read_header(serialized: bytes) -> tuple[int, int, int, int]:
+    """
+    Raises:
+        ValueError: Raised if data doesn't contain symbol counts in NPY format
+
+    Returns:
+        tuple[int, int, int, int]: Size of symbols, size of counts, number of rows and offset of
+        the data
+    """
+    if serialized[: len(MAGIC)] != MAGIC:
+        raise ValueError("Symbol counts are not saved in NPY format")
+    header_size = int.from_bytes(serialized[8:10], byteorder="little")
+    header = serialized[10 : 10 + header_size].decode("latin1")
+    match = HEADER_PATTERN.search(header)
+    if match is None:
+        raise ValueError("Symbol counts are saved with unsupported array type")
+    symbol_size, count_size, n_rows = (int(group) for group in match.groups())
+    return symbol_size, count_size, n_rows, 10 + header_size
+
+
+def counts_shape(serialized: bytes) -> tuple[int, int]:
+    """
+    Args:
+        serialized (bytes): Symbol counts serialized with `save_counts` or `numpy.save`
+
+    Returns:
+        tuple[int, int]: Number of symbols and size of symbols in bytes
+    """
+    symbol_size, _, n_rows, _ = _read_header(serialized)
+    return n_rows, symbol_size
+
+
+def iter_counts(serialized: bytes) -> Iterator[tuple[int, int]]:
+    """
+    Deserializes symbol counts saved in NPY format one by one
+
+    Args:
+        serialized (bytes): Symbol counts serialized with `save_counts` or `numpy.save`
+
+    Yields:
+        tuple[int, int]: Symbol as unsigned integer and its count
+    """
+    symbol_size, count_size, n_rows, offset = _read_header(serialized)
+    data = memoryview(serialized)[offset:][: n_rows * (symbol_size + count_size)]
+    for symbol, count in struct.iter_unpack(f"{symbol_size}s{count_size}s", data):
+        yield int.from_bytes(symbol, SYMBOL_BYTEORDER), int.from_bytes(count, "little")
+
+
+def load_counts(serialized: bytes) -> tuple[list[tuple[int, int]], int]:
+    """
+    Deserializes symbol counts saved in NPY format
+
+    Args:
+        serialized (bytes): Symbol counts serialized with `save_counts` or `numpy.save`
+
+    Raises:
+        ValueError: Raised if data doesn't contain symbol counts in NPY format
+
+    Returns:
+        tuple[list[tuple[int, int]], int]: Symbols as unsigned integers and their counts, and
+        size of symbols in bytes
+    """
+    _, symbol_size = counts_shape(serialized)
+    return list(iter_counts(serialized)), symbol_size
@@ -0,0 +1,140 @@
+import os
+from collections import Counter
+from itertools import repeat
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from bitarray import bitarray
+
+from src.utility import bytes2ba, bytes2symbols, encode_symbols
+
+if TYPE_CHECKING:
+    from src.flatTree import CodeTable
+
+#   Files are split into ranges of whole symbols, which are counted and encoded in separate
+#   processes. Counts of ranges are merged in order of ranges and their codes are joined at exact
+#   bit offsets, so results are equal to counting and encoding the file in a single pass.
+
+RANGE_SIZE = 2**22
+
+
+def _ranges(filepath: Path, symbol_size: int, range_size: int) -> list[tuple[int, int]]:
+    """
+    Returns:
+        list[tuple[int, int]]: Offsets and lengths of ranges, only the last one can end with
+        a part of a symbol
+    """
+    size = filepath.stat().st_size
+    step = max(range_size // symbol_size, 1) * symbol_size
+    return [(offset, min(step, size - offset)) for offset in range(0, size, step)]
+
+
+def _read_range(filepath: Path, offset: int, length: int) -> bytes:
+    with open(filepath, "rb") as reader:
+        reader.seek(offset)
+        return reader.read(length)
+
+
+def _count_range(filepath: Path, symbol_size: int, offset: int, length: int) -> dict[int, int]:
+    # Counter keeps symbols in order of their first appearance
+    return dict(Counter(bytes2symbols(_read_range(filepath, offset, length), symbol_size)))
+
+
+def _map_ranges(function, ranges: list[tuple[int, int]], args: tuple, workers: int | None, **pool):
+    """
+    Calls `function` with `args` followed by offset and length of every range, in worker
+    processes if there is more than one range
+
+    Returns:
+        Iterator: Results in order of ranges
+    """
+    offsets = [offset for offset, _ in ranges]
+    lengths = [length for _, length in ranges]
+    arguments = [repeat(arg) for arg in args] + [offsets, lengths]
+    if workers == 1 or len(ranges) <= 1:
+        if "initializer" in pool:
+            pool["initializer"](*pool["initargs"])
+        yield from map(function, *arguments)
+        return
+    # Importing process pool is slow, it is not needed by sequential encoding
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(workers or os.cpu_count() or 1, len(ranges))
+    with ProcessPoolExecutor(workers, **pool) as executor:
+        yield from executor.map(function, *arguments)
+
+
+def count_ranges(
+    filepath: Path,
+    symbol_size: int = 1,
+    workers: int | None = None,
+    range_size: int = RANGE_SIZE,
+) -> dict[int, int]:
+    """
+    Counts symbols in ranges of the file in parallel
+
+    Args:
+        filepath (Path): File to count symbols in
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+        workers (int | None, optional): Number of worker processes, ranges are counted in the
+            current process if equal to 1. Defaults to None (number of processors).
+        range_size (int, optional): Size of ranges in bytes. Defaults to RANGE_SIZE.
+
+    Returns:
+        dict[int, int]: Numbers of times symbols, as unsigned integers, appear in the file, in
+        order of their first appearance
+    """
+    counts = Counter[int]()
+    ranges = _ranges(filepath, symbol_size, range_size)
+    for range_counts in _map_ranges(_count_range, ranges, (filepath, symbol_size), workers):
+        counts.update(range_counts)
+    return dict(counts)
+
+
+# Code table used by every worker process of `encode_ranges`
+_worker_state = {}
+
+
+def _init_worker(encodings: "dict[int, bitarray] | CodeTable", symbol_size: int):
+    _worker_state.update(encodings=encodings, symbol_size=symbol_size)
+
+
+def _encode_range(filepath: Path, offset: int, length: int) -> tuple[bytes, int]:
+    symbols = bytes2symbols(_read_range(filepath, offset, length), _worker_state["symbol_size"])
+    code = bitarray()
+    encode_symbols(code, _worker_state["encodings"], symbols)
+    return code.tobytes(), len(code)
+
+
+def encode_ranges(
+    filepath: Path,
+    encodings: "dict[int, bitarray] | CodeTable",
+    symbol_size: int = 1,
+    workers: int | None = None,
+    range_size: int = RANGE_SIZE,
+):
+    """
+    Encode contents of file in ranges encoded in parallel.
+
+    Args:
+        filepath (Path): Path to the file to encode
+        encodings (dict[int, bitarray] | CodeTable): Codes of symbols, as returned by
+            `code_table` in basicHuffman.py
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+        workers (int | None, optional): Number of worker processes, ranges are encoded in the
+            current process if equal to 1. Defaults to None (number of processors).
+        range_size (int, optional): Size of ranges in bytes. Defaults to RANGE_SIZE.
+
+    Yields:
+        tuple[bytes, int]: Pair of encoded chunk of data and number of bits in the chunk that
+        encode original information. Only the last chunk is padded to full bytes.
+    """
+    ranges = _ranges(filepath, symbol_size, range_size)
+    pool = {"initializer": _init_worker, "initargs": (encodings, symbol_size)}
+    pending = bitarray()
+    for code, code_len in _map_ranges(_encode_range, ranges, (filepath,), workers, **pool):
+        pending += bytes2ba(code)[:code_len]
+        whole_bits = len(pending) // 8 * 8
+        yield pending[:whole_bits].tobytes(), whole_bits
+        del pending[:whole_bits]
+    yield pending.tobytes(), len(pending)
@@ -0,0 +1,288 @@
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import BinaryIO, ContextManager, Iterator, NamedTuple, Sequence
+
+from src.utility import bytes2symbols
+
+#   In pipelined mode files are read and written by background threads, so that waiting for
+#   the disk overlaps with encoding or decoding. A reader thread prefetches blocks into a bounded
+#   queue consumed by the codec, and a writer thread drains a bounded queue of output blocks
+#   filled by the codec. At most `depth` blocks are held in every queue.
+
+DEFAULT_BLOCK_SIZE = 2**20
+DEFAULT_DEPTH = 4
+
+# Time after which threads blocked on a queue check if the pipeline was closed
+_POLL_SECONDS = 0.1
+
+
+class PipelineReport(NamedTuple):
+    seconds: float  # time since the pipeline was created
+    read_seconds: float  # time spent by reader threads in reads
+    write_seconds: float  # time spent by writer threads in writes
+    wait_seconds: float  # time the codec waited for read blocks or for space for written ones
+
+    @property
+    def io_bound(self) -> bool:
+        """
+        Returns:
+            bool: True if the codec spent more time waiting for I/O than computing
+        """
+        return self.wait_seconds > self.seconds - self.wait_seconds
+
+    def __str__(self) -> str:
+        return (
+            f"{'I/O' if self.io_bound else 'CPU'}-bound: {self.seconds:.3f} s in total, "
+            f"{self.read_seconds:.3f} s reading, {self.write_seconds:.3f} s writing, "
+            f"{self.wait_seconds:.3f} s waiting for I/O"
+        )
+
+
+class _EndOfBlocks(NamedTuple):
+    error: BaseException | None = None
+
+
+def _put(blocks: queue.Queue, item, stop: threading.Event) -> bool:
+    """
+    Puts item in the queue unless `stop` is set first
+
+    Returns:
+        bool: True if the item was put in the queue
+    """
+    while not stop.is_set():
+        try:
+            blocks.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class Pipeline:
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE, depth: int = DEFAULT_DEPTH):
+        """
+        Args:
+            block_size (int, optional): Number of bytes read or written at once. Defaults to
+                DEFAULT_BLOCK_SIZE.
+            depth (int, optional): Maximal number of blocks waiting in every queue. Defaults to
+                DEFAULT_DEPTH.
+        """
+        if block_size <= 0 or depth <= 0:
+            raise ValueError("Size of blocks and depth of queues must be positive")
+        self.block_size = block_size
+        self.depth = depth
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.read_seconds = 0.0
+        self.write_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def _add_time(self, field: str, start: float):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + time.perf_counter() - start)
+
+    def report(self) -> PipelineReport:
+        with self.lock:
+            return PipelineReport(
+                time.perf_counter() - self.started,
+                self.read_seconds,
+                self.write_seconds,
+                self.wait_seconds,
+            )
+
+    def _fill(self, file: BinaryIO, block_size: int, blocks: queue.Queue, stop: threading.Event):
+        try:
+            while True:
+                start = time.perf_counter()
+                block = file.read(block_size)
+                self._add_time("read_seconds", start)
+                if not block:
+                    break
+                if not _put(blocks, block, stop):
+                    return
+            _put(blocks, _EndOfBlocks(), stop)
+        except BaseException as error:
+            _put(blocks, _EndOfBlocks(error), stop)
+
+    def read_blocks(self, file: BinaryIO, block_size: int | None = None) -> Iterator[bytes]:
+        """
+        Reads the file from its current position until its end in a background thread
+
+        Args:
+            file (BinaryIO): File to read
+            block_size (int | None, optional): Size of blocks, all of them except for the last
+                one are complete. Defaults to None (size of blocks of the pipeline).
+
+        Yields:
+            bytes: Next block of the file
+        """
+        blocks = queue.Queue(self.depth)
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self._fill, args=(file, block_size or self.block_size, blocks, stop)
+        )
+        thread.start()
+        try:
+            while True:
+                start = time.perf_counter()
+                block = blocks.get()
+                self._add_time("wait_seconds", start)
+                if isinstance(block, _EndOfBlocks):
+                    if block.error is not None:
+                        raise block.error
+                    return
+                yield block
+        finally:
+            # Consumer can stop before the end of the file
+            stop.set()
+            thread.join()
+
+    def read_symbols(
+        self, filepath: Path, symbol_size: int = 1, alignment: int = 1
+    ) -> Iterator[Sequence[int]]:
+        """
+        Reads file in prefetched blocks of symbols, like `read_symbols` in utility.py
+
+        Args:
+            filepath (Path): path to a file
+            symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+            alignment (int, optional): Numbers of symbols in blocks will be its multiples.
+                Defaults to 1.
+
+        Yields:
+            Sequence[int]: Symbols of a block as unsigned integers
+        """
+        step = symbol_size * alignment
+        with open(filepath, "rb") as file:
+            for block in self.read_blocks(file, max(self.block_size // step, 1) * step):
+                yield bytes2symbols(block, symbol_size)
+
+    def reader(self, file: BinaryIO) -> "PrefetchingReader":
+        """
+        Args:
+            file (BinaryIO): File positioned where reading starts
+
+        Returns:
+            PrefetchingReader: Wrapper of the file prefetching its blocks until its end
+        """
+        return PrefetchingReader(self.read_blocks(file))
+
+    def writer(self, file: BinaryIO) -> "BackgroundWriter":
+        """
+        Args:
+            file (BinaryIO): File opened for writing
+
+        Returns:
+            BackgroundWriter: Wrapper of the file writing blocks in a background thread
+        """
+        return BackgroundWriter(file, self)
+
+
+class PrefetchingReader:
+    """
+    Serves reads from blocks prefetched by a background thread. Must be closed if the file is
+    not read until its end.
+    """
+
+    def __init__(self, blocks: Iterator[bytes]):
+        self.blocks = blocks
+        self.buffer = b""
+        self.offset = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) - self.offset < size:
+            block = next(self.blocks, b"")
+            if not block:
+                break
+            self.buffer = self.buffer[self.offset :] + block
+            self.offset = 0
+        end = len(self.buffer) if size < 0 else min(self.offset + size, len(self.buffer))
+        data = self.buffer[self.offset : end]
+        self.offset = end
+        return data
+
+    def close(self):
+        self.blocks.close()  # type: ignore
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BackgroundWriter:
+    """
+    Joins written data into blocks written to the file by a background thread. Data is in the
+    file only after the writer is closed.
+    """
+
+    def __init__(self, file: BinaryIO, pipeline: Pipeline):
+        self.file = file
+        self.pipeline = pipeline
+        self.buffer = bytearray()
+        self.blocks = queue.Queue(pipeline.depth)
+        self.error: BaseException | None = None
+        self.thread = threading.Thread(target=self._drain)
+        self.thread.start()
+
+    def _drain(self):
+        while (block := self.blocks.get()) is not None:
+            # After an error blocks are still taken, so that the codec doesn't wait for space
+            if self.error is not None:
+                continue
+            start = time.perf_counter()
+            try:
+                self.file.write(block)
+            except BaseException as error:
+                self.error = error
+            self.pipeline._add_time("write_seconds", start)
+
+    def _put(self, block: bytes | None):
+        start = time.perf_counter()
+        self.blocks.put(block)
+        self.pipeline._add_time("wait_seconds", start)
+
+    def write(self, data):
+        if self.error is not None:
+            raise self.error
+        # Data is copied, so it can be modified after the call, like with file.write
+        self.buffer += data
+        if len(self.buffer) >= self.pipeline.block_size:
+            self._put(bytes(self.buffer))
+            self.buffer.clear()
+
+    def close(self):
+        if self.thread.is_alive():
+            if self.buffer:
+                self._put(bytes(self.buffer))
+                self.buffer.clear()
+            self._put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def optional_reader(file: BinaryIO, pipeline: Pipeline | None) -> ContextManager:
+    """
+    Returns:
+        ContextManager: Prefetching reader of the file if pipeline is given, the file otherwise
+    """
+    return nullcontext(file) if pipeline is None else pipeline.reader(file)
+
+
+def optional_writer(file: BinaryIO, pipeline: Pipeline | None) -> ContextManager:
+    """
+    Returns:
+        ContextManager: Background writer of the file if pipeline is given, the file otherwise
+    """
+    return nullcontext(file) if pipeline is None else pipeline.writer(file)
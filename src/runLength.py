@@ -0,0 +1,214 @@
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+from src.utility import read_chunks
+
+#   Run-length tokens of symbols of size s take s + 1 bytes: 1 byte specifying type of the token
+#   and s bytes of payload (padded with 0s):
+#   literal - symbol added to the output
+#   run - the first byte of payload (k) specifies that the last symbol is repeated 2^k times,
+#         longer runs are split into runs with lengths equal to powers of 2
+#   trim - the first byte of payload specifies how many padding bytes are removed from the last
+#          symbol, the last token of the file that did not consist of whole symbols
+
+LITERAL = 0
+RUN = 1
+TRIM = 2
+
+_ZEROS = re.compile(b"\x00+")
+
+
+def _token(token_type: int, payload: bytes, symbol_size: int) -> bytes:
+    return bytes([token_type]) + payload.ljust(symbol_size, b"\x00")
+
+
+# Lengths of runs repeat often
+@lru_cache(maxsize=2**12)
+def _run_tokens(repeats: int, symbol_size: int) -> bytes:
+    return b"".join(
+        _token(RUN, bytes([power]), symbol_size)
+        for power in range(repeats.bit_length() - 1, -1, -1)
+        if repeats >> power & 1
+    )
+
+
+def _literal_tokens(symbols: bytes, symbol_size: int) -> bytes:
+    token_size = symbol_size + 1
+    # Type of literal tokens is 0
+    tokens = bytearray(len(symbols) // symbol_size * token_size)
+    for i in range(symbol_size):
+        tokens[i + 1 :: token_size] = symbols[i::symbol_size]
+    return bytes(tokens)
+
+
+def _repeated_ranges(data: bytes, previous: bytes, symbol_size: int) -> Iterator[tuple[int, int]]:
+    """
+    Finds symbols equal to the symbols preceding them without a loop over symbols, from zeroed
+    bytes of data XOR-ed with data shifted by a symbol
+
+    Args:
+        data (bytes): Symbols of size `symbol_size`
+        previous (bytes): Symbol preceding data
+        symbol_size (int): Size of symbols in bytes
+
+    Yields:
+        tuple[int, int]: Indices of the first and after the last symbol of ranges of repeats
+    """
+    shifted = previous + data[:-symbol_size]
+    differences = int.from_bytes(data, "big") ^ int.from_bytes(shifted, "big")
+    for match in _ZEROS.finditer(differences.to_bytes(len(data), "big")):
+        start = -(-match.start() // symbol_size)
+        end = match.end() // symbol_size
+        if start < end:
+            yield start, end
+
+
+def run_length_tokens(chunks: Iterable[bytes], symbol_size: int = 1) -> Iterator[bytes]:
+    """
+    Replaces repeated symbols with run tokens
+
+    Args:
+        chunks (Iterable[bytes]): Data in chunks of whole symbols of size `symbol_size`, the
+            last chunk can end with a part of a symbol, which is padded with 0s
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+
+    Yields:
+        bytes: Literal and run tokens of a chunk, runs continued by the next chunk are
+        yielded with it
+    """
+    previous = None
+    repeats = 0
+    for chunk in chunks:
+        chunk = bytes(chunk)
+        if len(chunk) % symbol_size:
+            chunk = chunk.ljust(len(chunk) + symbol_size - len(chunk) % symbol_size, b"\x00")
+        if not chunk:
+            continue
+        if previous is None:
+            # The first symbol differs from its complement, so it is a literal
+            previous = bytes(255 - byte for byte in chunk[:symbol_size])
+        tokens = bytearray()
+        literals_start = 0
+        for start, end in _repeated_ranges(chunk, previous, symbol_size):
+            if start > literals_start:
+                tokens += _run_tokens(repeats, symbol_size)
+                repeats = 0
+                literals = chunk[literals_start * symbol_size : start * symbol_size]
+                tokens += _literal_tokens(literals, symbol_size)
+            repeats += end - start
+            literals_start = end
+        if literals_start * symbol_size < len(chunk):
+            tokens += _run_tokens(repeats, symbol_size)
+            repeats = 0
+            tokens += _literal_tokens(chunk[literals_start * symbol_size :], symbol_size)
+        previous = chunk[-symbol_size:]
+        yield bytes(tokens)
+    yield _run_tokens(repeats, symbol_size)
+
+
+def run_length_forward(src: Path, dst: Path, symbol_size: int = 1):
+    """
+    Saves run-length tokens of the file contents
+
+    Args:
+        src (Path): File to tokenize
+        dst (Path): Path where tokens will be saved
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+    """
+    with open(dst, "wb") as writer:
+        for tokens in run_length_tokens(read_chunks(src, symbol_size * 2**16), symbol_size):
+            writer.write(tokens)
+        remainder = src.stat().st_size % symbol_size
+        if remainder:
+            writer.write(_token(TRIM, bytes([symbol_size - remainder]), symbol_size))
+
+
+def decoded_size(token_counts: Iterable[tuple[bytes, int]], symbol_size: int = 1) -> int:
+    """
+    Computes size of data restored from run-length tokens, which depends only on numbers of
+    occurrences of every token
+
+    Args:
+        token_counts (Iterable[tuple[bytes, int]]): Tokens and numbers of their occurrences
+        symbol_size (int, optional): Size of restored symbols in bytes. Defaults to 1.
+
+    Raises:
+        ValueError: Raised if type of a token is unknown
+
+    Returns:
+        int: Size of restored data in bytes
+    """
+    size = 0
+    for token, count in token_counts:
+        if token[0] == LITERAL:
+            size += count * symbol_size
+        elif token[0] == RUN:
+            size += count * (symbol_size << token[1])
+        elif token[0] == TRIM:
+            size -= count * token[1]
+        else:
+            raise ValueError(f"Unknown type of run-length token: {token[0]}")
+    return size
+
+
+class RunLengthDecoder:
+    """
+    Restores symbols from run-length tokens. The last restored symbol is held back until the
+    next token, because it can be repeated or trimmed.
+    """
+
+    def __init__(self, symbol_size: int = 1):
+        self.token_size = symbol_size + 1
+        self.pending = b""
+        self.previous = b""
+
+    def feed(self, data: bytes) -> bytes:
+        """
+        Args:
+            data (bytes): Next tokens, the last one can be incomplete
+
+        Returns:
+            bytes: Restored symbols
+        """
+        data = self.pending + data
+        end = len(data) - len(data) % self.token_size
+        self.pending = data[end:]
+        decoded = bytearray()
+        for i in range(0, end, self.token_size):
+            token_type = data[i]
+            if token_type == LITERAL:
+                decoded += self.previous
+                self.previous = data[i + 1 : i + self.token_size]
+            elif token_type == RUN:
+                decoded += self.previous * (1 << data[i + 1])
+            elif token_type == TRIM:
+                self.previous = self.previous[: len(self.previous) - data[i + 1]]
+            else:
+                raise ValueError(f"Unknown type of run-length token: {token_type}")
+        return bytes(decoded)
+
+    def finish(self) -> bytes:
+        """
+        Returns:
+            bytes: Symbol held back by the decoder
+        """
+        previous, self.previous = self.previous, b""
+        return previous
+
+
+class RunLengthWriter:
+    """
+    Wraps a file, tokens written to the wrapper are restored before being written to the file
+    """
+
+    def __init__(self, writer: BinaryIO, symbol_size: int = 1):
+        self.writer = writer
+        self.decoder = RunLengthDecoder(symbol_size)
+
+    def write(self, data: bytes):
+        self.writer.write(self.decoder.feed(data))
+
+    def finish(self):
+        self.writer.write(self.decoder.finish())
@@ -0,0 +1,67 @@
+import shutil
+from pathlib import Path
+
+from src.fileInfo import FileInfo
+from src.utility import make_first_byte, read_algorithm_identifier
+
+#   encoded file structure:
+#   header: 1 byte: 1 bit set to 0, 3 bits of padding 0s, 4 bits to specify format type
+#           1 byte to specify how many bytes are taken by extension (n)
+#   extension: n bytes
+#   contents: until EOF, copied without any changes
+
+
+STORED = 2
+
+
+def stored_size(filepath: Path) -> int:
+    """
+    Computes size of the file at `filepath` after saving it in stored format
+
+    Args:
+        filepath (Path): File to be saved
+
+    Returns:
+        int: Size of stored file in bytes
+    """
+    return 2 + len(filepath.suffix.encode()) + filepath.stat().st_size
+
+
+def encode(src: Path, dst: Path):
+    extension = src.suffix.encode()
+    with open(src, "rb") as reader, open(dst, "wb") as writer:
+        writer.write(make_first_byte(STORED) + len(extension).to_bytes(length=1, byteorder="big"))
+        writer.write(extension)
+        shutil.copyfileobj(reader, writer)
+
+
+def read_info(src: Path) -> FileInfo:
+    """
+    Reads sizes of the stored file
+
+    Args:
+        src (Path): Stored file
+
+    Raises:
+        ValueError: Raised if file was not saved in stored format
+
+    Returns:
+        FileInfo: Info of the file, contents are copied, so every byte takes 8 bits
+    """
+    with open(src, "rb") as reader:
+        header = reader.read(2)
+    if len(header) < 2 or read_algorithm_identifier(header) != STORED:
+        raise ValueError("File was not saved in stored format")
+    compressed_size = src.stat().st_size
+    original_size = compressed_size - 2 - header[1]
+    bit_rate = 8.0 if original_size else None
+    return FileInfo("stored", compressed_size, original_size, 1, original_size, None, bit_rate)
+
+
+def decode(src: Path, dst: Path):
+    with open(src, "rb") as reader:
+        header = reader.read(2)
+        extension = reader.read(header[1])
+        destination = dst.with_suffix(extension.decode())
+        with open(destination, "wb") as writer:
+            shutil.copyfileobj(reader, writer)
@@ -0,0 +1,103 @@
+from collections import Counter
+from math import ceil, lcm, log2
+from pathlib import Path
+
+# Bytes taken by NPY header of symbol counts serialized with `save_counts` (see src/npy.py)
+COUNTS_HEADER_SIZE = 128
+
+
+def read_sample(filepath: Path, sample_size: int = 2**16, n_blocks: int = 16, alignment: int = 1):
+    """
+    Reads evenly spaced blocks of the file, the whole file is read if it is not bigger than
+    `sample_size`
+
+    Args:
+        filepath (Path): File to sample
+        sample_size (int, optional): Total number of bytes in the sample. Defaults to 2**16.
+        n_blocks (int, optional): Number of blocks the sample is split into. Defaults to 16.
+        alignment (int, optional): Offsets and lengths of blocks will be its multiples.
+            Defaults to 1.
+
+    Returns:
+        tuple[list[bytes], int]: Sampled blocks and size of the file
+    """
+    file_size = filepath.stat().st_size
+    with open(filepath, "rb") as file:
+        if file_size <= sample_size:
+            return [file.read()], file_size
+        block_size = max(sample_size // n_blocks // alignment, 1) * alignment
+        stride = (file_size - block_size) // (n_blocks - 1) // alignment * alignment
+        blocks = []
+        for i in range(n_blocks):
+            file.seek(i * stride)
+            blocks.append(file.read(block_size))
+        return blocks, file_size
+
+
+def entropy(counts) -> float:
+    """
+    Computes entropy of distribution of symbols
+
+    Args:
+        counts: Numbers of occurrences of every symbol
+
+    Returns:
+        float: Average number of bits of information per symbol
+    """
+    total = sum(counts)
+    return -sum(count / total * log2(count / total) for count in counts)
+
+
+def estimate_output_size(blocks: list[bytes], file_size: int, symbol_size: int) -> float:
+    """
+    Estimates size of the file encoded with basic Huffman algorithm based on its sample
+
+    Args:
+        blocks (list[bytes]): Sample of the file
+        file_size (int): Size of the whole file in bytes
+        symbol_size (int): Size of symbols in bytes
+
+    Returns:
+        float: Expected size of encoded file in bytes
+    """
+    counts = Counter(
+        block[i : i + symbol_size] for block in blocks for i in range(0, len(block), symbol_size)
+    )
+    sampled_symbols = sum(counts.values())
+    n_symbols = ceil(file_size / symbol_size)
+    scale = n_symbols / sampled_symbols
+
+    # Number of symbols absent from the sample is estimated with Chao1 estimator
+    singletons = sum(1 for count in counts.values() if count == 1)
+    doubletons = sum(1 for count in counts.values() if count == 2)
+    if doubletons > 0:
+        unseen = singletons**2 / (2 * doubletons)
+    else:
+        unseen = singletons * (singletons - 1) / 2
+    distinct = min(len(counts) + unseen, n_symbols, 256**symbol_size)
+
+    max_count = max(counts.values()) * scale
+    count_size = 1 if max_count < 2**8 else 2 if max_count < 2**16 else 4
+    table_size = COUNTS_HEADER_SIZE + distinct * (symbol_size + count_size)
+    contents_size = entropy(counts.values()) * n_symbols / 8
+    return 6 + table_size + contents_size
+
+
+def select_symbol_size(filepath: Path, max_symbol_size: int = 3, sample_size: int = 2**16) -> int:
+    """
+    Chooses size of symbols that minimizes expected size of the file encoded with basic Huffman
+    algorithm
+
+    Args:
+        filepath (Path): File that will be encoded
+        max_symbol_size (int, optional): Biggest symbol size taken into account. Defaults to 3.
+        sample_size (int, optional): Number of bytes sampled from the file. Defaults to 2**16.
+
+    Returns:
+        int: Size of symbols in bytes
+    """
+    sizes = range(1, max_symbol_size + 1)
+    blocks, file_size = read_sample(filepath, sample_size, alignment=lcm(*sizes))
+    if file_size == 0:
+        return 1
+    return min(sizes, key=lambda size: estimate_output_size(blocks, file_size, size))
@@ -0,0 +1,183 @@
+from pathlib import Path
+from typing import BinaryIO
+
+from src.basicHuffman import count_symbols
+from src.fileInfo import FileInfo
+from src.utility import make_first_byte, read_algorithm_identifier, read_chunks
+
+#   Entropy coding of 1 byte symbols with table-based asymmetric numeral systems (tANS), coder
+#   is implemented in `tansTable`, which depends on NumPy, imported only when files are coded.
+#
+#   encoded file structure:
+#   header: 1 byte: 1 bit set to 0, 3 bits of padding 0s, 4 bits to specify format type
+#           1 byte to specify table log (R)
+#           1 byte to specify how many bytes are taken by extension (n)
+#           8 bytes to specify size of contents in bytes
+#   extension: n bytes
+#   normalized counts: 32 bytes: bitmap of symbols with positive counts, the most significant
+#                      bit stands for symbol 0
+#                      2 bytes for count of every symbol set in the bitmap, in order of symbols
+#   blocks: until EOF
+#       4 bytes to specify number of symbols in the block (m)
+#       2 bytes to specify number of lanes (w)
+#       4 bytes to specify number of bytes taken by bits of the block (b)
+#       final states of lanes: R bits for every lane, padded with 0s to full bytes
+#       bits: b bytes, padded with 0s
+
+TANS = 10
+HEADER_SIZE = 11
+BITMAP_SIZE = 32
+BLOCK_HEADER_SIZE = 10
+# Number of symbols coded at once
+BLOCK_SYMBOLS = 2**20
+
+
+def _serialize_counts(counts: list[int]) -> bytes:
+    """
+    Args:
+        counts (list[int]): Normalized counts of every symbol
+
+    Returns:
+        bytes: Bitmap of present symbols followed by their counts
+    """
+    bitmap = sum(1 << (255 - symbol) for symbol, count in enumerate(counts) if count)
+    return bitmap.to_bytes(BITMAP_SIZE, byteorder="big") + b"".join(
+        count.to_bytes(2, byteorder="big") for count in counts if count
+    )
+
+
+def _read_header(reader: BinaryIO) -> tuple[int, bytes, int, list[int]]:
+    """
+    Reads header, extension and normalized counts of encoded file
+
+    Args:
+        reader (BinaryIO): Encoded file positioned at its beginning
+
+    Raises:
+        ValueError: Raised if file was not encoded with tANS
+
+    Returns:
+        tuple[int, bytes, int, list[int]]: Table log, extension, size of contents in bytes and
+        normalized counts of every symbol
+    """
+    header = reader.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or read_algorithm_identifier(header) != TANS:
+        raise ValueError("File was not encoded with tANS")
+    extension = reader.read(header[2])
+    contents_size = int.from_bytes(header[3:], byteorder="big")
+    bitmap = int.from_bytes(reader.read(BITMAP_SIZE), byteorder="big")
+    counts = [0] * 256
+    for symbol in range(256):
+        if bitmap >> (255 - symbol) & 1:
+            counts[symbol] = int.from_bytes(reader.read(2), byteorder="big")
+    return header[1], extension, contents_size, counts
+
+
+def _read_block_header(reader: BinaryIO) -> tuple[int, int, int]:
+    """
+    Raises:
+        ValueError: Raised if file ends before all contents were read
+
+    Returns:
+        tuple[int, int, int]: Number of symbols of the block, number of its lanes and number of
+        bytes taken by its bits
+    """
+    header = reader.read(BLOCK_HEADER_SIZE)
+    if len(header) < BLOCK_HEADER_SIZE:
+        raise ValueError("Encoded file is truncated")
+    return (
+        int.from_bytes(header[:4], byteorder="big"),
+        int.from_bytes(header[4:6], byteorder="big"),
+        int.from_bytes(header[6:], byteorder="big"),
+    )
+
+
+def encode(src: Path, dst: Path):
+    """
+    Encodes file with tANS, counts of symbols of the file and its extension are normalized to
+    the size of the coding table
+
+    Args:
+        src (Path): File to encode
+        dst (Path): Destination of encoded file
+    """
+    import numpy as np
+
+    from src.tansTable import TansTable, lanes, pack_bits
+
+    # Empty file without extension gets a table of any symbol
+    table = TansTable.from_counts(count_symbols(src) or [(0, 1)])
+    extension = src.suffix.encode()
+    with open(dst, "wb") as writer:
+        writer.write(make_first_byte(TANS) + bytes([table.log, len(extension)]))
+        writer.write(src.stat().st_size.to_bytes(8, byteorder="big"))
+        writer.write(extension)
+        writer.write(_serialize_counts(table.counts.tolist()))
+        for chunk in read_chunks(src, BLOCK_SYMBOLS):
+            n_lanes = lanes(len(chunk))
+            states, bits = table.encode_block(np.frombuffer(chunk, dtype=np.uint8), n_lanes)
+            writer.write(len(chunk).to_bytes(4, byteorder="big"))
+            writer.write(n_lanes.to_bytes(2, byteorder="big"))
+            writer.write(len(bits).to_bytes(4, byteorder="big"))
+            writer.write(pack_bits(states, np.full(n_lanes, table.log)))
+            writer.write(bits)
+
+
+def decode(src: Path, dst: Path):
+    """
+    Decodes file encoded with tANS
+
+    Args:
+        src (Path): Encoded file
+        dst (Path): Destination of decoded file, its suffix is replaced with the original one
+
+    Raises:
+        ValueError: Raised if file was not encoded with tANS or is truncated
+    """
+    import numpy as np
+
+    from src.tansTable import TansTable, unpack_bits
+
+    with open(src, "rb") as reader:
+        log, extension, contents_size, counts = _read_header(reader)
+        table = TansTable(np.array(counts, dtype=np.int64), log)
+        with open(dst.with_suffix(extension.decode()), "wb") as writer:
+            while contents_size > 0:
+                n_symbols, n_lanes, bits_size = _read_block_header(reader)
+                states_size = (n_lanes * log + 7) // 8
+                block = reader.read(states_size + bits_size)
+                if len(block) < states_size + bits_size:
+                    raise ValueError("Encoded file is truncated")
+                data = np.frombuffer(block[:states_size] + bytes(3), dtype=np.uint8)
+                offsets = np.arange(n_lanes) * log
+                states = unpack_bits(data.astype(np.int64), offsets, np.full(n_lanes, log))
+                writer.write(table.decode_block(n_symbols, states, block[states_size:]))
+                contents_size -= n_symbols
+
+
+def read_info(src: Path) -> FileInfo:
+    """
+    Reads sizes of the encoded file and sizes of its blocks, without decoding them
+
+    Args:
+        src (Path): File encoded with tANS
+
+    Raises:
+        ValueError: Raised if file was not encoded with tANS
+
+    Returns:
+        FileInfo: Info of the file. Entropy is not known, header keeps only normalized counts.
+        Bit rate includes final states of lanes.
+    """
+    with open(src, "rb") as reader:
+        log, _, contents_size, _ = _read_header(reader)
+        n_symbols = contents_size
+        n_bits = 0
+        while n_symbols > 0:
+            block_symbols, n_lanes, bits_size = _read_block_header(reader)
+            states_size = (n_lanes * log + 7) // 8
+            reader.seek(states_size + bits_size, 1)
+            n_bits += 8 * (states_size + bits_size)
+            n_symbols -= block_symbols
+    bit_rate = n_bits / contents_size if contents_size else None
+    return FileInfo("tANS", src.stat().st_size, contents_size, 1, contents_size, None, bit_rate)
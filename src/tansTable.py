@@ -0,0 +1,218 @@
+import numpy as np
+
+#   Table-based asymmetric numeral systems (tANS) coder of 1 byte symbols. Counts of symbols are
+#   normalized to sum up to L = 2^R (R is the table log) and symbols are spread over a table of
+#   L states. A symbol with normalized count f is coded with R - log2(f) bits on average, which,
+#   unlike lengths of Huffman codes, does not have to be a whole number.
+#
+#   Symbols of a block are distributed round-robin over lanes with separate states, so that a
+#   single step of the coder handles one symbol of every lane with vectorized operations.
+#   Symbols are encoded from the last to the first, so that they are decoded in order. Bits of
+#   a step are written in order of lanes.
+
+MIN_TABLE_LOG = 5
+# Bits of a value read by the decoder always fit in a 24 bit window together with its offset
+MAX_TABLE_LOG = 12
+MAX_LANES = 2**10
+# Minimal number of symbols coded by a lane, limits overhead of final states of lanes
+LANE_SYMBOLS = 2**10
+
+
+def table_log(counts: np.ndarray) -> int:
+    """
+    Chooses size of the table, large enough to give every symbol a state and to approximate
+    counts closely, but not larger than the number of counted symbols
+
+    Args:
+        counts (np.ndarray): Numbers of occurrences of every symbol
+
+    Returns:
+        int: Table log (R)
+    """
+    total = int(counts.sum())
+    log = min(MAX_TABLE_LOG, max(MIN_TABLE_LOG, (total - 1).bit_length()))
+    return max(log, (int(np.count_nonzero(counts)) - 1).bit_length())
+
+
+def normalize_counts(counts: np.ndarray, log: int) -> np.ndarray:
+    """
+    Scales counts of symbols so that they sum up to 2^log, every present symbol keeps count of
+    at least 1
+
+    Args:
+        counts (np.ndarray): Numbers of occurrences of every symbol, at least one positive
+        log (int): Table log (R)
+
+    Returns:
+        np.ndarray: Normalized counts of every symbol
+    """
+    size = 1 << log
+    present = counts > 0
+    scaled = counts * size / counts.sum()
+    normalized = np.where(present, np.maximum(np.floor(scaled), 1), 0).astype(np.int64)
+    missing = size - int(normalized.sum())
+    if missing > 0:
+        # Rounded down counts of less than `missing` symbols lost their fractions
+        remainders = np.where(present, scaled - np.floor(scaled), -1)
+        normalized[np.argsort(-remainders, kind="stable")[:missing]] += 1
+    # Symbols raised to count 1 take states from the most frequent symbols
+    for _ in range(-missing):
+        normalized[np.argmax(normalized)] -= 1
+    return normalized
+
+
+def lanes(n_symbols: int) -> int:
+    """
+    Returns:
+        int: Number of lanes coding a block of `n_symbols` symbols
+    """
+    return min(MAX_LANES, max(1, n_symbols // LANE_SYMBOLS))
+
+
+def pack_bits(values: np.ndarray, lengths: np.ndarray) -> bytes:
+    """
+    Concatenates values written with given numbers of bits, most significant bits first
+
+    Args:
+        values (np.ndarray): Values smaller than 2 to the power of their lengths
+        lengths (np.ndarray): Numbers of bits of values, at most MAX_TABLE_LOG
+
+    Returns:
+        bytes: Bits of values, the last byte is padded with 0s
+    """
+    if not len(values):
+        return b""
+    offsets = np.cumsum(lengths) - lengths
+    n_bytes = (int(offsets[-1] + lengths[-1]) + 7) // 8
+    # Values are placed in 24 bit windows starting at bytes of their first bits. Values do not
+    # share bits, so bytes of windows are summed instead of combined with bitwise OR.
+    shifted = values << (24 - (offsets & 7) - lengths)
+    first = offsets >> 3
+    packed = np.bincount(
+        np.concatenate((first, first + 1, first + 2)),
+        weights=np.concatenate((shifted >> 16, (shifted >> 8) & 0xFF, shifted & 0xFF)),
+        minlength=n_bytes + 3,
+    )
+    return packed[:n_bytes].astype(np.uint8).tobytes()
+
+
+def unpack_bits(data: np.ndarray, offsets: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Reads values written by `pack_bits`
+
+    Args:
+        data (np.ndarray): Bytes of packed values as integers, followed by 3 bytes of padding
+        offsets (np.ndarray): Positions of the first bits of values
+        lengths (np.ndarray): Numbers of bits of values
+
+    Returns:
+        np.ndarray: Values
+    """
+    first = offsets >> 3
+    windows = data[first] << 16 | data[first + 1] << 8 | data[first + 2]
+    return (windows >> (24 - (offsets & 7) - lengths)) & ((1 << lengths) - 1)
+
+
+class TansTable:
+    def __init__(self, counts: np.ndarray, log: int):
+        """
+        Spreads symbols over states of the coder
+
+        Args:
+            counts (np.ndarray): Normalized counts of every symbol, summing up to 2^log
+            log (int): Table log (R)
+        """
+        self.log = log
+        self.counts = counts
+        size = 1 << log
+        # Odd step visits every state once and scatters states of each symbol over the table
+        step = (size >> 1) + (size >> 3) + 3
+        self.symbols = np.empty(size, dtype=np.uint8)
+        self.symbols[np.arange(size) * step & (size - 1)] = np.repeat(
+            np.arange(len(counts), dtype=np.uint8), counts
+        )
+        self.starts = np.cumsum(counts) - counts
+        # States of every symbol in increasing order
+        self.states = np.argsort(self.symbols, kind="stable")
+        ranks = np.empty(size, dtype=np.int64)
+        ranks[self.states] = np.arange(size) - self.starts[self.symbols[self.states]]
+        # Decoding a state yields a symbol and its subsequent state from [f, 2f), which is
+        # scaled back to [L, 2L) with bits read from the stream
+        subsequent = counts[self.symbols] + ranks
+        self.n_bits = log - np.floor(np.log2(subsequent)).astype(np.int64)
+        self.bases = (subsequent << self.n_bits) - size
+        self.high_bits = np.floor(np.log2(np.maximum(counts, 1))).astype(np.int64)
+
+    @classmethod
+    def from_counts(cls, counts: list[tuple[int, int]]) -> "TansTable":
+        """
+        Args:
+            counts (list[tuple[int, int]]): Pairs of 1 byte symbols and their numbers of
+                occurrences, as returned by `count_symbols`
+
+        Returns:
+            TansTable: Table with normalized counts
+        """
+        histogram = np.zeros(256, dtype=np.int64)
+        for symbol, count in counts:
+            histogram[symbol] = count
+        log = table_log(histogram)
+        return cls(normalize_counts(histogram, log), log)
+
+    def encode_block(self, symbols: np.ndarray, n_lanes: int) -> tuple[np.ndarray, bytes]:
+        """
+        Encodes symbols distributed over lanes
+
+        Args:
+            symbols (np.ndarray): Symbols of the block, all with positive normalized counts
+            n_lanes (int): Number of lanes
+
+        Returns:
+            tuple[np.ndarray, bytes]: Final states of lanes, in range [0, 2^R), and bits of
+            the block
+        """
+        size = 1 << self.log
+        n_symbols = len(symbols)
+        states = np.full(n_lanes, size, dtype=np.int64)
+        values = np.empty(n_symbols, dtype=np.int64)
+        lengths = np.empty(n_symbols, dtype=np.int64)
+        for start in reversed(range(0, n_symbols, n_lanes)):
+            end = min(start + n_lanes, n_symbols)
+            block = symbols[start:end]
+            counts = self.counts[block]
+            shift = self.log - self.high_bits[block]
+            active = states[: end - start]
+            # States are reduced to [f, 2f) of the symbol
+            n_bits = shift - ((active >> shift) < counts)
+            values[start:end] = active & ((1 << n_bits) - 1)
+            lengths[start:end] = n_bits
+            indices = self.starts[block] + (active >> n_bits) - counts
+            states[: end - start] = size + self.states[indices]
+        return states - size, pack_bits(values, lengths)
+
+    def decode_block(self, n_symbols: int, states: np.ndarray, data: bytes) -> np.ndarray:
+        """
+        Decodes symbols distributed over lanes
+
+        Args:
+            n_symbols (int): Number of symbols of the block
+            states (np.ndarray): Final states of lanes written by the encoder
+            data (bytes): Bits of the block
+
+        Returns:
+            np.ndarray: Symbols of the block
+        """
+        n_lanes = len(states)
+        bits = np.frombuffer(data + bytes(3), dtype=np.uint8).astype(np.int64)
+        symbols = np.empty(n_symbols, dtype=np.uint8)
+        states = states.copy()
+        position = 0
+        for start in range(0, n_symbols, n_lanes):
+            end = min(start + n_lanes, n_symbols)
+            active = states[: end - start]
+            symbols[start:end] = self.symbols[active]
+            n_bits = self.n_bits[active]
+            ends = position + np.cumsum(n_bits)
+            states[: end - start] = self.bases[active] + unpack_bits(bits, ends - n_bits, n_bits)
+            position = int(ends[-1])
+        return symbols
@@ -0,0 +1,33 @@
+import random
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+#   Fixtures shared by test modules
+
+
+def skewed_bytes(length: int, seed: int = 0) -> bytes:
+    generator = random.Random(seed)
+    return bytes(generator.choice(b"aaaaaaabbbccd\x00") for _ in range(length))
+
+
+def synthetic_pgm(width: int, height: int, seed: int = 0) -> bytes:
+    generator = random.Random(seed)
+    pixels = bytes(
+        min(255, max(0, (x + 2 * y) // 3 + generator.randint(-2, 2)))
+        for y in range(height)
+        for x in range(width)
+    )
+    return f"P5\n# synthetic\n{width} {height}\n255\n".encode() + pixels
+
+
+class TemporaryDirectoryTestCase(unittest.TestCase):
+    """
+    Test case with a temporary directory at `self.path`, removed after every test, after
+    `tearDown` of subclasses
+    """
+
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name)
@@ -0,0 +1,85 @@
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src import adaptiveHuffman
+from src.HuffmanTree import _NODE, SYMBOL_NODE, HuffmanTree
+from src.pipeline import Pipeline
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+from src.utility import SYMBOL_BYTEORDER, bytes2symbols
+
+
+class TestCheckpoint(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.parts = [skewed_bytes(3000), b"", bytes(range(256)) * 3, skewed_bytes(1000) + b"aaaa"]
+
+    def write_part(self, index: int) -> Path:
+        part = self.path.joinpath(f"part{index}.log")
+        part.write_bytes(self.parts[index])
+        return part
+
+    def decoded(self, encoded: Path) -> bytes:
+        adaptiveHuffman.decode(encoded, self.path.joinpath("decoded"))
+        return self.path.joinpath("decoded.log").read_bytes()
+
+    def test_tree(self):
+        symbols = list(skewed_bytes(2000))
+        tree = HuffmanTree()
+        for symbol in symbols[:1000]:
+            tree.encode_code(symbol)
+        restored = HuffmanTree.from_checkpoint(tree.checkpoint())
+        self.assertEqual(restored.checkpoint(), tree.checkpoint())
+        for symbol in symbols[1000:] + [255]:
+            self.assertEqual(restored.encode_code(symbol), tree.encode_code(symbol))
+        self.assertEqual(restored.eof_code(), tree.eof_code())
+
+    def test_symbol_bytes(self):
+        # Symbols are saved as their bytes in encoded contents, which do not depend on byte order
+        tree = HuffmanTree(symbol_size=2)
+        tree.encode_code(bytes2symbols(b"\x01\x02", 2)[0])
+        checkpoint = tree.checkpoint()
+        self.assertIn(_NODE.pack(SYMBOL_NODE, 1) + b"\x01\x02", checkpoint)
+        other_byteorder = "big" if SYMBOL_BYTEORDER == "little" else "little"
+        with patch("src.HuffmanTree.SYMBOL_BYTEORDER", other_byteorder):
+            restored = HuffmanTree.from_checkpoint(checkpoint)
+        self.assertEqual(list(restored.leafs), [int.from_bytes(b"\x01\x02", other_byteorder)])
+
+    def test_invalid_tree(self):
+        checkpoint = HuffmanTree().checkpoint()
+        for data in [b"", checkpoint[:-1], checkpoint + b"\x00", checkpoint[:5] + b"\x07"]:
+            with self.assertRaises(ValueError):
+                HuffmanTree.from_checkpoint(data)
+
+    def test_append(self):
+        encoded = self.path.joinpath("encoded.huf")
+        adaptiveHuffman.encode(self.write_part(0), encoded, checkpoint=True)
+        for index in range(1, len(self.parts)):
+            adaptiveHuffman.append(self.write_part(index), encoded)
+        self.assertEqual(self.decoded(encoded), b"".join(self.parts))
+
+        # Encoding continues as if the data was encoded at once
+        whole = self.path.joinpath("whole.log")
+        whole.write_bytes(b"".join(self.parts))
+        expected = self.path.joinpath("expected.huf")
+        adaptiveHuffman.encode(whole, expected, checkpoint=True)
+        self.assertEqual(encoded.read_bytes(), expected.read_bytes())
+
+    def test_append_run_length(self):
+        encoded = self.path.joinpath("encoded.huf")
+        pipeline = Pipeline(block_size=100, depth=2)
+        adaptiveHuffman.encode(self.write_part(3), encoded, run_length=True, checkpoint=True)
+        adaptiveHuffman.append(self.write_part(3), encoded, pipeline)
+        adaptiveHuffman.append(self.write_part(2), encoded, pipeline)
+        self.assertEqual(self.decoded(encoded), self.parts[3] * 2 + self.parts[2])
+
+    def test_without_checkpoint(self):
+        encoded = self.path.joinpath("encoded.huf")
+        for run_length in [False, True]:
+            adaptiveHuffman.encode(self.write_part(0), encoded, run_length=run_length)
+            with self.assertRaises(ValueError):
+                adaptiveHuffman.append(self.write_part(2), encoded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from src.archive import create_archive, extract_archive, extract_member, list_members
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+from unhuf import decode
+
+
+class TestArchive(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.files = []
+        for i, length in enumerate([0, 1, 700, 3001]):
+            file = self.path.joinpath(f"file{i}.bin")
+            file.write_bytes(skewed_bytes(length, seed=i))
+            self.files.append(file)
+        self.archive = self.path.joinpath("files.huf")
+        self.decoded = self.path.joinpath("decoded")
+        self.decoded.mkdir()
+
+    def test_list_members(self):
+        create_archive(self.files, self.archive)
+        members = list_members(self.archive)
+        self.assertEqual([member.name for member in members], [file.name for file in self.files])
+        self.assertEqual([member.size for member in members], [0, 1, 700, 3001])
+
+    def test_extract_member(self):
+        create_archive(self.files, self.archive, symbol_size=2)
+        member = list_members(self.archive)[2]
+        extracted = extract_member(self.archive, member, self.decoded)
+        self.assertEqual(extracted.read_bytes(), self.files[2].read_bytes())
+
+    def test_extract_archive(self):
+        create_archive(self.files, self.archive)
+        for workers in [1, 2]:
+            paths = extract_archive(self.archive, self.decoded, workers=workers)
+            self.assertEqual(len(paths), len(self.files))
+            for file in self.files:
+                self.assertEqual(self.decoded.joinpath(file.name).read_bytes(), file.read_bytes())
+
+    def test_decode_dispatch(self):
+        create_archive(self.files, self.archive)
+        decode(self.archive, self.decoded.joinpath("files"), members=["file3.bin"])
+        self.assertEqual([path.name for path in self.decoded.iterdir()], ["file3.bin"])
+
+    def test_equal_names(self):
+        other = self.path.joinpath("other", "file2.bin")
+        other.parent.mkdir()
+        other.write_bytes(b"abc")
+        with self.assertRaises(ValueError):
+            create_archive(self.files + [other], self.archive)
+        self.assertFalse(self.archive.exists())
+
+    def test_unsafe_names(self):
+        create_archive(self.files, self.archive)
+        data = self.archive.read_bytes()
+        for name in ["../file1.bin", "/tmp/file1.bin", "sub/file1.bin", "sub\\file1.bin", ".."]:
+            with self.subTest(name=name):
+                encoded = len(name).to_bytes(length=2, byteorder="big") + name.encode()
+                self.archive.write_bytes(data.replace(b"\x00\x09file1.bin", encoded))
+                member = list_members(self.archive)[1]
+                self.assertEqual(member.name, name)
+                with self.assertRaises(ValueError):
+                    extract_member(self.archive, member, self.decoded)
+                for workers in [1, 2]:
+                    with self.assertRaises(ValueError):
+                        extract_archive(self.archive, self.decoded, workers=workers)
+                self.assertEqual(list(self.decoded.iterdir()), [])
+
+    def test_single_symbol(self):
+        self.files[2].write_bytes(b"a" * 10)
+        create_archive(self.files[2:3], self.archive)
+        extract_archive(self.archive, self.decoded)
+        self.assertEqual(self.decoded.joinpath("file2.bin").read_bytes(), b"a" * 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
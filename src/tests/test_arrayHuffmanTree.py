@@ -0,0 +1,100 @@
+import random
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src import adaptiveHuffman
+from src.arrayHuffmanTree import JIT_AVAILABLE, ArrayHuffmanTree
+from src.HuffmanTree import HuffmanTree
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+
+DATA_DIR = Path(__file__).resolve().parents[2].joinpath("data")
+# Without Numba loops of ArrayHuffmanTree run as slow pure Python, so only beginnings of files
+# of the corpus are compared
+PREFIX_SIZE = None if JIT_AVAILABLE else 2**13
+
+
+def corpus() -> dict[str, bytes]:
+    files = {
+        "skewed.txt": skewed_bytes(8000),
+        "random.bin": random.Random(0).randbytes(8000),
+        "runs.bin": bytes(range(256)) * 4 + b"\x00" * 3000 + b"ab" * 2000,
+    }
+    for path in sorted(DATA_DIR.iterdir()):
+        if path.is_file() and not path.name.startswith("."):
+            files[path.name] = path.read_bytes()[:PREFIX_SIZE]
+    return files
+
+
+class TestArrayHuffmanTree(TemporaryDirectoryTestCase):
+    def encode(self, source: Path, use_array_tree: bool, **kwargs) -> bytes:
+        encoded = self.path.joinpath(f"encoded{use_array_tree}.huf")
+        with patch("src.adaptiveHuffman.USE_ARRAY_TREE", use_array_tree):
+            adaptiveHuffman.encode(source, encoded, **kwargs)
+        return encoded.read_bytes()
+
+    def decode(self, encoded: bytes, use_array_tree: bool) -> bytes:
+        source = self.path.joinpath("encoded.huf")
+        source.write_bytes(encoded)
+        with patch("src.adaptiveHuffman.USE_ARRAY_TREE", use_array_tree):
+            adaptiveHuffman.decode(source, self.path.joinpath("decoded"))
+        decoded = next(self.path.glob("decoded.*"))
+        data = decoded.read_bytes()
+        decoded.unlink()
+        return data
+
+    def test_identical_streams(self):
+        for name, data in corpus().items():
+            source = self.path.joinpath(name)
+            source.write_bytes(data)
+            for run_length in [False, True]:
+                with self.subTest(name=name, run_length=run_length):
+                    expected = self.encode(source, False, run_length=run_length, checkpoint=True)
+                    encoded = self.encode(source, True, run_length=run_length, checkpoint=True)
+                    self.assertEqual(encoded, expected)
+                    self.assertEqual(self.decode(expected, True), data)
+
+    def test_append_to_other_backend(self):
+        parts = [skewed_bytes(3000), bytes(range(256)), skewed_bytes(1000, seed=1)]
+        sources = []
+        for index, part in enumerate(parts):
+            sources.append(self.path.joinpath(f"part{index}.log"))
+            sources[-1].write_bytes(part)
+        encoded = self.path.joinpath("encoded.huf")
+        with patch("src.adaptiveHuffman.USE_ARRAY_TREE", False):
+            adaptiveHuffman.encode(sources[0], encoded, checkpoint=True)
+        with patch("src.adaptiveHuffman.USE_ARRAY_TREE", True):
+            adaptiveHuffman.append(sources[1], encoded)
+        with patch("src.adaptiveHuffman.USE_ARRAY_TREE", False):
+            adaptiveHuffman.append(sources[2], encoded)
+        self.assertEqual(self.decode(encoded.read_bytes(), True), b"".join(parts))
+
+    def test_codes_and_checkpoint(self):
+        generator = random.Random(0)
+        symbols = [int(generator.paretovariate(1.0)) % 2**16 for _ in range(3000)]
+        tree = HuffmanTree(symbol_size=2)
+        array_tree = ArrayHuffmanTree(symbol_size=2)
+        codes = []
+        array_tree.encode_symbols(symbols[:2000], lambda *code: codes.append(code))
+        expected = 0
+        for symbol in symbols[:2000]:
+            code, length = tree.encode_code(symbol)
+            expected = expected << length | code
+        self.assertEqual(codes, [(expected, sum(length for _, length in codes))])
+        self.assertEqual(array_tree.checkpoint(), tree.checkpoint())
+
+        restored = ArrayHuffmanTree.from_checkpoint(tree.checkpoint())
+        for symbol in symbols[2000:]:
+            self.assertEqual(restored.encode_code(symbol), tree.encode_code(symbol))
+        self.assertEqual(restored.eof_code(), tree.eof_code())
+        self.assertEqual(restored.checkpoint(), tree.checkpoint())
+
+    def test_invalid_symbols(self):
+        with self.assertRaises(OverflowError):
+            ArrayHuffmanTree().encode_code(256)
+        with self.assertRaises(ValueError):
+            ArrayHuffmanTree(symbol_size=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
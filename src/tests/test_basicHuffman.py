@@ -0,0 +1,131 @@
+import os
+import random
+import unittest
+from pathlib import Path
+
+from src.basicHuffman import (
+    BASIC_HUFFMAN,
+    _encode_extension,
+    build_tree,
+    count_symbols,
+    counts_to_nodes,
+    decode_range,
+    encode,
+    estimate_encoded_size,
+)
+from src.npy import save_counts
+from src.stored import STORED
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+from src.utility import read_algorithm_identifier
+from unhuf import decode
+
+
+class TestBasicHuffman(TemporaryDirectoryTestCase):
+    def write_source(self, data: bytes, name: str = "source.bin") -> Path:
+        source = self.path.joinpath(name)
+        source.write_bytes(data)
+        return source
+
+    def encode_decode(self, source: Path, symbol_size: int = 1, **kwargs) -> bytes:
+        encoded = self.path.joinpath("encoded.huf")
+        encode(source, encoded, symbol_size, **kwargs)
+        decode_destination = self.path.joinpath("decoded", "result")
+        decode_destination.parent.mkdir(exist_ok=True)
+        decode(encoded, decode_destination)
+        return decode_destination.with_suffix(source.suffix).read_bytes()
+
+    def identifier(self) -> int:
+        with open(self.path.joinpath("encoded.huf"), "rb") as reader:
+            return read_algorithm_identifier(reader.read(1))
+
+    def test_round_trip(self):
+        data = skewed_bytes(3000) + b"z"
+        source = self.write_source(data)
+        for symbol_size in [1, 2, 3]:
+            self.assertEqual(self.encode_decode(source, symbol_size), data)
+
+    def test_single_symbol(self):
+        # Without extension the file has a single distinct symbol
+        data = b"a" * 5000
+        source = self.write_source(data, "single")
+        options = [
+            {},
+            {"index_interval": 64},
+            {"streams": 4},
+            {"workers": 2},
+            {"memory_budget": 2**20},
+        ]
+        for kwargs in options:
+            with self.subTest(**kwargs):
+                self.assertEqual(self.encode_decode(source, **kwargs), data)
+                self.assertNotEqual(self.identifier(), STORED)
+                if "index_interval" in kwargs:
+                    encoded = self.path.joinpath("encoded.huf")
+                    self.assertEqual(decode_range(encoded, 10, 5), b"aaaaa")
+
+    def test_large_alphabet(self):
+        data = random.Random(2).randbytes(30000)
+        source = self.write_source(data)
+        self.assertEqual(self.encode_decode(source, 2, allow_stored=False), data)
+
+    def test_estimated_size_is_exact(self):
+        source = self.write_source(skewed_bytes(2000))
+        for symbol_size in [1, 2]:
+            counts = count_symbols(source, symbol_size)
+            encodings = build_tree(counts_to_nodes(counts)).get_codings()
+            _, extension_len = _encode_extension(source, encodings, symbol_size)
+            estimate = estimate_encoded_size(
+                counts, encodings, len(save_counts(counts, symbol_size)), extension_len
+            )
+            encoded = self.path.joinpath("encoded.huf")
+            encode(source, encoded, symbol_size, allow_stored=False)
+            self.assertEqual(estimate, os.path.getsize(encoded))
+
+    def test_stored_fallback(self):
+        data = random.Random(1).randbytes(1000)
+        source = self.write_source(data, "random.png")
+        self.assertEqual(self.encode_decode(source), data)
+        self.assertEqual(self.identifier(), STORED)
+        self.assertEqual(os.path.getsize(self.path.joinpath("encoded.huf")), len(data) + 6)
+
+        source = self.write_source(skewed_bytes(1000))
+        self.encode_decode(source)
+        self.assertEqual(self.identifier(), BASIC_HUFFMAN)
+
+    def test_decode_range(self):
+        data = skewed_bytes(5000) + b"\x00\x00"
+        source = self.write_source(data)
+        for symbol_size in [1, 3]:
+            self.assertEqual(self.encode_decode(source, symbol_size, index_interval=64), data)
+            encoded = self.path.joinpath("encoded.huf")
+            for start, length in [(0, 10), (63, 2), (1000, 1500), (4990, 100), (6000, 1)]:
+                expected = data[start : start + length]
+                self.assertEqual(decode_range(encoded, start, length), expected)
+
+    def test_decode_range_of_incompressible_file(self):
+        data = random.Random(3).randbytes(2000)
+        source = self.write_source(data)
+        self.assertEqual(self.encode_decode(source, index_interval=64), data)
+        self.assertNotEqual(self.identifier(), STORED)
+        self.assertEqual(decode_range(self.path.joinpath("encoded.huf"), 100, 50), data[100:150])
+
+    def test_interleaved_streams(self):
+        data = skewed_bytes(5000) + b"\x00\x00"
+        source = self.write_source(data)
+        for symbol_size in [1, 3]:
+            for streams in [1, 4, 7]:
+                decoded = self.encode_decode(source, symbol_size, streams=streams)
+                self.assertEqual(decoded, data)
+        decoded = self.encode_decode(source, 2, streams=4, run_length=True)
+        self.assertEqual(decoded, data)
+
+    def test_decode_range_without_index(self):
+        source = self.write_source(skewed_bytes(500))
+        encoded = self.path.joinpath("encoded.huf")
+        encode(source, encoded)
+        with self.assertRaises(ValueError):
+            decode_range(encoded, 0, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
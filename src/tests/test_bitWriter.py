@@ -0,0 +1,87 @@
+import random
+import unittest
+from io import BytesIO
+
+from bitarray import bitarray
+from bitarray.util import int2ba
+
+from src import adaptiveHuffman
+from src.bitWriter import BitWriter
+from src.HuffmanTree import HuffmanTree
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+
+
+class CountingWriter(BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.sizes = []
+
+    def write(self, data) -> int:
+        self.sizes.append(len(data))
+        return super().write(data)
+
+
+def random_codes(n: int) -> list[tuple[int, int]]:
+    codes = []
+    for _ in range(n):
+        length = random.choice([0, 1, 3, 8, 13, 40, 300])
+        codes.append((random.getrandbits(length) if length else 0, length))
+    return codes
+
+
+class TestBitWriter(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        random.seed(0)
+
+    def test_matches_bitarray(self):
+        for block_size in [1, 7, 2**20]:
+            codes = random_codes(2000)
+            expected = bitarray()
+            for code, length in codes:
+                if length:
+                    expected += int2ba(code, length)
+            file = CountingWriter()
+            writer = BitWriter(file, block_size)
+            for code, length in codes:
+                writer.write(code, length)
+            self.assertEqual(len(writer), len(expected))
+            padding = writer.finish()
+            self.assertEqual(padding, expected.padbits)
+            expected.fill()
+            self.assertEqual(file.getvalue(), expected.tobytes())
+            # Only the last write is shorter than a block
+            self.assertTrue(all(size == block_size for size in file.sizes[:-1]))
+
+    def test_empty(self):
+        file = BytesIO()
+        self.assertEqual(BitWriter(file).finish(), 0)
+        self.assertEqual(file.getvalue(), b"")
+
+    def test_tree_codes(self):
+        for symbol_size in [1, 2, 3]:
+            data = skewed_bytes(400 * symbol_size)
+            symbols = [
+                int.from_bytes(data[i : i + symbol_size], "little")
+                for i in range(0, len(data), symbol_size)
+            ]
+            encoder = HuffmanTree(symbol_size=symbol_size)
+            decoder = HuffmanTree(symbol_size=symbol_size)
+            for symbol in symbols:
+                code, length = encoder.encode_code(symbol)
+                decoded, n_bits, _ = decoder.decode(int2ba(code, length) if length else bitarray())
+                self.assertEqual((decoded, n_bits), (symbol, length))
+
+    def test_adaptive_round_trip(self):
+        data = skewed_bytes(20000) + bytes(range(256))
+        source = self.path.joinpath("source.txt")
+        source.write_bytes(data)
+        for run_length in [False, True]:
+            encoded = self.path.joinpath(f"encoded{run_length}.huf")
+            adaptiveHuffman.encode(source, encoded, run_length=run_length)
+            adaptiveHuffman.decode(encoded, self.path.joinpath("decoded"))
+            self.assertEqual(self.path.joinpath("decoded.txt").read_bytes(), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import random
+import unittest
+
+import numpy as np
+from bitarray.util import zeros
+
+from src.basicHuffman import encode
+from src.contextModel import ContextModel, count_contexts
+from src.tests.helpers import TemporaryDirectoryTestCase, synthetic_pgm
+from unhuf import decode
+
+
+class TestContextModel(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.image = self.path.joinpath("image.pgm")
+        self.image.write_bytes(synthetic_pgm(256, 128))
+        self.decoded = self.path.joinpath("decoded")
+        self.decoded.mkdir()
+
+    def test_serialization(self):
+        model = ContextModel.from_counts(count_contexts(self.image))
+        restored = ContextModel.deserialize(model.serialize())
+        self.assertEqual(restored.context_map, model.context_map)
+        self.assertEqual(restored.codes, model.codes)
+
+    def test_shared_table(self):
+        model = ContextModel.from_counts(count_contexts(self.image), min_context_symbols=2**30)
+        self.assertEqual(len(model.tables), 1)
+        self.assertEqual(set(model.context_map), {0})
+
+    def test_round_trip(self):
+        for transform in [False, True]:
+            encoded = self.path.joinpath("image.huf")
+            encode(self.image, encoded, transform=transform, context_model=True)
+            decode(encoded, self.decoded.joinpath("image"))
+            restored = self.decoded.joinpath("image.pgm")
+            self.assertEqual(restored.read_bytes(), self.image.read_bytes())
+
+    def test_decode_long_codes(self):
+        # Symbol counts growing exponentially give codes longer than looked up at once
+        counts = np.zeros((16, 256), dtype=np.int64)
+        counts[:, :24] = 2 ** np.arange(24)
+        model = ContextModel.from_counts(counts, min_context_symbols=1)
+        self.assertGreater(model.max_length, 16)
+        generator = random.Random(0)
+        data = bytes(generator.choice(range(24)) for _ in range(5000))
+        code = model.encode_symbols(data)
+        end = len(code)
+        code.extend(zeros(model.lookahead))
+        decoded, position = model._decode_symbols(code, end, len(data), 0)
+        self.assertEqual(decoded, data)
+        self.assertEqual(position, end)
+        decoded, _ = model._decode_symbols(code, end, 100, 0)
+        self.assertEqual(decoded, data[:100])
+
+    def test_empty(self):
+        empty = self.path.joinpath("empty")
+        empty.write_bytes(b"")
+        encoded = self.path.joinpath("empty.huf")
+        encode(empty, encoded, allow_stored=False, context_model=True)
+        decode(encoded, self.decoded.joinpath("empty"))
+        self.assertEqual(self.decoded.joinpath("empty").read_bytes(), b"")
+
+    def test_smaller_than_single_table(self):
+        plain = self.path.joinpath("plain.huf")
+        context = self.path.joinpath("context.huf")
+        encode(self.image, plain, allow_stored=False)
+        encode(self.image, context, allow_stored=False, context_model=True)
+        self.assertLess(os.path.getsize(context), os.path.getsize(plain))
+
+    def test_requires_single_byte_symbols(self):
+        with self.assertRaises(ValueError):
+            encode(self.image, self.path.joinpath("image.huf"), 2, context_model=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import socket
+import stat
+import threading
+import unittest
+from unittest.mock import patch
+
+import huf
+import unhuf
+from src.basicHuffman import code_table, decoder
+from src.daemon import Daemon
+from src.daemonClient import send_request
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+
+
+def crash(argv: list[str]):
+    # Worker process dies without returning result of the job
+    os._exit(1)
+
+
+class TestDaemon(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.socket = self.path.joinpath("daemon.sock")
+        # Workers are forked from this process, they would inherit tables cached by other tests
+        code_table.cache_clear()
+        decoder.cache_clear()
+        self.tools = {"huf": huf.main, "unhuf": unhuf.main, "crash": crash}
+        self.daemon = Daemon(self.tools, self.socket, workers=1)
+        self.thread = threading.Thread(target=self.daemon.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        send_request({"command": "shutdown"}, self.socket)
+        self.thread.join()
+        self.daemon.server_close()
+
+    def run_tool(self, tool: str, *argv: str) -> dict:
+        request = {"command": "run", "tool": tool, "argv": list(argv), "cwd": str(self.path)}
+        return send_request(request, self.socket)
+
+    def test_jobs(self):
+        data = skewed_bytes(2000) + b"z"
+        self.path.joinpath("source.bin").write_bytes(data)
+        for i in range(3):
+            response = self.run_tool("huf", "-f", "source.bin", "-d", "encoded.huf")
+            self.assertEqual(response["status"], 0)
+            response = self.run_tool("unhuf", "-f", "encoded.huf", "-d", f"decoded{i}")
+            self.assertEqual(response["status"], 0)
+            self.assertEqual(self.path.joinpath(f"decoded{i}.bin").read_bytes(), data)
+
+        response = self.run_tool("huf", "--unknown")
+        self.assertEqual(response["status"], 2)
+        self.assertIn("huf.py", response["output"])
+
+        metrics = send_request({"command": "metrics"}, self.socket)
+        self.assertEqual(metrics["jobs"], {"huf": 4, "unhuf": 3})
+        self.assertEqual(metrics["failures"], {"huf": 1, "unhuf": 0})
+        # Encoding the same file and decoding it use the same code table
+        self.assertEqual(metrics["caches"]["code_tables"]["misses"], 1)
+        self.assertEqual(metrics["caches"]["code_tables"]["hits"], 3)
+        self.assertEqual(metrics["caches"]["decoders"]["misses"], 1)
+        self.assertEqual(metrics["caches"]["decoders"]["hits"], 5)
+
+    def test_crashed_worker(self):
+        response = self.run_tool("crash")
+        self.assertEqual(response["status"], 1)
+        self.assertIn("BrokenProcessPool", response["output"])
+        # Pool is replaced, so later jobs are run
+        self.path.joinpath("source.bin").write_bytes(skewed_bytes(100))
+        response = self.run_tool("huf", "-f", "source.bin", "-d", "encoded.huf")
+        self.assertEqual(response["status"], 0)
+        metrics = send_request({"command": "metrics"}, self.socket)
+        self.assertEqual(metrics["failures"], {"crash": 1, "huf": 0})
+
+    def test_invalid_request(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(str(self.socket))
+            with connection.makefile("rwb") as stream:
+                stream.write(b"[1, 2]\n")
+                stream.flush()
+                self.assertIn(b'"status": 2', stream.readline())
+
+    def test_socket(self):
+        self.assertEqual(stat.S_IMODE(self.socket.stat().st_mode), 0o600)
+        with self.assertRaises(OSError):
+            Daemon(self.tools, self.socket, workers=1)
+        # The running daemon keeps its socket
+        self.assertIn("jobs", send_request({"command": "metrics"}, self.socket))
+
+        # Sockets of stopped daemons are replaced, other files are not
+        stale = self.path.joinpath("stale.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.bind(str(stale))
+        Daemon(self.tools, stale, workers=1).server_close()
+        stale.write_bytes(b"")
+        with self.assertRaises(FileExistsError):
+            Daemon(self.tools, stale, workers=1)
+
+    def test_default_socket_directory(self):
+        default = self.path.joinpath("private", "daemon.sock")
+        with patch("src.daemon.DEFAULT_SOCKET", default):
+            Daemon(self.tools, default, workers=1).server_close()
+            self.assertEqual(stat.S_IMODE(default.parent.stat().st_mode), 0o700)
+            default.parent.chmod(0o755)
+            with self.assertRaises(PermissionError):
+                Daemon(self.tools, default, workers=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+from unittest.mock import patch
+
+from src import basicHuffman
+from src.externalCounts import MIN_MEMORY_BUDGET, count_symbols_external
+from src.npy import counts_shape, load_counts
+from src.tests.helpers import TemporaryDirectoryTestCase
+
+
+class TestExternalCounts(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        random.seed(0)
+        # Few symbols are repeated, so that counts of runs are added
+        self.data = random.randbytes(150000) + bytes(range(100)) * 300 + b"x"
+        self.source = self.path.joinpath("source.bin")
+        self.source.write_bytes(self.data)
+
+    def test_counts(self):
+        for symbol_size in [1, 2, 3, 4]:
+            expected = sorted(basicHuffman.count_symbols(self.source, symbol_size))
+            for budget in [MIN_MEMORY_BUDGET, 2**30]:
+                with self.subTest(symbol_size=symbol_size, budget=budget):
+                    serialized = count_symbols_external(self.source, symbol_size, budget)
+                    self.assertEqual(load_counts(serialized), (expected, symbol_size))
+
+    def test_merge_passes(self):
+        expected = sorted(basicHuffman.count_symbols(self.source, 3))
+        with patch("src.externalCounts.MAX_MERGED_RUNS", 2):
+            serialized = count_symbols_external(self.source, 3, MIN_MEMORY_BUDGET)
+        self.assertEqual(counts_shape(serialized), (len(expected), 3))
+        self.assertEqual(load_counts(serialized)[0], expected)
+
+    def test_small_budget(self):
+        with self.assertRaises(ValueError):
+            count_symbols_external(self.source, 2, MIN_MEMORY_BUDGET - 1)
+
+    def test_encode(self):
+        encoded = []
+        for budget in [MIN_MEMORY_BUDGET, 2**30]:
+            encoded.append(self.path.joinpath(f"encoded{budget}.huf"))
+            basicHuffman.encode(
+                self.source, encoded[-1], 3, allow_stored=False, memory_budget=budget
+            )
+        # Output doesn't depend on the budget
+        self.assertEqual(encoded[0].read_bytes(), encoded[1].read_bytes())
+        basicHuffman.decode(encoded[0], self.path.joinpath("decoded"))
+        self.assertEqual(self.path.joinpath("decoded.bin").read_bytes(), self.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import random
+import unittest
+from collections import Counter
+
+from src import adaptiveHuffman, basicHuffman, stored
+from src.archive import create_archive
+from src.HuffmanTree import HuffmanTree
+from src.symbolSize import entropy
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+from src.utility import bytes2symbols
+from unhuf import read_info
+
+
+class TestFileInfo(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = skewed_bytes(5001) + b"aaaaaaaaaaaa" * 20
+        self.source = self.path.joinpath("source.txt")
+        self.source.write_bytes(self.data)
+        self.encoded = self.path.joinpath("encoded.huf")
+
+    def assert_basic_statistics(self, symbol_size: int, **kwargs):
+        basicHuffman.encode(self.source, self.encoded, symbol_size, allow_stored=False, **kwargs)
+        info = read_info(self.encoded)
+        symbols = bytes2symbols(self.data, symbol_size)
+        counts = Counter(symbols)
+        encodings = basicHuffman.build_tree(
+            basicHuffman.counts_to_nodes(basicHuffman.count_symbols(self.source, symbol_size))
+        ).get_codings()
+        code_len = sum(count * len(encodings[symbol]) for symbol, count in counts.items())
+        self.assertEqual(info.algorithm, "basic Huffman")
+        self.assertEqual(info.compressed_size, self.encoded.stat().st_size)
+        self.assertEqual(info.symbol_size, symbol_size)
+        self.assertEqual(info.n_symbols, len(symbols))
+        self.assertAlmostEqual(info.entropy, entropy(counts.values()))
+        self.assertAlmostEqual(info.bit_rate, code_len / len(symbols))
+        return info
+
+    def test_basic(self):
+        info = self.assert_basic_statistics(1)
+        self.assertEqual(info.original_size, len(self.data))
+        self.assertAlmostEqual(info.compression_rate, info.compressed_size / len(self.data))
+        # The last symbol is padded
+        info = self.assert_basic_statistics(2)
+        self.assertEqual(info.original_size, len(self.data) + 1)
+        info = self.assert_basic_statistics(2, index_interval=64)
+        self.assertEqual(info.original_size, len(self.data))
+
+    def test_basic_large_alphabet(self):
+        # Lengths of codes of large alphabets are computed with FlatTree
+        self.data = random.Random(0).randbytes(3 * 4000)
+        self.source.write_bytes(self.data)
+        info = self.assert_basic_statistics(3)
+        self.assertEqual(info.original_size, len(self.data))
+
+    def test_basic_run_length(self):
+        for symbol_size in [1, 2]:
+            basicHuffman.encode(
+                self.source, self.encoded, symbol_size, allow_stored=False, run_length=True
+            )
+            info = read_info(self.encoded)
+            self.assertEqual(info.symbol_size, symbol_size + 1)
+            self.assertEqual(info.original_size, len(self.data))
+
+    def test_basic_context_model(self):
+        basicHuffman.encode(self.source, self.encoded, allow_stored=False, context_model=True)
+        info = read_info(self.encoded)
+        self.assertEqual(info.original_size, len(self.data))
+        self.assertIsNone(info.entropy)
+        self.assertIsNone(info.bit_rate)
+
+    def test_adaptive(self):
+        # Contents are encoded with the tree updated by the extension
+        tree = HuffmanTree()
+        for symbol in self.source.suffix.encode():
+            tree.encode_code(symbol)
+        extension_len = tree.sum_code_lens
+        for symbol in self.data:
+            tree.encode_code(symbol)
+        for run_length in [False, True]:
+            adaptiveHuffman.encode(
+                self.source, self.encoded, run_length=run_length, checkpoint=True
+            )
+            adaptiveHuffman.append(self.source, self.encoded)
+            info = read_info(self.encoded)
+            self.assertEqual(info.algorithm, "adaptive Huffman")
+            self.assertEqual(info.original_size, 2 * len(self.data))
+            if not run_length:
+                self.assertEqual(info.n_symbols, 2 * len(self.data))
+                self.assertAlmostEqual(info.entropy, entropy(Counter(self.data).values()))
+
+        adaptiveHuffman.encode(self.source, self.encoded, checkpoint=True)
+        info = read_info(self.encoded)
+        code_len = tree.sum_code_lens - extension_len
+        self.assertAlmostEqual(info.bit_rate, code_len / len(self.data))
+
+    def test_adaptive_without_checkpoint(self):
+        adaptiveHuffman.encode(self.source, self.encoded, run_length=True)
+        info = read_info(self.encoded)
+        self.assertEqual(info.compressed_size, self.encoded.stat().st_size)
+        self.assertEqual(info.symbol_size, 2)
+        self.assertIsNone(info.original_size)
+        self.assertIsNone(info.compression_rate)
+
+    def test_stored(self):
+        stored.encode(self.source, self.encoded)
+        info = read_info(self.encoded)
+        self.assertEqual(info.original_size, len(self.data))
+        self.assertEqual(info.bit_rate, 8)
+
+    def test_archive(self):
+        other = self.path.joinpath("other.bin")
+        other.write_bytes(bytes(range(256)))
+        create_archive([self.source, other], self.encoded)
+        info = read_info(self.encoded)
+        self.assertEqual(info.original_size, len(self.data) + 256)
+        self.assertEqual(info.n_symbols, len(self.data) + 256)
+        counts = Counter(self.data + bytes(range(256)))
+        self.assertAlmostEqual(info.entropy, entropy(counts.values()))
+
+    def test_unknown(self):
+        self.encoded.write_bytes(b"\x0f")
+        self.assertIsNone(read_info(self.encoded))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import random
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from bitarray import bitarray
+
+from src.basicHuffman import TreeDecoder, build_tree, counts_to_nodes
+from src.flatTree import FlatTree
+
+
+def random_counts(seed: int, symbol_size: int, n_symbols: int) -> list[tuple[int, int]]:
+    generator = random.Random(seed)
+    symbols = generator.sample(range(256**symbol_size), n_symbols)
+    # Many equal counts test order of merging nodes
+    return [(symbol, generator.randint(0, 6)) for symbol in symbols]
+
+
+def skewed_counts(seed: int, symbol_size: int, n_symbols: int) -> list[tuple[int, int]]:
+    generator = random.Random(seed)
+    symbols = generator.sample(range(256**symbol_size), n_symbols)
+    # A few frequent symbols and a long tail of rare ones
+    return [(symbol, 10**4 if i < 50 else 1) for i, symbol in enumerate(symbols)]
+
+
+class TestFlatTree(unittest.TestCase):
+    def test_codes_equal_to_nodes(self):
+        for seed in range(50):
+            symbol_size = seed % 3 + 1
+            counts = random_counts(seed, symbol_size, 1 + seed * 5)
+            expected = build_tree(counts_to_nodes(counts)).get_codings()
+            table = FlatTree.from_counts(counts, symbol_size).code_table()
+            self.assertEqual(table.to_dict(), expected)
+
+    def test_long_codes(self):
+        # Fibonacci counts make every internal node a child of the next one
+        fibonacci = [1, 1]
+        while len(fibonacci) < 70:
+            fibonacci.append(fibonacci[-1] + fibonacci[-2])
+        counts = list(enumerate(fibonacci[:65]))
+        expected = build_tree(counts_to_nodes(counts)).get_codings()
+        table = FlatTree.from_counts(counts, 1).code_table()
+        self.assertEqual(table.to_dict(), expected)
+        with self.assertRaises(ValueError):
+            FlatTree.from_counts(list(enumerate(fibonacci)), 1).codes()
+
+    def test_single_symbol(self):
+        table = FlatTree.from_counts([(0x6162, 3)], 2).code_table()
+        self.assertEqual(len(table.to_dict()[0x6162]), 0)
+
+    def test_lookup(self):
+        for symbol_size in [2, 3]:
+            counts = random_counts(symbol_size, symbol_size, 300)
+            expected = build_tree(counts_to_nodes(counts)).get_codings()
+            table = FlatTree.from_counts(counts, symbol_size).code_table()
+            symbols = [symbol for symbol, _ in counts]
+            codes, lengths = table.lookup(np.array(symbols, dtype=np.uint64))
+            self.assertEqual(lengths.tolist(), [len(expected[symbol]) for symbol in symbols])
+            self.assertEqual(
+                codes.tolist(), [int(expected[symbol].to01() or "0", 2) for symbol in symbols]
+            )
+
+    def test_encode(self):
+        generator = random.Random(0)
+        for symbol_size in [1, 2, 3]:
+            counts = random_counts(symbol_size, symbol_size, min(300, 256**symbol_size))
+            expected = build_tree(counts_to_nodes(counts)).get_codings()
+            table = FlatTree.from_counts(counts, symbol_size).code_table()
+            symbols = generator.choices([symbol for symbol, _ in counts], k=1000)
+            code = bitarray()
+            code.encode(expected, symbols)
+            self.assertEqual(table.encode(symbols), code)
+            if symbol_size == 1:
+                self.assertEqual(table.encode(bytes(symbols)), code)
+            self.assertEqual(table.encode([]), bitarray())
+            code_len = sum(count * len(expected[symbol]) for symbol, count in counts)
+            self.assertEqual(table.encoded_length(counts), code_len)
+
+
+class TestLazyDecoder(unittest.TestCase):
+    def test_equal_to_tree_decoder(self):
+        for seed in range(10):
+            symbol_size = seed % 2 + 2
+            counts = skewed_counts(seed, symbol_size, 1024 + seed * 400)
+            flat_tree = FlatTree.from_counts(counts, symbol_size)
+            encodings = flat_tree.code_table().to_dict()
+            lazy = flat_tree.lazy_decoder()
+            self.assertGreater(len(lazy.group_starts), 1)
+            full = TreeDecoder(encodings, symbol_size)
+            generator = random.Random(seed)
+            symbols = generator.choices(
+                [symbol for symbol, _ in counts], [count for _, count in counts], k=3000
+            )
+            code = bitarray()
+            code.encode(encodings, symbols)
+            for end in [len(code), len(code) - 3, len(code) // 2, 0]:
+                with self.subTest(seed=seed, end=end):
+                    self.assertEqual(lazy.decode(code[:end]), full.decode(code[:end]))
+            # Codes and escapes are cut by ends of windows
+            for window in [lazy.max_length, 100]:
+                with self.subTest(seed=seed, window=window), patch(
+                    "src.flatTree.DECODE_WINDOW", window
+                ):
+                    self.assertEqual(lazy.decode(code[:-3]), full.decode(code[:-3]))
+
+    def test_subtables_built_on_use(self):
+        counts = skewed_counts(0, 2, 2000)
+        flat_tree = FlatTree.from_counts(counts, 2)
+        encodings = flat_tree.code_table().to_dict()
+        lazy = flat_tree.lazy_decoder()
+        hot, rare = counts[0][0], counts[-1][0]
+        self.assertLessEqual(len(encodings[hot]), lazy.root_bits)
+        self.assertGreater(len(encodings[rare]), lazy.root_bits)
+
+        code = bitarray()
+        code.encode(encodings, [hot] * 10)
+        self.assertEqual(lazy.decode(code), ([hot] * 10, len(code)))
+        self.assertEqual(lazy.subtables, {})
+        code.encode(encodings, [rare, hot])
+        self.assertEqual(lazy.decode(code), ([hot] * 10 + [rare, hot], len(code)))
+        self.assertEqual(len(lazy.subtables), 1)
+
+    def test_single_symbol(self):
+        lazy = FlatTree.from_counts([(0x616263, 3)], 3).lazy_decoder()
+        self.assertEqual(lazy.decode(bitarray("0101")), ([], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
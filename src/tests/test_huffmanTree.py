@@ -7,15 +7,15 @@ from src.HuffmanTree import HuffmanTree as Ahuf
 class TestSimpleCoding(unittest.TestCase):
 
     def assert_encoding(self, e, symbol, code, suffix=b""):
-        encoding = e.encode(symbol)
+        encoding = e.encode(ord(symbol))
         expected = bitarray(code)
         expected.frombytes(suffix)
         self.assertEqual(encoding, expected)
 
     def assert_decoding(self, e, d, symbol):
-        encoding = e.encode(symbol)
+        encoding = e.encode(ord(symbol))
         decoding, _, _ = d.decode(encoding)
-        self.assertEqual(decoding, symbol)
+        self.assertEqual(decoding, ord(symbol))
 
     def test_codings(self):
         encoder = Ahuf()
@@ -62,7 +62,7 @@ class TestSimpleCoding(unittest.TestCase):
 
         encoding = bitarray()
         for character in "aardvv":
-            encoding += encoder.encode(character.encode())
+            encoding += encoder.encode(ord(character))
         decoding, is_eof = decoder.decode_chunk(encoding)
         self.assertEqual(decoding, b"aardvv")
 
@@ -0,0 +1,68 @@
+import random
+import unittest
+from io import BytesIO
+
+from src.basicHuffman import (
+    FLAT_TREE_MIN_SYMBOLS,
+    TreeDecoder,
+    build_tree,
+    count_symbols,
+    counts_to_nodes,
+    decode,
+    encode,
+)
+from src.interleaved import InterleavedDecoder, encode_interleaved
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+
+
+class TestInterleaved(TemporaryDirectoryTestCase):
+    def round_trip(self, data: bytes, symbol_size: int, n_streams: int, block_symbols: int):
+        source = self.path.joinpath("source")
+        source.write_bytes(data)
+        encodings = build_tree(counts_to_nodes(count_symbols(source, symbol_size))).get_codings()
+        encoded = b"".join(
+            chunk
+            for chunk, _ in encode_interleaved(
+                source, encodings, symbol_size, n_streams, block_symbols
+            )
+        )
+        decoder = InterleavedDecoder(encodings, TreeDecoder(encodings, symbol_size))
+        writer = BytesIO()
+        decoder.decode(BytesIO(encoded), writer, len(data))
+        return decoder, writer.getvalue()
+
+    def test_blocks(self):
+        data = skewed_bytes(3001)
+        for symbol_size in [1, 2]:
+            for n_streams in [1, 3, 4]:
+                for block_symbols in [1, 100, 5000]:
+                    _, decoded = self.round_trip(data, symbol_size, n_streams, block_symbols)
+                    self.assertEqual(decoded, data)
+
+    def test_long_codes(self):
+        # Counts following Fibonacci sequence give codes as long as the number of symbols
+        data = b""
+        previous, count = 1, 1
+        for symbol in range(24):
+            data += bytes([symbol]) * count
+            previous, count = count, previous + count
+        _, decoded = self.round_trip(data, 1, 4, 2**12)
+        self.assertEqual(decoded, data)
+
+    def test_large_alphabet(self):
+        # Streams of large alphabets are decoded with the lazy decoder of flat tree
+        generator = random.Random(0)
+        data = b"".join(
+            generator.randrange(4 * FLAT_TREE_MIN_SYMBOLS).to_bytes(2, "little")
+            for _ in range(10000)
+        )
+        source = self.path.joinpath("source.bin")
+        source.write_bytes(data)
+        encoded = self.path.joinpath("encoded.huf")
+        encode(source, encoded, 2, allow_stored=False, streams=4)
+        decode(encoded, self.path.joinpath("decoded"))
+        self.assertEqual(self.path.joinpath("decoded.bin").read_bytes(), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+import unittest
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+
+from src.npy import load_counts, save_counts
+from src.utility import symbols2bytes
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+class TestNpy(unittest.TestCase):
+    def test_equal_to_numpy(self):
+        for symbol_size, max_count in [(1, 255), (2, 256), (3, 2**16), (1, 2**32)]:
+            symbols_counts = [(i * 0x010101 % 256**symbol_size, i) for i in range(100)]
+            symbols_counts.append((256**symbol_size - 1, max_count))
+            array = np.array(
+                [(symbols2bytes([symbol], symbol_size), count) for symbol, count in symbols_counts],
+                dtype=[("symbol", f"V{symbol_size}"), ("count", np.min_scalar_type(max_count))],
+            )
+            serialized = BytesIO()
+            np.save(serialized, array)
+            self.assertEqual(save_counts(symbols_counts, symbol_size), serialized.getvalue())
+            self.assertEqual(load_counts(serialized.getvalue()), (symbols_counts, symbol_size))
+
+    def test_cli_without_numpy(self):
+        for module in ["huf", "unhuf"]:
+            result = subprocess.run(
+                [sys.executable, "-c", f"import sys, {module}; print('numpy' in sys.modules)"],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from src.basicHuffman import _encode_contents, build_tree, count_symbols, counts_to_nodes, encode
+from src.parallel import count_ranges, encode_ranges
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+
+
+class TestParallel(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = self.path.joinpath("source")
+        self.source.write_bytes(skewed_bytes(3001) + b"xyz")
+
+    def test_count_ranges(self):
+        for symbol_size in [1, 2, 3]:
+            expected = count_symbols(self.source, symbol_size)
+            for workers in [1, 2]:
+                counts = count_ranges(self.source, symbol_size, workers, range_size=100)
+                self.assertEqual(list(counts.items()), expected)
+
+    def test_encode_ranges(self):
+        for symbol_size in [1, 2, 3]:
+            encodings = build_tree(counts_to_nodes(count_symbols(self.source, symbol_size)))
+            encodings = encodings.get_codings()
+            expected = list(_encode_contents(self.source, encodings, symbol_size))
+            for workers in [1, 2]:
+                chunks = list(
+                    encode_ranges(self.source, encodings, symbol_size, workers, range_size=100)
+                )
+                self.assertEqual(
+                    b"".join(chunk for chunk, _ in chunks),
+                    b"".join(chunk for chunk, _ in expected),
+                )
+                self.assertEqual(sum(n for _, n in chunks), sum(n for _, n in expected))
+
+    def test_output_is_identical(self):
+        for symbol_size in [1, 2]:
+            single = self.path.joinpath("single.huf")
+            encode(self.source, single, symbol_size)
+            parallel = self.path.joinpath("parallel.huf")
+            encode(self.source, parallel, symbol_size, workers=2)
+            self.assertEqual(parallel.read_bytes(), single.read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
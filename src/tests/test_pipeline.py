@@ -0,0 +1,86 @@
+import threading
+import time
+import unittest
+from io import BytesIO
+
+from src import adaptiveHuffman, basicHuffman
+from src.pipeline import Pipeline
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+
+
+class SlowReader(BytesIO):
+    def read(self, size: int = -1) -> bytes:
+        time.sleep(0.02)
+        return super().read(size)
+
+
+class FailingWriter(BytesIO):
+    def write(self, data) -> int:
+        raise OSError("Disk is full")
+
+
+class TestPipeline(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.data = skewed_bytes(5000) + b"xyz"
+        self.source = self.path.joinpath("source.txt")
+        self.source.write_bytes(self.data)
+
+    def assert_pipelined_equal(self, encode, decode, **options):
+        expected = self.path.joinpath("expected.huf")
+        encode(self.source, expected, **options)
+        pipelined = self.path.joinpath("pipelined.huf")
+        encode(self.source, pipelined, **options, pipeline=Pipeline(block_size=100, depth=2))
+        self.assertEqual(pipelined.read_bytes(), expected.read_bytes())
+        decode(pipelined, self.path.joinpath("decoded"), Pipeline(block_size=64, depth=1))
+        self.assertEqual(self.path.joinpath("decoded.txt").read_bytes(), self.data)
+
+    def test_basic(self):
+        for options in [
+            {"symbol_size": 1},
+            {"symbol_size": 3},
+            {"symbol_size": 2, "index_interval": 16},
+            {"symbol_size": 2, "run_length": True},
+            {"symbol_size": 1, "streams": 3},
+        ]:
+            with self.subTest(**options):
+                self.assert_pipelined_equal(
+                    basicHuffman.encode, basicHuffman.decode, allow_stored=False, **options
+                )
+
+    def test_adaptive(self):
+        for run_length in [False, True]:
+            self.assert_pipelined_equal(
+                adaptiveHuffman.encode, adaptiveHuffman.decode, run_length=run_length
+            )
+
+    def test_reader_closed_early(self):
+        threads = threading.active_count()
+        pipeline = Pipeline(block_size=10, depth=1)
+        with pipeline.reader(BytesIO(self.data)) as reader:
+            self.assertEqual(reader.read(15), self.data[:15])
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_report(self):
+        pipeline = Pipeline(block_size=100, depth=2)
+        for _ in pipeline.read_blocks(SlowReader(self.data)):
+            pass
+        self.assertTrue(pipeline.report().io_bound)
+
+        pipeline = Pipeline(block_size=1000, depth=2)
+        for _ in pipeline.read_blocks(BytesIO(self.data)):
+            time.sleep(0.02)
+        report = pipeline.report()
+        self.assertFalse(report.io_bound)
+        self.assertTrue(str(report).startswith("CPU-bound"))
+
+    def test_write_error(self):
+        with self.assertRaises(OSError):
+            with Pipeline(block_size=10, depth=1).writer(FailingWriter()) as writer:
+                for _ in range(100):
+                    writer.write(self.data[:20])
+        self.assertFalse(writer.thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
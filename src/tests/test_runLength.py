@@ -0,0 +1,75 @@
+import os
+import random
+import unittest
+from itertools import groupby
+
+from src.adaptiveHuffman import encode as adaptive_encode
+from src.basicHuffman import encode as basic_encode
+from src.runLength import RunLengthDecoder, run_length_tokens
+from src.tests.helpers import TemporaryDirectoryTestCase
+from unhuf import decode
+
+
+class TestRunLength(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.decoded = self.path.joinpath("decoded")
+        self.decoded.mkdir()
+
+    def test_tokens(self):
+        tokens = b"".join(run_length_tokens([b"aaaaaab"]))
+        self.assertEqual(tokens, b"\x00a" + b"\x01\x02" + b"\x01\x00" + b"\x00b")
+        decoder = RunLengthDecoder()
+        decoded = b"".join(decoder.feed(tokens[i : i + 1]) for i in range(len(tokens)))
+        self.assertEqual(decoded + decoder.finish(), b"aaaaaab")
+
+    def test_chunks(self):
+        # Runs continue across chunks and only whole symbols are repeated
+        generator = random.Random(0)
+        data = b"".join(
+            generator.choice([b"ab", b"ba", b"c", b"\x00"]) * generator.randint(1, 40)
+            for _ in range(500)
+        )
+        for symbol_size in [1, 2, 3]:
+            symbols = [data[i : i + symbol_size] for i in range(0, len(data), symbol_size)]
+            symbols[-1] = symbols[-1].ljust(symbol_size, b"\x00")
+            expected = bytearray()
+            for symbol, group in groupby(symbols):
+                repeats = len(list(group)) - 1
+                expected += b"\x00" + symbol
+                for power in range(repeats.bit_length() - 1, -1, -1):
+                    if repeats >> power & 1:
+                        expected += b"\x01" + bytes([power]).ljust(symbol_size, b"\x00")
+            for chunk_symbols in [1, 7, 1000, len(symbols)]:
+                step = chunk_symbols * symbol_size
+                chunks = [data[i : i + step] for i in range(0, len(data), step)]
+                with self.subTest(symbol_size=symbol_size, chunk_symbols=chunk_symbols):
+                    self.assertEqual(b"".join(run_length_tokens(chunks, symbol_size)), expected)
+
+    def round_trip(self, data: bytes, encode) -> int:
+        source = self.path.joinpath("source.bin")
+        source.write_bytes(data)
+        encoded = self.path.joinpath("source.huf")
+        encode(source, encoded)
+        decode(encoded, self.decoded.joinpath("source"))
+        self.assertEqual(self.decoded.joinpath("source.bin").read_bytes(), data)
+        return os.path.getsize(encoded)
+
+    def test_basic(self):
+        data = b"\xff" * 5000 + b"\x00\x01" * 300 + b"\x00" * 2001 + b"z"
+        for symbol_size in [1, 2, 3]:
+            size = self.round_trip(
+                data, lambda src, dst: basic_encode(src, dst, symbol_size, run_length=True)
+            )
+            plain_size = self.round_trip(data, lambda src, dst: basic_encode(src, dst, symbol_size))
+            self.assertLess(size, plain_size)
+
+    def test_adaptive(self):
+        data = b"\xff" * 5000 + bytes(range(256)) + b"\x00" * 2000 + b"abc"
+        size = self.round_trip(data, lambda src, dst: adaptive_encode(src, dst, run_length=True))
+        plain_size = self.round_trip(data, adaptive_encode)
+        self.assertLess(size, plain_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
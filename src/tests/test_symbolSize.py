@@ -0,0 +1,37 @@
+import random
+import unittest
+
+from src.symbolSize import entropy, read_sample, select_symbol_size
+from src.tests.helpers import TemporaryDirectoryTestCase
+
+
+class TestSymbolSize(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = self.path.joinpath("source.bin")
+
+    def test_entropy(self):
+        self.assertAlmostEqual(entropy([1, 1, 1, 1]), 2)
+        self.assertAlmostEqual(entropy([5]), 0)
+
+    def test_sample_alignment(self):
+        self.source.write_bytes(bytes(range(256)) * 1024)
+        blocks, file_size = read_sample(self.source, 2**12, 8, alignment=6)
+        self.assertEqual(file_size, 2**18)
+        self.assertEqual(len(blocks), 8)
+        for block in blocks:
+            self.assertEqual(len(block) % 6, 0)
+
+    def test_pairs_prefer_two_byte_symbols(self):
+        generator = random.Random(0)
+        pairs = [b"ab", b"cd", b"ef", b"gh"]
+        self.source.write_bytes(b"".join(generator.choice(pairs) for _ in range(2**16)))
+        self.assertEqual(select_symbol_size(self.source), 2)
+
+    def test_random_bytes_prefer_one_byte_symbols(self):
+        self.source.write_bytes(random.Random(0).randbytes(2**17))
+        self.assertEqual(select_symbol_size(self.source), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
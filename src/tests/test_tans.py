@@ -0,0 +1,105 @@
+import random
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from src import tans
+from src.tansTable import TansTable, normalize_counts, pack_bits, table_log, unpack_bits
+from src.tests.helpers import TemporaryDirectoryTestCase, skewed_bytes
+from unhuf import decode, read_info
+
+
+class TestTansTable(unittest.TestCase):
+    def test_normalize_counts(self):
+        counts = np.zeros(256, dtype=np.int64)
+        counts[:200] = 1
+        counts[200] = 10**6
+        log = table_log(counts)
+        normalized = normalize_counts(counts, log)
+        self.assertEqual(normalized.sum(), 2**log)
+        self.assertTrue((normalized[:201] > 0).all())
+        self.assertFalse(normalized[201:].any())
+
+        # Fractions of equal counts are rounded up in order of symbols
+        normalized = normalize_counts(np.array([1, 1, 1] + [0] * 253), 5)
+        self.assertEqual(normalized[:3].tolist(), [11, 11, 10])
+
+    def test_pack_bits(self):
+        generator = np.random.default_rng(0)
+        lengths = generator.integers(0, 13, 1000)
+        values = generator.integers(0, 2**12, 1000) & ((1 << lengths) - 1)
+        packed = pack_bits(values, lengths)
+        expected = "".join(
+            format(value, "b").zfill(length) if length else ""
+            for value, length in zip(values.tolist(), lengths.tolist())
+        )
+        expected = int(expected.ljust(len(packed) * 8, "0"), 2)
+        self.assertEqual(packed, expected.to_bytes(len(packed), byteorder="big"))
+        data = np.frombuffer(packed + bytes(3), dtype=np.uint8).astype(np.int64)
+        offsets = np.cumsum(lengths) - lengths
+        self.assertTrue((unpack_bits(data, offsets, lengths) == values).all())
+
+    def test_lanes(self):
+        symbols = np.frombuffer(skewed_bytes(5000), dtype=np.uint8)
+        table = TansTable.from_counts(list(enumerate(np.bincount(symbols).tolist())))
+        for n_lanes in [1, 7, 5000]:
+            states, bits = table.encode_block(symbols, n_lanes)
+            self.assertTrue((table.decode_block(len(symbols), states, bits) == symbols).all())
+
+
+class TestTans(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.encoded = self.path.joinpath("encoded.huf")
+
+    def round_trip(self, data: bytes, suffix: str = ".txt"):
+        source = self.path.joinpath("source" + suffix)
+        source.write_bytes(data)
+        tans.encode(source, self.encoded)
+        decode(self.encoded, self.path.joinpath("decoded"))
+        self.assertEqual(self.path.joinpath("decoded" + suffix).read_bytes(), data)
+
+    def test_round_trip(self):
+        generator = random.Random(0)
+        files = {
+            "empty": b"",
+            "single": b"a" * 1000,
+            "skewed": skewed_bytes(20000),
+            "random": generator.randbytes(20000),
+            "all symbols": bytes(range(256)) + b"a" * 10**5,
+        }
+        for name, data in files.items():
+            for suffix in ["", ".txt"]:
+                with self.subTest(name=name, suffix=suffix):
+                    self.round_trip(data, suffix)
+
+    def test_blocks(self):
+        with patch("src.tans.BLOCK_SYMBOLS", 3000):
+            self.round_trip(skewed_bytes(10000))
+
+    def test_compression(self):
+        data = skewed_bytes(50000)
+        self.round_trip(data)
+        info = read_info(self.encoded)
+        self.assertEqual(info.algorithm, "tANS")
+        self.assertEqual(info.compressed_size, self.encoded.stat().st_size)
+        self.assertEqual(info.original_size, len(data))
+        self.assertIsNone(info.entropy)
+        counts = np.bincount(np.frombuffer(data, dtype=np.uint8))
+        probabilities = counts[counts > 0] / len(data)
+        entropy = -(probabilities * np.log2(probabilities)).sum()
+        self.assertLess(info.bit_rate, entropy * 1.01)
+
+    def test_invalid(self):
+        self.encoded.write_bytes(b"\x0f")
+        with self.assertRaises(ValueError):
+            tans.read_info(self.encoded)
+        self.round_trip(skewed_bytes(1000))
+        self.encoded.write_bytes(self.encoded.read_bytes()[:-100])
+        with self.assertRaises(ValueError):
+            tans.decode(self.encoded, self.path.joinpath("decoded"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import unittest
+
+from src.basicHuffman import encode
+from src.tests.helpers import TemporaryDirectoryTestCase, synthetic_pgm
+from src.transform import is_pgm, med_forward, med_inverse
+from unhuf import decode
+
+
+class TestTransform(TemporaryDirectoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.image = self.path.joinpath("image.pgm")
+        self.image.write_bytes(synthetic_pgm(96, 64))
+        self.decoded = self.path.joinpath("decoded")
+        self.decoded.mkdir()
+
+    def test_is_pgm(self):
+        self.assertTrue(is_pgm(self.image))
+        other = self.path.joinpath("other.pgm")
+        other.write_bytes(b"P2\n2 2\n255\n0 0 0 0")
+        self.assertFalse(is_pgm(other))
+
+    def test_inverse(self):
+        residuals = self.path.joinpath("residuals.pgm")
+        restored = self.path.joinpath("restored.pgm")
+        # Small images are restored pixel by pixel, larger ones by anti-diagonals
+        for width, height in [(96, 64), (40, 100), (5, 3), (1, 40)]:
+            with self.subTest(width=width, height=height):
+                image = synthetic_pgm(width, height, seed=width)
+                for data in [image, image[:-7]]:
+                    self.image.write_bytes(data)
+                    med_forward(self.image, residuals)
+                    med_inverse(residuals, restored)
+                    self.assertEqual(restored.read_bytes(), data)
+
+    def test_encode_with_transform(self):
+        plain = self.path.joinpath("plain.huf")
+        transformed = self.path.joinpath("transformed.huf")
+        encode(self.image, plain)
+        encode(self.image, transformed, transform=True)
+        self.assertLess(os.path.getsize(transformed), os.path.getsize(plain))
+
+        decode(transformed, self.decoded.joinpath("image"))
+        restored = self.decoded.joinpath("image.pgm")
+        self.assertEqual(restored.read_bytes(), self.image.read_bytes())
+
+    def test_transform_ignored_for_other_files(self):
+        source = self.path.joinpath("source.bin")
+        source.write_bytes(b"abcabcaab" * 100)
+        encoded = self.path.joinpath("source.huf")
+        encode(source, encoded, transform=True)
+        decode(encoded, self.decoded.joinpath("source"))
+        restored = self.decoded.joinpath("source.bin")
+        self.assertEqual(restored.read_bytes(), source.read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+#   Reversible transform of binary PGM images with 8 bit pixels. Header of the image is left
+#   unchanged, every pixel is replaced with difference (modulo 256) between its value and value
+#   predicted by median edge detector (MED) from its left (a), upper (b) and upper left (c)
+#   neighbours. Pixels of the first row are predicted with their left neighbour, pixels of the
+#   first column - with their upper neighbour, the first pixel - with 0.
+
+PGM_MAGIC = b"P5"
+# Images with fewer rows or columns are restored pixel by pixel, steps of restoring whole
+# anti-diagonals would cover too few pixels each
+MIN_DIAGONAL_LENGTH = 32
+
+
+def read_pgm_header(file: BinaryIO):
+    """
+    Reads header of binary PGM image
+
+    Args:
+        file (BinaryIO): File positioned at the beginning of the image
+
+    Raises:
+        ValueError: Raised if file is not a binary PGM image with pixels taking 1 byte
+
+    Returns:
+        tuple[bytes, int, int]: Header of the image, its width and height
+    """
+    header = file.read(2)
+    if header != PGM_MAGIC:
+        raise ValueError("File is not a binary PGM image")
+    fields: list[int] = []
+    while len(fields) < 3:
+        byte = file.read(1)
+        header += byte
+        if byte == b"#":
+            line = file.readline()
+            header += line
+            byte = line[-1:]
+        if byte.isdigit():
+            field = byte
+            while (byte := file.read(1)).isdigit():
+                field += byte
+            header += field[1:] + byte
+            fields.append(int(field))
+        elif not byte.isspace():
+            raise ValueError("File is not a binary PGM image")
+    width, height, maxval = fields
+    if maxval > 255:
+        raise ValueError("Only PGM images with 1 byte pixels are supported")
+    return header, width, height
+
+
+def is_pgm(filepath: Path) -> bool:
+    """
+    Checks if file is a binary PGM image that can be transformed
+
+    Args:
+        filepath (Path): Path to the file
+
+    Returns:
+        bool: True if file can be transformed, False otherwise
+    """
+    with open(filepath, "rb") as file:
+        try:
+            read_pgm_header(file)
+        except ValueError:
+            return False
+    return True
+
+
+def _predict(left: np.ndarray, upper: np.ndarray, upper_left: np.ndarray) -> np.ndarray:
+    a = left.astype(np.int16)
+    b = upper.astype(np.int16)
+    c = upper_left.astype(np.int16)
+    prediction = a + b - c
+    prediction = np.where(c >= np.maximum(a, b), np.minimum(a, b), prediction)
+    prediction = np.where(c <= np.minimum(a, b), np.maximum(a, b), prediction)
+    return prediction.astype(np.uint8)
+
+
+def med_forward(src: Path, dst: Path):
+    """
+    Replaces pixels of the image with residuals of MED prediction
+
+    Args:
+        src (Path): Binary PGM image
+        dst (Path): Path where transformed image will be saved
+    """
+    with open(src, "rb") as reader, open(dst, "wb") as writer:
+        header, width, height = read_pgm_header(reader)
+        writer.write(header)
+        previous = None
+        for _ in range(height):
+            row = np.frombuffer(reader.read(width), dtype=np.uint8)
+            if len(row) < width:  # truncated image, rest is copied without changes
+                writer.write(row.tobytes())
+                break
+            if previous is None:
+                prediction = np.concatenate(([0], row[:-1])).astype(np.uint8)
+            else:
+                prediction = _predict(row[:-1], previous[1:], previous[:-1])
+                prediction = np.concatenate((previous[:1], prediction))
+            writer.write((row - prediction).tobytes())
+            previous = row
+        writer.write(reader.read())
+
+
+def _restore_pixels(residuals: np.ndarray) -> np.ndarray:
+    image = np.empty_like(residuals)
+    previous = None
+    for y, row_residuals in enumerate(residuals.tolist()):
+        row = [0] * len(row_residuals)
+        if previous is None:
+            left = 0
+            for i, residual in enumerate(row_residuals):
+                left = row[i] = (left + residual) & 255
+        else:
+            left = row[0] = (previous[0] + row_residuals[0]) & 255
+            for i in range(1, len(row)):
+                a, b, c = left, previous[i], previous[i - 1]
+                if c >= max(a, b):
+                    prediction = min(a, b)
+                elif c <= min(a, b):
+                    prediction = max(a, b)
+                else:
+                    prediction = a + b - c
+                left = row[i] = (prediction + row_residuals[i]) & 255
+        image[y] = row
+        previous = row
+    return image
+
+
+def _restore(residuals: np.ndarray) -> np.ndarray:
+    """
+    Reverses MED prediction of whole rows of the image. The first row and column are restored
+    with cumulative sums. A pixel depends on its left, upper and upper left neighbours, which
+    lie on the two preceding anti-diagonals, so pixels of every anti-diagonal are restored
+    together, in width + height steps instead of one per pixel.
+
+    Args:
+        residuals (np.ndarray): Residuals of pixels, in rows of the image
+
+    Returns:
+        np.ndarray: Pixels, in rows of the image
+    """
+    height, width = residuals.shape
+    if min(height, width) < MIN_DIAGONAL_LENGTH:
+        return _restore_pixels(residuals)
+    image = np.empty_like(residuals)
+    image[0] = np.cumsum(residuals[0], dtype=np.uint8)
+    image[:, 0] = np.cumsum(residuals[:, 0], dtype=np.uint8)
+    pixels = image.reshape(-1)
+    flat_residuals = residuals.reshape(-1)
+    for diagonal in range(2, height + width - 1):
+        first_row = max(1, diagonal - width + 1)
+        last_row = min(height - 1, diagonal - 1)
+        # Index of pixel (y, diagonal - y)
+        indices = np.arange(first_row, last_row + 1) * (width - 1) + diagonal
+        upper = indices - width
+        prediction = _predict(pixels[indices - 1], pixels[upper], pixels[upper - 1])
+        pixels[indices] = prediction + flat_residuals[indices]
+    return image
+
+
+def med_inverse(src: Path, dst: Path):
+    """
+    Restores image transformed with `med_forward`, whole image is read into memory
+
+    Args:
+        src (Path): Transformed image
+        dst (Path): Path where restored image will be saved
+    """
+    with open(src, "rb") as reader, open(dst, "wb") as writer:
+        header, width, height = read_pgm_header(reader)
+        writer.write(header)
+        data = reader.read(width * height)
+        # Truncated image, rest of the last row is copied without changes
+        n_rows = len(data) // width if width else 0
+        residuals = np.frombuffer(data, dtype=np.uint8, count=n_rows * width)
+        writer.write(_restore(residuals.reshape(n_rows, width)).tobytes())
+        writer.write(data[n_rows * width :])
+        writer.write(reader.read())
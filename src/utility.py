@@ -1,5 +1,19 @@
+import sys
+from array import array
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Sequence
+
 from bitarray import bitarray
+from bitarray.util import ba2int, int2ba
+
+if TYPE_CHECKING:
+    from src.flatTree import CodeTable
+
+# Symbols are handled as unsigned integers read from their bytes in native order, so that data
+# can be viewed as integers without copying. Encoded files contain only bytes of symbols.
+SYMBOL_BYTEORDER = sys.byteorder
+# Array type codes of unsigned integers of every size
+_TYPECODES = {array(code).itemsize: code for code in "QLIHB"}
 
 
 def read_chunks(filepath: Path, chunk_size: int = 2**10):
@@ -34,6 +48,83 @@ def read_n_bytes(filepath: Path, n: int = 1, chunk_size: int = 2**10):
         yield last_block.ljust(n, b"\x00")
 
 
+def bytes2symbols(data: bytes, symbol_size: int = 1) -> Sequence[int]:
+    """
+    Splits data into symbols
+
+    Args:
+        data (bytes): Data to split
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+
+    Returns:
+        Sequence[int]: Symbols as unsigned integers. The last symbol is padded with trailing zeros
+        if the size of data is not divisible by `symbol_size`
+    """
+    remainder = len(data) % symbol_size
+    if remainder:
+        data = data + bytes(symbol_size - remainder)
+    if symbol_size == 1:
+        return data
+    if symbol_size in _TYPECODES:
+        return memoryview(data).cast(_TYPECODES[symbol_size])
+    return [
+        int.from_bytes(data[i : i + symbol_size], SYMBOL_BYTEORDER)
+        for i in range(0, len(data), symbol_size)
+    ]
+
+
+def symbols2bytes(symbols: Iterable[int], symbol_size: int = 1) -> bytes:
+    """
+    Joins symbols into data, reverses `bytes2symbols`
+
+    Args:
+        symbols (Iterable[int]): Symbols as unsigned integers
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+
+    Returns:
+        bytes: Bytes of symbols
+    """
+    if symbol_size == 1:
+        return bytes(symbols)
+    if symbol_size in _TYPECODES:
+        return array(_TYPECODES[symbol_size], symbols).tobytes()
+    return b"".join(symbol.to_bytes(symbol_size, SYMBOL_BYTEORDER) for symbol in symbols)
+
+
+def read_symbols(filepath: Path, symbol_size: int = 1, chunk_symbols: int = 2**16):
+    """
+    Reads file in chunks of symbols
+
+    Args:
+        filepath (Path): path to a file
+        symbol_size (int, optional): Size of symbols in bytes. Defaults to 1.
+        chunk_symbols (int, optional): Number of symbols in every chunk. Defaults to 2**16.
+
+    Yields:
+        Sequence[int]: Symbols of a chunk as unsigned integers, as returned by `bytes2symbols`
+    """
+    for chunk in read_chunks(filepath, chunk_symbols * symbol_size):
+        yield bytes2symbols(chunk, symbol_size)
+
+
+def encode_symbols(
+    code: bitarray, encodings: "dict[int, bitarray] | CodeTable", symbols: Sequence[int]
+):
+    """
+    Appends codes of symbols to the code
+
+    Args:
+        code (bitarray): Code extended in place
+        encodings (dict[int, bitarray] | CodeTable): Codes of symbols, as returned by
+            `code_table` in basicHuffman.py
+        symbols (Sequence[int]): Symbols as returned by `bytes2symbols`
+    """
+    if isinstance(encodings, dict):
+        code.encode(encodings, symbols)
+    else:
+        code.extend(encodings.encode(symbols))
+
+
 def get_n_bits(data: bytes, index: int, n: int) -> bitarray:
     bits = bitarray()
     bits.frombytes(data)
@@ -67,3 +158,39 @@ def bytes2ba(data: bytes):
     ba = bitarray()
     ba.frombytes(data)
     return ba
+
+
+def read_algorithm_identifier(header: bytes) -> int:
+    """
+    Reads identifier of the algorithm used to encode a file from the first byte of its header
+
+    The first bit distinguishes adaptive Huffman (1) from the other formats (0). Headers of the
+    latter specify format type in the last 4 bits of the first byte, identifier is then equal to
+    format type multiplied by 2.
+
+    Args:
+        header (bytes): Header of encoded file, only the first byte is inspected
+
+    Returns:
+        int: Identifier of the algorithm
+    """
+    bits = bytes2ba(header[:1])
+    if bits[0]:
+        return ba2int(bits[0:1])
+    return ba2int(bits[4:8] + bits[0:1])
+
+
+def make_first_byte(identifier: int, padding_bits: int = 0) -> bytes:
+    """
+    Creates the first byte of header for formats other than adaptive Huffman
+
+    Args:
+        identifier (int): Identifier of the algorithm, needs to be even
+        padding_bits (int, optional): Number of padding bits at the end of the file. Defaults to 0.
+
+    Returns:
+        bytes: First byte of header
+    """
+    if identifier % 2 != 0:
+        raise ValueError("Only identifiers of non-adaptive formats can be written this way")
+    return (bitarray([0]) + int2ba(padding_bits, 3) + int2ba(identifier >> 1, 4)).tobytes()
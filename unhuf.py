@@ -5,15 +5,34 @@ import argparse
 from pathlib import Path
 from types import SimpleNamespace
 from itertools import zip_longest
-from bitarray.util import ba2int
-from src.basicHuffman import decode as basic_decode, BASIC_HUFFMAN, get_n_bits
-from src.adaptiveHuffman import decode as adaptive_decode, ADAPTIVE_HUFFMAN
+from src.basicHuffman import (
+    decode as basic_decode,
+    decode_range as basic_decode_range,
+    read_extension,
+    read_info as basic_read_info,
+    BASIC_HUFFMAN,
+    BASIC_HUFFMAN_EXTENDED,
+)
+from src.adaptiveHuffman import (
+    decode as adaptive_decode,
+    read_info as adaptive_read_info,
+    ADAPTIVE_HUFFMAN,
+    ADAPTIVE_HUFFMAN_EXTENDED,
+)
+from src.archive import extract_archive, list_members, read_info as archive_read_info, ARCHIVE
+from src.fileInfo import FileInfo
+from src.pipeline import DEFAULT_BLOCK_SIZE, Pipeline
+from src.stored import decode as stored_decode, read_info as stored_read_info, STORED
+from src.tans import decode as tans_decode, read_info as tans_read_info, TANS
+from src.utility import read_algorithm_identifier
 
 
-def get_args() -> argparse.Namespace:
+def get_args(argv: list[str] | None = None) -> argparse.Namespace:
     """
     Instantiate argument parser and parse execution arguments
 
+    :param argv: Arguments to parse, arguments of the process if omitted
+    :type argv: list[str] | None
     :return: Namespace containing parsed execution arguments
     :rtype: argparse.Namespace
     """
@@ -42,6 +61,75 @@ def get_args() -> argparse.Namespace:
             omitted decoded files will be saved next to originals.",
     )
 
+    def non_negative_int(text: str):
+        val = int(text)
+        if val < 0:
+            raise argparse.ArgumentTypeError(f"{val} is not a valid value for non-negative integer")
+        return val
+
+    parser.add_argument(
+        "--range",
+        metavar=("START", "LENGTH"),
+        nargs=2,
+        type=non_negative_int,
+        default=None,
+        help="Decode only LENGTH bytes starting at offset START. Requires files encoded with \
+            basic type of the algorithm with index",
+    )
+
+    parser.add_argument(
+        "-l",
+        "--list",
+        dest="is_list",
+        action="store_true",
+        default=False,
+        help="List members of archives instead of decoding them",
+    )
+    parser.add_argument(
+        "-i",
+        "--info",
+        dest="is_info",
+        action="store_true",
+        default=False,
+        help="Show sizes, entropy and bit rate read from headers of files instead of decoding \
+            them",
+    )
+    parser.add_argument(
+        "-m",
+        "--members",
+        metavar="NAME",
+        nargs="+",
+        default=None,
+        help="Names of archive members to decode. If omitted all members are decoded. Members \
+            are saved in the directory of destination",
+    )
+
+    def positive_int(text: str):
+        val = int(text)
+        if val <= 0:
+            raise argparse.ArgumentTypeError(f"{val} is not a valid value for positive integer")
+        return val
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=positive_int,
+        default=None,
+        help="Number of processes decoding archive members. Defaults to number of processors",
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        metavar="BLOCK_SIZE",
+        type=positive_int,
+        nargs="?",
+        const=DEFAULT_BLOCK_SIZE,
+        default=None,
+        help="Read and write files in blocks of BLOCK_SIZE bytes in background threads, so that \
+            disk access overlaps with decoding, and report if it was I/O-bound or CPU-bound. \
+            BLOCK_SIZE defaults to %(const)s",
+    )
+
     parser.add_argument(
         "-v",
         "--verbose",
@@ -50,29 +138,97 @@ def get_args() -> argparse.Namespace:
         default=False,
         help="Show more details about execution",
     )
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-def decode(src: Path, dst: Path):
+def decode(
+    src: Path,
+    dst: Path,
+    members: list[str] | None = None,
+    workers: int | None = None,
+    pipeline: Pipeline | None = None,
+):
     # Can't use constants directly in match-case because they would be always matching
     identifiers = SimpleNamespace()
     identifiers.basic_huffman = BASIC_HUFFMAN
+    identifiers.basic_huffman_extended = BASIC_HUFFMAN_EXTENDED
     identifiers.adaptive_huffman = ADAPTIVE_HUFFMAN
+    identifiers.adaptive_huffman_extended = ADAPTIVE_HUFFMAN_EXTENDED
+    identifiers.stored = STORED
+    identifiers.archive = ARCHIVE
+    identifiers.tans = TANS
 
     algorithm_identifier = None
     with open(src, "rb") as reader:
-        algorithm_identifier = ba2int(get_n_bits(reader.read(1), 0, 1))
+        algorithm_identifier = read_algorithm_identifier(reader.read(1))
     match algorithm_identifier:
-        case identifiers.basic_huffman:
-            basic_decode(src, dst)
-        case identifiers.adaptive_huffman:
-            adaptive_decode(src, dst)
+        case identifiers.basic_huffman | identifiers.basic_huffman_extended:
+            basic_decode(src, dst, pipeline)
+        case identifiers.adaptive_huffman | identifiers.adaptive_huffman_extended:
+            adaptive_decode(src, dst, pipeline)
+        case identifiers.stored:
+            stored_decode(src, dst)
+        case identifiers.archive:
+            extract_archive(src, dst.parent, members, workers)
+        case identifiers.tans:
+            tans_decode(src, dst)
         case _:
             print(f"{src} was encoded using unknown type of algorithm")
 
 
-if __name__ == "__main__":
-    args = get_args()
+def read_info(src: Path) -> FileInfo | None:
+    """
+    Reads sizes and statistics of encoded file without decoding its contents
+
+    :param src: Encoded file
+    :type src: Path
+    :return: Info of the file, None if it was encoded using unknown type of algorithm
+    :rtype: FileInfo | None
+    """
+    identifiers = SimpleNamespace()
+    identifiers.basic_huffman = BASIC_HUFFMAN
+    identifiers.basic_huffman_extended = BASIC_HUFFMAN_EXTENDED
+    identifiers.adaptive_huffman = ADAPTIVE_HUFFMAN
+    identifiers.adaptive_huffman_extended = ADAPTIVE_HUFFMAN_EXTENDED
+    identifiers.stored = STORED
+    identifiers.archive = ARCHIVE
+    identifiers.tans = TANS
+
+    with open(src, "rb") as reader:
+        algorithm_identifier = read_algorithm_identifier(reader.read(1))
+    match algorithm_identifier:
+        case identifiers.basic_huffman | identifiers.basic_huffman_extended:
+            return basic_read_info(src)
+        case identifiers.adaptive_huffman | identifiers.adaptive_huffman_extended:
+            return adaptive_read_info(src)
+        case identifiers.stored:
+            return stored_read_info(src)
+        case identifiers.archive:
+            return archive_read_info(src)
+        case identifiers.tans:
+            return tans_read_info(src)
+        case _:
+            return None
+
+
+def decode_range(src: Path, dst: Path, start: int, length: int):
+    try:
+        decoded = basic_decode_range(src, start, length)
+    except ValueError as error:
+        print(error)
+        return
+    with open(dst.with_suffix(read_extension(src)), "wb") as writer:
+        writer.write(decoded)
+
+
+def main(argv: list[str] | None = None):
+    """
+    Run the tool with given arguments
+
+    :param argv: Arguments of the tool, arguments of the process if omitted
+    :type argv: list[str] | None
+    """
+    args = get_args(argv)
     file: Path
     destination: Path | None
     for file, destination in zip_longest(args.files, args.destinations):
@@ -99,4 +255,38 @@ if __name__ == "__main__":
                     )
                 )
             destination = file
-        decode(file, destination)
+        if args.is_info:
+            try:
+                info = read_info(file)
+            except (OSError, ValueError) as error:
+                print(f"{error}. File {file} has been skipped.")
+                continue
+            if info is None:
+                print(f"{file} was encoded using unknown type of algorithm")
+                continue
+            print(file)
+            for line in info.describe():
+                print(f"\t{line}")
+        elif args.is_list:
+            with open(file, "rb") as reader:
+                is_archive = read_algorithm_identifier(reader.read(1)) == ARCHIVE
+            if not is_archive:
+                print(f"{file} is not an archive")
+                continue
+            for member in list_members(file):
+                print(f"{member.name}\t{member.size}")
+        elif args.range is not None:
+            decode_range(file, destination, *args.range)
+        else:
+            pipeline = Pipeline(args.pipeline) if args.pipeline is not None else None
+            try:
+                decode(file, destination, args.members, args.workers, pipeline)
+            except ValueError as error:
+                print(f"{error}. File {file} has been skipped.")
+                continue
+            if pipeline is not None:
+                print(f"{file}: {pipeline.report()}")
+
+
+if __name__ == "__main__":
+    main()